@@ -2,13 +2,37 @@
 # Purpose:  This Script  is designed to illustrate how to use a  connection to an IBM  #
 # System i  Server, by using the connect and login methods.                            #
 #  In addition a database file is connected using a connection (ODBC).                 #                                      #
+#  The result is streamed to CSV (or Parquet) in batches via src.extract.              #
 #**************************************************************************************#
+import argparse
+import logging
 import os
+import sys
+from pathlib import Path
 
 import pyodbc
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.extract import extract_to_csv, extract_to_parquet  # noqa: E402
+
+QUERY = (
+    "select employee_type, employee_code, employee_name, monthly_salary "
+    "from dblibrary.nmpp000 where employee_type = ?"
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract nmpp000 employee data")
+    parser.add_argument("--out", default="nmpp000.csv", help="CSV or .parquet file")
+    parser.add_argument("--employee-type", default="O")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    return parser.parse_args()
+
 
 def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     system = os.environ.get("IBMI_SYSTEM")
     uid = os.environ.get("IBMI_UID")
     pwd = os.environ.get("IBMI_PWD")
@@ -18,13 +42,18 @@ def main() -> None:
     connection = pyodbc.connect(
         driver="{iSeries Access ODBC Driver}", system=system, uid=uid, pwd=pwd
     )
-    c1 = connection.cursor()
-    query = (
-        "select employee_type, employee_code, employee_name, monthly_salary "
-        "from dblibrary.nmpp000 where employee_type = ?"
-    )
-    for row in c1.execute(query, "O"):
-        print(row)
+    out = Path(args.out)
+    extract = extract_to_parquet if out.suffix == ".parquet" else extract_to_csv
+    try:
+        extract(
+            connection,
+            QUERY,
+            out,
+            (args.employee_type,),
+            batch_size=args.batch_size,
+        )
+    finally:
+        connection.close()
 
 
 if __name__ == "__main__":
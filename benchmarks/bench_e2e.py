@@ -0,0 +1,217 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from benchmarks.ibmi_standin import Delays, StandInServer  # noqa: E402
+from ibmi_transfer import IBMiSession  # noqa: E402
+from src import datagen  # noqa: E402
+from src.history import format_table, percentile  # noqa: E402
+from src.ibmi_client import IBMiClient  # noqa: E402
+from src.metrics import RECORDER  # noqa: E402
+from src.replay import Recording  # noqa: E402
+from src.utils import Config  # noqa: E402
+from src.workflow import run_workflow  # noqa: E402
+
+# Average bytes per generated ``emp_id,amount`` line
+_LINE_BYTES = 14
+
+
+def write_csv(path: Path, size_mb: float) -> int:
+    """Write an ``emp_id,amount`` CSV of about *size_mb* MB; return data rows."""
+    rows = max(1, int(size_mb * 1e6 / _LINE_BYTES))
+    return datagen.write_csv(path, rows, seed=1, mix=datagen.Mix(negative=0.2)).rows
+
+
+def make_config(server: StandInServer, ifs_dir: str, poll: float) -> Config:
+    """Return a workflow config pointing at *server*."""
+    return Config(
+        host="127.0.0.1",
+        user=server.user,
+        ssh_key=None,
+        password=server.password,
+        lib_stg="BENCH",
+        ifs_dir=ifs_dir,
+        jobq="QBATCH",
+        outq="QPRINT",
+        allow_auto_hostkey=True,
+        history_db=None,
+        port=server.port,
+        poll_interval=poll,
+    )
+
+
+def _summary(name: str, samples: list[float], **extra) -> dict:
+    return {
+        "op": name,
+        "n": len(samples),
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        **extra,
+    }
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_round_trips(cfg: Config, n: int) -> list[dict]:
+    """Handshake, exec and SFTP stat round trips of :class:`IBMiClient`."""
+    connects = []
+    for _ in range(max(1, n // 10)):
+        client = IBMiClient(cfg)
+        connects.append(_timed(client.connect))
+        client.close()
+    with IBMiClient(cfg) as client:
+        execs = [_timed(lambda: client.ssh_run("true")) for _ in range(n)]
+        stats = [_timed(lambda: client.sftp.stat("/")) for _ in range(n)]
+    return [
+        _summary("connect", connects),
+        _summary("ssh_run", execs),
+        _summary("sftp_stat", stats),
+    ]
+
+
+def bench_throughput(
+    cfg: Config, server: StandInServer, work: Path, sizes: list[float]
+) -> list[dict]:
+    """SFTP put/get MB/s of :class:`IBMiClient` and ``IBMiSession.upload``."""
+    known_hosts = server.write_known_hosts(work / "known_hosts")
+    results = []
+    with IBMiClient(cfg) as client, IBMiSession(
+        cfg.host,
+        cfg.user,
+        password=cfg.password,
+        port=cfg.port,
+        known_hosts=known_hosts,
+    ) as session:
+        client.ensure_remote_dirs(["/tput"])
+        for size in sizes:
+            local = work / f"tput_{size:g}.csv"
+            write_csv(local, size)
+            nbytes = local.stat().st_size
+            back = work / f"back_{size:g}.csv"
+            put = _timed(partial(client.sftp_put, local, f"/tput/{local.name}"))
+            get = _timed(partial(client.sftp_get, f"/tput/{local.name}", back))
+            upload = _timed(partial(session.upload, local, "/tput", retries=1))
+            mb = nbytes / 1e6
+            results.append(
+                {
+                    "size_mb": mb,
+                    "client_put_mb_s": mb / put,
+                    "client_get_mb_s": mb / get,
+                    "session_upload_mb_s": mb / upload,
+                }
+            )
+    return results
+
+
+def bench_workflow(
+    server: StandInServer, work: Path, sizes: list[float], runs: int, poll: float
+) -> list[dict]:
+    """End-to-end ``run_workflow`` latency and per-phase p50 per file size."""
+    results = []
+    run_no = 0
+    for size in sizes:
+        src_dir = work / f"wf_{size:g}"
+        src_dir.mkdir()
+        data = src_dir / "data.csv"
+        rows = write_csv(data, size)
+        totals, phases = [], {}
+        for _ in range(runs):
+            run_no += 1
+            cfg = make_config(server, f"/stg/run{run_no}", poll)
+            totals.append(_timed(partial(run_workflow, data, cfg, sync=True)))
+            for span in RECORDER.report()["phases"]:
+                phases.setdefault(span["name"], []).append(span["seconds"])
+        results.append(
+            _summary(
+                f"run_workflow {size:g}MB",
+                totals,
+                rows=rows,
+                **{f"{k}_ms": percentile(v, 0.5) * 1000 for k, v in phases.items()},
+            )
+        )
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark against an in-process IBM i stand-in"
+    )
+    parser.add_argument(
+        "--sizes", default="1,10,50", help="Comma-separated file sizes in MB"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Workflow runs per size")
+    parser.add_argument("--round-trips", type=int, default=50)
+    parser.add_argument("--exec-delay", type=float, default=0.0)
+    parser.add_argument("--sql-delay", type=float, default=0.0)
+    parser.add_argument("--queue-delay", type=float, default=0.0)
+    parser.add_argument("--job-delay", type=float, default=0.1)
+    parser.add_argument("--job-per-mb", type=float, default=0.0)
+    parser.add_argument(
+        "--recording",
+        metavar="FILE",
+        help="Take exec/SQL/job delays from a 'runner --record' file",
+    )
+    parser.add_argument("--poll", type=float, default=0.05, help="Marker poll seconds")
+    parser.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    # clients dropped mid-benchmark make the server transports log resets
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+    sizes = [float(s) for s in args.sizes.split(",") if s]
+    delays = Delays(
+        exec=args.exec_delay,
+        runsqlstm=args.sql_delay,
+        job_queue=args.queue_delay,
+        job_run=args.job_delay,
+        job_per_mb=args.job_per_mb,
+    )
+    if args.recording:
+        delays = Delays.from_recording(Recording.load(args.recording))
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="ibmi-bench-") as tmp:
+        work = Path(tmp)
+        # run_workflow syncs ``ibmi/`` and fetches into ``outputs/`` relative
+        # to the working directory, so run from a scratch copy
+        shutil.copytree(REPO / "ibmi", work / "ibmi")
+        os.chdir(work)
+        try:
+            with StandInServer(work / "ifs", delays=delays) as server:
+                cfg = make_config(server, "/stg", args.poll)
+                results = {
+                    "round_trips": bench_round_trips(cfg, args.round_trips),
+                    "throughput": bench_throughput(cfg, server, work, sizes),
+                    "workflow": bench_workflow(
+                        server, work, sizes, args.runs, args.poll
+                    ),
+                }
+        finally:
+            os.chdir(cwd)
+    for name, rows in results.items():
+        print(f"== {name} ==")
+        print(format_table(rows))
+        print()
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
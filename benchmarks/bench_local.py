@@ -0,0 +1,316 @@
+import argparse
+import gc
+import itertools
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from src import datagen  # noqa: E402
+from src.history import format_table  # noqa: E402
+from src.ibmi_client import _sanitize_parts  # noqa: E402
+from src.progress import ProgressTracker  # noqa: E402
+from src.utils import sha256_file, sniff_csv, xlsx_to_csv  # noqa: E402
+
+BASELINE = Path(__file__).with_name("baselines.json")
+# Below this many seconds timer noise dominates, so never flag a regression
+_NOISE_FLOOR = 0.005
+# Commands the workflow sends, used for the ``_sanitize_parts`` case
+_COMMANDS = (
+    "system \"RUNSQLSTM SRCSTMF('/ifs/scripts/setup.sql') "
+    "SETVAR((LIB_STG 'LIB')) COMMIT(*NONE) NAMING(*SQL)\"",
+    "system \"SBMJOB CMD(CALL PGM(LIB/PROCESS) PARM('LIB' '/ifs' 'QPRINT' "
+    "'FULL')) JOBQ(QSYSNOMAX)\"",
+    "true",
+)
+
+
+class Skip(Exception):
+    """Raised by a case setup when it cannot run here (e.g. missing extra)."""
+
+
+@dataclass
+class Case:
+    """One micro-benchmark: *setup* builds inputs and returns the timed call."""
+
+    name: str
+    setup: Callable[[Path, int], tuple[Callable[[], object], int]]
+    max_rows: int = 10_000_000
+
+
+# Like ``examples/payroll_mock.csv``: mostly positive, some negative amounts
+MIX = datagen.Mix(negative=0.2)
+
+
+def make_csv(path: Path, rows: int) -> Path:
+    """Write *rows* ``emp_id,amount`` records shaped like ``payroll_mock.csv``."""
+    datagen.write_csv(path, rows, seed=rows, mix=MIX)
+    return path
+
+
+def _rows(n: int) -> list[list]:
+    return [list(datagen.HEADER)] + [
+        [float(emp_id), float(amount)]
+        for _, emp_id, amount in datagen.iter_rows(n, seed=n, mix=MIX)
+    ]
+
+
+class _Sheet:
+    """Minimal in-memory stand-in for an ``xlrd`` sheet."""
+
+    def __init__(self, rows: list[list]) -> None:
+        self._rows = rows
+        self.nrows = len(rows)
+
+    def row_values(self, i: int) -> list:
+        return self._rows[i]
+
+
+def _payroll_utils():
+    try:
+        import payroll_utils
+    except ImportError as exc:
+        raise Skip(str(exc)) from None
+    return payroll_utils
+
+
+def _setup_sniff(work: Path, rows: int):
+    path = make_csv(work / f"sniff_{rows}.csv", rows)
+    return (lambda: sniff_csv(path)), path.stat().st_size
+
+
+def _setup_sha256(work: Path, rows: int):
+    path = make_csv(work / f"sha_{rows}.csv", rows)
+    return (lambda: sha256_file(path)), path.stat().st_size
+
+
+def _setup_xlsx(work: Path, rows: int):
+    src = work / f"in_{rows}.xlsx"
+    try:
+        datagen.write_xlsx(src, rows, seed=rows, mix=MIX)
+    except RuntimeError as exc:
+        raise Skip(str(exc)) from None
+    out = work / f"xlsx_{rows}.csv"
+    return (lambda: xlsx_to_csv(src, out)), src.stat().st_size
+
+
+def _setup_sheet(work: Path, rows: int):
+    write = _payroll_utils()._write_sheet_to_csv
+    sheet = _Sheet(_rows(rows))
+    out = str(work / f"sheet_{rows}.csv")
+    return (lambda: write(sheet, out)), 0
+
+
+def _setup_csv_from_excel(work: Path, rows: int):
+    utils = _payroll_utils()
+    src = work / f"in_{rows}.xls"
+    try:
+        datagen.write_xls(src, rows, seed=rows, mix=MIX)
+    except RuntimeError as exc:
+        raise Skip(str(exc)) from None
+    out = str(work / f"excel_{rows}.csv")
+    return (lambda: utils.csv_from_excel(str(src), out)), src.stat().st_size
+
+
+def _setup_sanitize(work: Path, rows: int):
+    commands = list(itertools.islice(itertools.cycle(_COMMANDS), rows))
+
+    def run() -> None:
+        for cmd in commands:
+            _sanitize_parts(cmd)
+
+    return run, 0
+
+
+def _setup_progress(work: Path, rows: int):
+    # one paramiko callback per 32KiB block: 1M rows ~ a 32GB transfer
+    block = 32_768
+    total = rows * block
+
+    def run() -> None:
+        tracker = ProgressTracker(lambda p: None, "bench")
+        for i in range(1, rows + 1):
+            tracker(i * block, total)
+
+    return run, 0
+
+
+CASES = {
+    case.name: case
+    for case in (
+        Case("sniff_csv", _setup_sniff),
+        Case("sha256_file", _setup_sha256),
+        Case("xlsx_to_csv", _setup_xlsx, max_rows=1_048_575),
+        Case("_write_sheet_to_csv", _setup_sheet, max_rows=1_000_000),
+        Case("csv_from_excel", _setup_csv_from_excel, max_rows=65_535),
+        Case("_sanitize_parts", _setup_sanitize, max_rows=100_000),
+        Case("progress_callback", _setup_progress),
+    )
+}
+
+
+def measure(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return best-of-*repeat* seconds and the peak traced MB of one call."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def run_cases(
+    names: list[str], row_counts: list[int], work: Path, repeat: int
+) -> list[dict]:
+    """Run each case at each row count that it supports."""
+    results = []
+    for name in names:
+        case = CASES[name]
+        for rows in row_counts:
+            if rows > case.max_rows:
+                continue
+            row = {"case": name, "rows": rows}
+            try:
+                fn, nbytes = case.setup(work, rows)
+            except Skip as exc:
+                results.append({**row, "skipped": str(exc)})
+                break
+            seconds, peak_mb = measure(fn, repeat)
+            results.append(
+                {
+                    **row,
+                    "seconds": seconds,
+                    "rows_per_s": rows / seconds if seconds else 0.0,
+                    "mb_per_s": nbytes / 1e6 / seconds if seconds else 0.0,
+                    "peak_mb": peak_mb,
+                }
+            )
+            for path in work.iterdir():
+                path.unlink()
+    return results
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Annotate *results* against *baseline* and return regression messages."""
+    regressions = []
+    for row in results:
+        if "seconds" not in row:
+            continue
+        row.update(base_s="-", change="-")
+        base = baseline.get(f"{row['case']}@{row['rows']}")
+        if base is None:
+            continue
+        row["base_s"] = base["seconds"]
+        row["change"] = f"{row['seconds'] / base['seconds'] - 1:+.0%}"
+        slower = row["seconds"] > base["seconds"] * (1 + threshold)
+        if slower and row["seconds"] - base["seconds"] > _NOISE_FLOOR:
+            regressions.append(
+                f"{row['case']}@{row['rows']}: {row['seconds']:.4f}s vs "
+                f"baseline {base['seconds']:.4f}s"
+            )
+        if row["peak_mb"] > base["peak_mb"] * (1 + threshold) + 1:
+            regressions.append(
+                f"{row['case']}@{row['rows']}: peak {row['peak_mb']:.1f}MB vs "
+                f"baseline {base['peak_mb']:.1f}MB"
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())["results"]
+
+
+def save_baseline(path: Path, results: list[dict]) -> None:
+    """Merge measured *results* into the baseline file at *path*."""
+    merged = load_baseline(path)
+    for row in results:
+        if "seconds" in row:
+            merged[f"{row['case']}@{row['rows']}"] = {
+                "seconds": round(row["seconds"], 6),
+                "peak_mb": round(row["peak_mb"], 3),
+            }
+    payload = {
+        "python": sys.version.split()[0],
+        "results": dict(sorted(merged.items())),
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks for local file preparation hot paths"
+    )
+    parser.add_argument(
+        "--rows",
+        default="1000,100000,1000000",
+        help="Comma-separated row counts (1K up to 10M)",
+    )
+    parser.add_argument(
+        "--cases", default=",".join(CASES), help="Comma-separated case names"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N timings")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument(
+        "--check", action="store_true", help="Exit 1 if slower than the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown/growth before --check fails (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Record these results"
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    names = [n for n in args.cases.split(",") if n]
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))}")
+    row_counts = [int(float(r)) for r in args.rows.split(",") if r]
+    with tempfile.TemporaryDirectory(prefix="ibmi-bench-") as tmp:
+        results = run_cases(names, row_counts, Path(tmp), args.repeat)
+    baseline_path = Path(args.baseline)
+    regressions = compare(results, load_baseline(baseline_path), args.threshold)
+    measured = [r for r in results if "seconds" in r]
+    print(format_table(measured))
+    for row in results:
+        if "skipped" in row:
+            print(f"skipped {row['case']}: {row['skipped']}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        save_baseline(baseline_path, results)
+        print(f"baseline updated: {baseline_path}")
+    if args.check and regressions:
+        print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
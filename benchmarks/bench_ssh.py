@@ -0,0 +1,116 @@
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from benchmarks.bench_e2e import make_config, write_csv  # noqa: E402
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from ibmi_transfer import IBMiSession  # noqa: E402
+from src.history import format_table, percentile  # noqa: E402
+from src.ibmi_client import IBMiClient  # noqa: E402
+from src.sshtune import PROFILES, TransportProfile  # noqa: E402
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_profile(
+    server: StandInServer,
+    profile: TransportProfile,
+    data: Path,
+    work: Path,
+    samples: int,
+) -> dict:
+    """Handshake p50, negotiated algorithms and put/get MB/s for *profile*."""
+    cfg = replace(make_config(server, "/prof", 0.05), ssh_profile=profile)
+    handshakes = []
+    for _ in range(samples):
+        client = IBMiClient(cfg)
+        handshakes.append(_timed(client.connect))
+        client.close()
+    mb = data.stat().st_size / 1e6
+    back = work / f"back_{profile.name}.csv"
+    with IBMiClient(cfg) as client:
+        transport = client.client.get_transport()
+        client.ensure_remote_dirs(["/prof"])
+        remote = f"/prof/{data.name}"
+        put = min(_timed(lambda: client.sftp_put(data, remote)) for _ in range(3))
+        get = min(_timed(lambda: client.sftp_get(remote, back)) for _ in range(3))
+        row = {
+            "profile": profile.name,
+            "cipher": transport.remote_cipher,
+            # AES-GCM authenticates itself; the negotiated MAC goes unused
+            "mac": "aead" if "gcm" in transport.remote_cipher else transport.remote_mac,
+            "connect_p50_ms": percentile(handshakes, 0.5) * 1000,
+            "put_mb_s": mb / put,
+            "get_mb_s": mb / get,
+        }
+    with IBMiSession(
+        cfg.host,
+        cfg.user,
+        password=cfg.password,
+        port=cfg.port,
+        known_hosts=server.write_known_hosts(work / "known_hosts"),
+        profile=profile,
+    ) as session:
+        row["session_upload_mb_s"] = mb / _timed(lambda: session.upload(data, "/prof"))
+    return row
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare SSH transport profiles against the IBM i stand-in"
+    )
+    parser.add_argument(
+        "--profiles", default=",".join(PROFILES), help="Comma-separated names"
+    )
+    parser.add_argument("--size-mb", type=float, default=20.0)
+    parser.add_argument("--samples", type=int, default=5, help="Handshakes each")
+    parser.add_argument(
+        "--server-disable-ciphers",
+        default="",
+        help="Ciphers the stand-in refuses, to emulate an older sshd",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+    names = [n for n in args.profiles.split(",") if n]
+    unknown = set(names) - set(PROFILES)
+    if unknown:
+        raise SystemExit(f"Unknown profiles: {', '.join(sorted(unknown))}")
+    disabled = [c for c in args.server_disable_ciphers.split(",") if c]
+    with tempfile.TemporaryDirectory(prefix="ibmi-bench-") as tmp:
+        work = Path(tmp)
+        data = work / "payload.csv"
+        write_csv(data, args.size_mb)
+        with StandInServer(
+            work / "ifs",
+            disabled_algorithms={"ciphers": disabled} if disabled else None,
+        ) as server:
+            results = [
+                bench_profile(server, PROFILES[name], data, work, args.samples)
+                for name in names
+            ]
+    print(format_table(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from src.history import format_table, percentile  # noqa: E402
+
+# Modules the CLI must not import unless the run needs them
+HEAVY = ("pandas", "numpy", "paramiko", "cryptography", "openpyxl", "xlrd", "pyodbc")
+SCENARIOS = {
+    "help": ["--help"],
+    "dry-run csv": ["--file", "data.csv", "--dry-run"],
+    "teardown": ["--teardown", "--dry-run", "--file", "data.csv"],
+}
+# Runs ``src.runner`` like ``-m`` and writes the heavy modules it loaded
+_PROBE = """\
+import atexit, json, runpy, sys
+out = sys.argv.pop(1)
+heavy = {heavy!r}
+atexit.register(
+    lambda: open(out, "w").write(json.dumps([m for m in heavy if m in sys.modules]))
+)
+sys.argv[0] = "src.runner"
+runpy.run_module("src.runner", run_name="__main__", alter_sys=True)
+"""
+
+
+def bench_env() -> dict[str, str]:
+    """Environment for a dry run that needs no real IBM i or ``.env``."""
+    env = dict(os.environ)
+    env.update(
+        PYTHONPATH=str(REPO),
+        IBMI_HOST="bench.invalid",
+        IBMI_USER="bench",
+        LIB_STG="BENCH",
+        IFS_STAGING_DIR="/bench",
+        IBMI_HISTORY_DB="",
+    )
+    return env
+
+
+def run_once(args: list[str], cwd: Path) -> float:
+    """Return wall seconds of ``python -m src.runner *args``."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.runner", *args],
+        cwd=cwd,
+        env=bench_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return time.perf_counter() - start
+
+
+def heavy_imports(args: list[str], cwd: Path) -> list[str]:
+    """Return the :data:`HEAVY` modules a ``src.runner`` run imports."""
+    out = cwd / "probe.json"
+    subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY), str(out), *args],
+        cwd=cwd,
+        env=bench_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return json.loads(out.read_text())
+
+
+def prepare(work: Path) -> None:
+    (work / "data.csv").write_text("emp_id,amount\n1001,100.00\n1002,-5.25\n")
+
+
+def _timed_python(cwd: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], cwd=cwd, check=False)
+    return time.perf_counter() - start
+
+
+def _row(name: str, samples: list[float], heavy: list[str]) -> dict:
+    return {
+        "scenario": name,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "min_ms": min(samples) * 1000,
+        "heavy": ",".join(heavy) or "-",
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CLI startup time of src.runner")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per scenario")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if a scenario imports pandas, paramiko or an Excel reader",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ibmi-bench-") as tmp:
+        work = Path(tmp)
+        prepare(work)
+        floor = [_timed_python(work) for _ in range(args.runs)]
+        results.append(_row("python -c pass", floor, []))
+        for name, cli in SCENARIOS.items():
+            samples = [run_once(cli, work) for _ in range(args.runs)]
+            results.append(_row(name, samples, heavy_imports(cli, work)))
+    print(format_table(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    offenders = [r for r in results if r["heavy"] != "-"]
+    if args.check and offenders:
+        for row in offenders:
+            print(f"{row['scenario']} imports {row['heavy']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,401 @@
+import errno
+import itertools
+import logging
+import os
+import re
+import shlex
+import shutil
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+
+import paramiko
+
+_SRCSTMF = re.compile(r"SRCSTMF\('([^']+)'\)", re.IGNORECASE)
+_PARM = re.compile(r"PARM\(((?:'[^']*'\s*)+)\)", re.IGNORECASE)
+_JOBQ = re.compile(r"JOBQ\(([^)]+)\)", re.IGNORECASE)
+_JOB = re.compile(r"JOB\((\d{6})/([^/)]+)/([^)]+)\)", re.IGNORECASE)
+
+
+@dataclass
+class Delays:
+    """Simulated IBM i latencies in seconds."""
+
+    exec: float = 0.0
+    runsqlstm: float = 0.0
+    job_queue: float = 0.0
+    job_run: float = 0.0
+    job_per_mb: float = 0.0
+
+    @classmethod
+    def from_recording(cls, recording) -> "Delays":
+        """Derive delays from a :class:`src.replay.Recording` of a real run."""
+        submits = recording.latencies("ssh_run:SBMJOB")
+        sqls = recording.latencies("ssh_run:RUNSQLSTM")
+        exec_rtt = median(submits) if submits else 0.0
+        return cls(
+            exec=exec_rtt,
+            runsqlstm=max(0.0, median(sqls) - exec_rtt) if sqls else 0.0,
+            job_queue=recording.marker_delay,
+        )
+
+
+def _qdatetime() -> str:
+    """Local time as ``RTVSYSVAL QDATETIME`` returns it."""
+    return datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+
+class _IFS(paramiko.SFTPServerInterface):
+    """SFTP view of a local directory standing in for the IFS."""
+
+    def __init__(self, server, *args, root: Path, **kwargs) -> None:
+        super().__init__(server, *args, **kwargs)
+        self.root = root
+
+    def _path(self, path: str) -> str:
+        resolved = (self.root / path.lstrip("/")).resolve()
+        if resolved != self.root and self.root not in resolved.parents:
+            raise PermissionError(errno.EACCES, "outside IFS root", path)
+        return str(resolved)
+
+    def list_folder(self, path):
+        try:
+            real = self._path(path)
+            out = []
+            for name in os.listdir(real):
+                attr = paramiko.SFTPAttributes.from_stat(
+                    os.stat(os.path.join(real, name))
+                )
+                attr.filename = name
+                out.append(attr)
+            return out
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._path(path)))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        try:
+            real = self._path(path)
+            fd = os.open(real, flags | getattr(os, "O_BINARY", 0), 0o644)
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+        if flags & os.O_WRONLY:
+            mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            mode = "rb"
+        handle = _Handle(flags)
+        fh = os.fdopen(fd, mode)
+        handle.filename = real
+        handle.readfile = fh
+        handle.writefile = fh
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(self._path(path))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+        return paramiko.SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        try:
+            os.replace(self._path(oldpath), self._path(newpath))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+        return paramiko.SFTP_OK
+
+    posix_rename = rename
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._path(path))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+        return paramiko.SFTP_OK
+
+    def rmdir(self, path):
+        try:
+            os.rmdir(self._path(path))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+        return paramiko.SFTP_OK
+
+    def chattr(self, path, attr):
+        return paramiko.SFTP_OK
+
+
+class _Handle(paramiko.SFTPHandle):
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+
+    def chattr(self, attr):
+        return paramiko.SFTP_OK
+
+
+class _Session(paramiko.ServerInterface):
+    def __init__(self, standin: "StandInServer") -> None:
+        self.standin = standin
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (self.standin.user, self.standin.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(
+            target=self.standin._exec,
+            args=(channel, command.decode("utf-8", "replace")),
+            daemon=True,
+        ).start()
+        return True
+
+
+class StandInServer:
+    """In-process SSH/SFTP server that behaves like the IBM i side.
+
+    SFTP is served from *root*, which stands in for the IFS. ``system``
+    commands emulate ``RUNSQLSTM`` (the SQL script must exist), a
+    synchronous ``CALL`` and ``SBMJOB ... CALL PGM(<lib>/PROCESS)``: after
+    the queue and run delays the fake job reads ``in/data.csv``, writes
+    ``out/data_result.csv`` or ``out/data_delta.csv`` and drops a
+    ``run/RUN<timestamp>.status`` marker with per-phase timings, mirroring
+    ``ibmi/process.clp``.
+    ``ENDJOB JOB(nnnnnn/user/PROCESS)`` ends such a job before it writes
+    anything.
+    *disabled_algorithms* (as for :class:`paramiko.Transport`) emulates
+    an older sshd, e.g. one without AES-GCM. Use as a context manager;
+    :attr:`port` is chosen by the OS.
+    """
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        *,
+        user: str = "bench",
+        password: str = "bench",
+        delays: Delays | None = None,
+        host_key: paramiko.PKey | None = None,
+        disabled_algorithms: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.user = user
+        self.password = password
+        self.delays = delays or Delays()
+        self.host_key = host_key or paramiko.RSAKey.generate(2048)
+        self.disabled_algorithms = disabled_algorithms
+        self.port = 0
+        self.commands: list[str] = []
+        self._jobs = itertools.count(1)
+        self.ended: dict[int, threading.Event] = {}
+        self._sock: socket.socket | None = None
+        self._transports: list[paramiko.Transport] = []
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self.log = logging.getLogger(__name__)
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Listen on an ephemeral localhost port and accept in the background."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        accept = threading.Thread(target=self._accept, daemon=True)
+        accept.start()
+        self._threads.append(accept)
+
+    def stop(self) -> None:
+        """Close the listener, every transport and wait for running jobs."""
+        self._stopping.set()
+        if self._sock is not None:
+            try:
+                # unblocks accept() on Linux, where close() alone does not
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        for transport in self._transports:
+            transport.close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def write_known_hosts(self, path: str | os.PathLike[str]) -> str:
+        """Write a ``known_hosts`` file trusting this server and return it."""
+        keys = paramiko.HostKeys()
+        keys.add(f"[127.0.0.1]:{self.port}", self.host_key.get_name(), self.host_key)
+        keys.save(str(path))
+        return str(path)
+
+    def _accept(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = paramiko.Transport(
+                conn, disabled_algorithms=self.disabled_algorithms
+            )
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler(
+                "sftp", paramiko.SFTPServer, _IFS, root=self.root
+            )
+            self._transports.append(transport)
+            try:
+                transport.start_server(server=_Session(self))
+            except (paramiko.SSHException, EOFError) as exc:
+                self.log.debug("handshake failed: %s", exc)
+
+    def _ifs(self, path: str) -> Path:
+        return self.root / path.lstrip("/")
+
+    def _exec(self, channel: paramiko.Channel, command: str) -> None:
+        self.commands.append(command)
+        try:
+            time.sleep(self.delays.exec)
+            rc, out, err = self.run_command(command)
+            if out:
+                channel.sendall(out.encode())
+            if err:
+                channel.sendall_stderr(err.encode())
+            channel.send_exit_status(rc)
+        finally:
+            channel.close()
+
+    def run_command(self, command: str) -> tuple[int, str, str]:
+        """Emulate *command* and return ``(rc, stdout, stderr)``."""
+        argv = shlex.split(command)
+        if argv == ["true"]:
+            return 0, "", ""
+        if len(argv) != 2 or argv[0] != "system":
+            return 127, "", f"qsh: 001-0019 Error found searching for {argv[0]}.\n"
+        cl = argv[1].strip()
+        verb = cl.split(None, 1)[0].upper()
+        if verb == "RUNSQLSTM":
+            return self._runsqlstm(cl)
+        if verb == "SBMJOB":
+            return self._sbmjob(cl)
+        if verb == "ENDJOB":
+            return self._endjob(cl)
+        if verb == "CALL":
+            time.sleep(self.delays.job_run)
+            return 0, "", ""
+        return 1, "", f"CPD0030: Command {verb} in library *LIBL not found.\n"
+
+    def _runsqlstm(self, cl: str) -> tuple[int, str, str]:
+        match = _SRCSTMF.search(cl)
+        if not match or not self._ifs(match.group(1)).is_file():
+            stmf = match.group(1) if match else "?"
+            return 1, "", f"CPFA0A9: Object not found.  Object is {stmf}.\n"
+        time.sleep(self.delays.runsqlstm)
+        return 0, "", ""
+
+    def _sbmjob(self, cl: str) -> tuple[int, str, str]:
+        match = _PARM.search(cl)
+        if not match or "/PROCESS" not in cl.upper():
+            return 1, "", "CPD0043: Program to be called not found.\n"
+        parms = re.findall(r"'([^']*)'", match.group(1))
+        if len(parms) != 4:
+            return 1, "", "CPD0172: Parameters passed on CALL do not match.\n"
+        _, ifs_dir, _, export = parms
+        jobq = _JOBQ.search(cl)
+        number = next(self._jobs)
+        self.ended[number] = threading.Event()
+        job = threading.Thread(
+            target=self._process, args=(ifs_dir, export.strip(), number), daemon=True
+        )
+        job.start()
+        self._threads.append(job)
+        queue = jobq.group(1) if jobq else "QBATCH"
+        return (
+            0,
+            f"CPC1221: Job {number:06d}/{self.user.upper()}/PROCESS submitted "
+            f"to job queue {queue} in library *LIBL.\n",
+            "",
+        )
+
+    def _endjob(self, cl: str) -> tuple[int, str, str]:
+        match = _JOB.search(cl)
+        number = int(match.group(1)) if match else 0
+        name = "/".join(match.groups()) if match else "?"
+        if number not in self.ended:
+            return 1, "", f"CPF1321: Job {name} not found.\n"
+        if self.ended[number].is_set():
+            return 1, "", f"CPF1362: Job {name} has completed.\n"
+        self.ended[number].set()
+        return 0, f"Job {name} ended.\n", ""
+
+    def _process(self, ifs_dir: str, export: str, number: int = 0) -> None:
+        """Body of ``PROCESS``: import, apply, export and write the marker."""
+        ended = self.ended.setdefault(number, threading.Event())
+        if ended.wait(self.delays.job_queue):
+            return
+        stamp = time.strftime("%Y%m%d%H%M%S")
+        src = self._ifs(f"{ifs_dir}/in/data.csv")
+        lines = []
+
+        def log_phase(name: str, start: str, rows: int, ok: bool = True) -> None:
+            lines.append(
+                f"phase={name} start={start} end={_qdatetime()} "
+                f"rows={rows:010d} ok={int(ok)}"
+            )
+
+        status = "FAILED"
+        start = _qdatetime()
+        if not src.is_file():
+            log_phase("import", start, 0, ok=False)
+        else:
+            size_mb = src.stat().st_size / 1e6
+            rows = src.read_bytes().count(b"\n")
+            if ended.wait(self.delays.job_per_mb * size_mb):
+                return
+            log_phase("import", start, rows)
+            start = _qdatetime()
+            if ended.wait(self.delays.job_run):
+                return
+            log_phase("apply", start, rows)
+            start = _qdatetime()
+            name = "data_delta.csv" if export == "DELTA" else "data_result.csv"
+            out = self._ifs(f"{ifs_dir}/out/{name}")
+            out.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, out)
+            log_phase("export", start, rows)
+            status = "SUCCESS"
+        marker = self._ifs(f"{ifs_dir}/run/RUN{stamp}.status")
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        tmp = marker.with_suffix(".tmp")
+        tmp.write_text("\n".join([status, *lines]) + "\n")
+        os.replace(tmp, marker)
+        ended.set()
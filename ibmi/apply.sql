@@ -4,6 +4,7 @@ SET SCHEMA &LIB_STG;
 
 TRUNCATE TABLE &LIB_STG.RAC_STG_VALID;
 TRUNCATE TABLE &LIB_STG.RAC_STG_REJECTS;
+TRUNCATE TABLE &LIB_STG.RAC_RUN_DELTA;
 
 -- Simple parsing example: assume CSV format 'id,amount'
 INSERT INTO &LIB_STG.RAC_STG_VALID (ID, AMOUNT)
@@ -21,8 +22,22 @@ LEFT JOIN &LIB_STG.RAC_STG_VALID sv
   ON sv.ID = CAST(SUBSTRING(si.RAW_LINE, 1, LOCATE(',', si.RAW_LINE) - 1) AS INT)
 WHERE sv.ID IS NULL;
 
+-- DIRECT LOAD START: the statements below are also executed over ODBC by
+-- src/direct_load.py after it bulk-inserts RAC_STG_VALID/RAC_STG_REJECTS.
+
+-- Capture the rows this run touches before applying them so a delta export
+-- only needs to read RAC_RUN_DELTA instead of the whole shadow table
+INSERT INTO &LIB_STG.RAC_RUN_DELTA (ACTION, ID, AMOUNT)
+SELECT CASE WHEN T.ID IS NULL THEN 'I' ELSE 'U' END, S.ID, S.AMOUNT
+FROM &LIB_STG.RAC_STG_VALID S
+LEFT JOIN &LIB_STG.RAC_SHADOW_PAYROLL T ON T.ID = S.ID;
+
+INSERT INTO &LIB_STG.RAC_RUN_DELTA (ACTION, RAW_LINE, REASON)
+SELECT 'R', RAW_LINE, REASON
+FROM &LIB_STG.RAC_STG_REJECTS;
+
 -- Update existing rows then insert new ones to avoid MERGE for compatibility
-UPDATE &LIB_STG.RAC_SHADOW_PAYROLL T
+UPDATE &LIB_STG.RAC_SHADOW_PAYROLL AS T
 SET AMOUNT = (
     SELECT S.AMOUNT FROM &LIB_STG.RAC_STG_VALID S WHERE S.ID = T.ID
 )
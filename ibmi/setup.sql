@@ -23,6 +23,15 @@ CREATE TABLE IF NOT EXISTS RAC_SHADOW_PAYROLL (
     AMOUNT DECIMAL(9,2)
 );
 
+-- Rows touched by the latest apply run: I=inserted, U=updated, R=rejected
+CREATE TABLE IF NOT EXISTS RAC_RUN_DELTA FOR SYSTEM NAME RUN_DELTA (
+    ACTION CHAR(1) NOT NULL,
+    ID INT,
+    AMOUNT DECIMAL(9,2),
+    RAW_LINE VARCHAR(512),
+    REASON VARCHAR(128)
+);
+
 CREATE TABLE IF NOT EXISTS RAC_RUN_LOG (
     RUN_TS TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     STATUS VARCHAR(7),
@@ -12,12 +12,27 @@ import os
 import re
 import shlex
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-import paramiko
+from src.lazy import LazyModule
+from src.progress import Progress, ProgressTracker, chain
+from src.ratelimit import TokenBucket
+from src.retry import (
+    RetryMetrics,
+    RetryPolicy,
+    TransferTracker,
+    resume_put,
+    retry_call,
+)
+from src.sshtune import TransportProfile, profile_from_env
+
+# Loaded on first connect; the GUIs and --dry-run never need it
+paramiko = LazyModule("paramiko")
 
 _SAFE_PATH = re.compile(r"^[A-Za-z0-9_./-]+$")
 _SAFE_HOST = re.compile(r"^[A-Za-z0-9_.-]+$")
+# Argument of ``system``: one CL command such as ``CALL PGM(LIB/PGM)``
+_SAFE_CL = re.compile(r"^[A-Za-z0-9_./*'() -]+$")
 # Block common shell separators including newlines to avoid command injection
 _UNSAFE_SEP = re.compile(r"[;&|\r\n]")
 
@@ -32,8 +47,9 @@ def _sanitize_parts(cmd: str | list[str]) -> list[str]:
         parts = list(cmd)
     if not parts:
         raise ValueError("Empty command")
-    for part in parts:
-        if _UNSAFE_SEP.search(part) or not _SAFE_PATH.match(part):
+    for i, part in enumerate(parts):
+        pattern = _SAFE_CL if i and parts[0] == "system" else _SAFE_PATH
+        if _UNSAFE_SEP.search(part) or not pattern.match(part):
             raise ValueError(f"Unsafe command argument: {part}")
     return parts
 
@@ -42,11 +58,13 @@ class TransferError(RuntimeError):
     """Raised when a network command returns a non-success status."""
 
 
-def _init_client() -> paramiko.SSHClient:
+def _init_client(known_hosts: Optional[str] = None) -> paramiko.SSHClient:
     """Return an SSH client with host-key policies set."""
     client = paramiko.SSHClient()
     try:
         client.load_system_host_keys()
+        if known_hosts:
+            client.load_host_keys(known_hosts)
         client.set_missing_host_key_policy(paramiko.RejectPolicy())
     except NotImplementedError:
         # Some client implementations may not support host key functions
@@ -62,6 +80,196 @@ def _safe_close(obj) -> None:
         logging.getLogger(__name__).debug("close failed: %s", exc)
 
 
+class IBMiSession:
+    """One authenticated SSH transport shared by SFTP uploads and commands.
+
+    Opening a session costs a single handshake; :meth:`upload` and
+    :meth:`run` then reuse it. Use as a context manager to connect and close.
+    *profile* tunes the transport; by default it comes from
+    ``IBMI_SSH_PROFILE`` and related variables like ``load_config``.
+    *retry_policy* governs how transient connect failures are retried.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        *,
+        password: Optional[str] = None,
+        key_path: Optional[str] = None,
+        port: int = 22,
+        known_hosts: Optional[str] = None,
+        profile: Optional[TransportProfile] = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        if not _SAFE_HOST.match(host) or not _SAFE_HOST.match(user):
+            raise ValueError("Unsafe host or user")
+        self.host = host
+        self.user = user
+        self.password = password
+        self.key_path = key_path
+        self.port = port
+        self.known_hosts = known_hosts
+        self.profile = profile if profile is not None else profile_from_env()
+        self.client: paramiko.SSHClient | None = None
+        self._sftp: paramiko.SFTPClient | None = None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_metrics = RetryMetrics()
+
+    def __enter__(self) -> "IBMiSession":
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def connect(self) -> None:
+        """Authenticate, retrying transient failures per :attr:`retry_policy`.
+
+        Host keys come from the system ``known_hosts`` plus *known_hosts*
+        if given; unknown hosts are rejected.
+        """
+        retry_call(
+            self._open,
+            self.retry_policy,
+            metrics=self.retry_metrics,
+            what=f"SSH connect to {self.host}",
+        )
+
+    def _open(self) -> None:
+        """Create the SSH client and authenticate with the key and/or password."""
+        kwargs: dict[str, object] = {"username": self.user}
+        if self.port != 22:
+            kwargs["port"] = self.port
+        if self.key_path:
+            kwargs["key_filename"] = self.key_path
+        if self.password:
+            kwargs["password"] = self.password
+        kwargs.update(self.profile.connect_kwargs())
+        client = _init_client(self.known_hosts)
+        try:
+            client.connect(self.host, **kwargs)
+        except BaseException:
+            _safe_close(client)
+            raise
+        self.client = client
+
+    def is_active(self) -> bool:
+        """Return whether the underlying transport is still usable."""
+        if self.client is None:
+            return False
+        get_transport = getattr(self.client, "get_transport", None)
+        if get_transport is None:
+            return True
+        transport = get_transport()
+        return bool(transport and transport.is_active())
+
+    def _recover(self, exc: BaseException, attempt: int) -> None:
+        """Prepare for a retry, keeping the transport if it is still healthy."""
+        if self._sftp is not None:
+            _safe_close(self._sftp)
+            self._sftp = None
+        if self.client is not None and not self.is_active():
+            _safe_close(self.client)
+            self.client = None
+            self.retry_metrics.reconnects += 1
+
+    def _ensure_connected(self) -> None:
+        # called from inside a retried operation, so connect just once here
+        if self.client is None:
+            self._open()
+
+    def sftp(self) -> paramiko.SFTPClient:
+        """Return the session's SFTP channel, opening it on first use."""
+        if self.client is None:
+            raise RuntimeError("Session not connected")
+        if self._sftp is None:
+            self._sftp = self.client.open_sftp()
+        return self._sftp
+
+    def upload(
+        self,
+        local_path: str | os.PathLike[str],
+        remote_dir: str,
+        *,
+        retries: int = 1,
+        policy: RetryPolicy | None = None,
+        limiter: TokenBucket | None = None,
+        progress: Callable[[Progress], None] | None = None,
+    ) -> str:
+        """Upload *local_path* into *remote_dir* and return the remote path.
+
+        Transient failures are retried per *policy* (default: *retries*
+        attempts with backoff). A still-active transport is reused and
+        retries resume a partially written remote file. *limiter* caps the
+        upload rate and may be shared with other transfers; *progress*
+        receives :class:`src.progress.Progress` reports.
+        """
+        if not _SAFE_PATH.match(remote_dir):
+            raise ValueError("Unsafe remote directory")
+        path = Path(local_path)
+        remote = f"{remote_dir}/{path.name}"
+        policy = policy or RetryPolicy(max_attempts=retries)
+        tracker = TransferTracker(
+            chain(
+                limiter.callback() if limiter is not None else None,
+                ProgressTracker(progress, path.name) if progress is not None else None,
+            )
+        )
+
+        def _attempt() -> None:
+            self._ensure_connected()
+            # resume only once an attempt has confirmed writing some bytes
+            if tracker.written:
+                resume_put(
+                    self.sftp(),
+                    path,
+                    remote,
+                    self.retry_metrics,
+                    tracker,
+                    written=tracker.written,
+                )
+            else:
+                self.sftp().put(str(path), remote, callback=tracker)
+
+        try:
+            retry_call(
+                _attempt,
+                policy,
+                metrics=self.retry_metrics,
+                on_retry=self._recover,
+                what=f"SFTP upload of {path.name}",
+            )
+        except Exception as exc:  # pragma: no cover - network dependent
+            raise TransferError(f"SFTP upload failed: {exc}") from exc
+        return remote
+
+    def run(self, cmd: str | list[str]) -> str:
+        """Run *cmd* over the session and return its standard output."""
+        if self.client is None:
+            raise RuntimeError("Session not connected")
+        args = _sanitize_parts(cmd)
+        command = " ".join(shlex.quote(arg) for arg in args)
+        _, stdout, stderr = self.client.exec_command(command)  # nosec B601
+        exit_status = stdout.channel.recv_exit_status()
+        out = stdout.read().decode()
+        err = stderr.read().decode()
+        if exit_status != 0:
+            raise RuntimeError(
+                f"SSH command failed with exit code {exit_status}: {err}"
+            )
+        return out
+
+    def close(self) -> None:
+        """Close the SFTP channel and the SSH transport."""
+        if self._sftp is not None:
+            _safe_close(self._sftp)
+            self._sftp = None
+        if self.client is not None:
+            _safe_close(self.client)
+            self.client = None
+
+
 def upload_csv_via_sftp(
     host: str,
     user: str,
@@ -70,28 +278,32 @@ def upload_csv_via_sftp(
     remote_dir: str,
     *,
     retries: int = 3,
+    policy: RetryPolicy | None = None,
+    limiter: TokenBucket | None = None,
+    progress: Callable[[Progress], None] | None = None,
 ) -> None:
-    """Upload *local_path* to *remote_dir* on the IBM i server using SFTP."""
+    """Upload *local_path* to *remote_dir* on the IBM i server using SFTP.
+
+    Transient errors are retried with backoff (see :class:`RetryPolicy`);
+    authentication and host-key failures fail immediately. *limiter* caps
+    the transfer rate (see :class:`src.ratelimit.TokenBucket`) and
+    *progress* receives :class:`src.progress.Progress` reports.
+    """
     if not _SAFE_PATH.match(remote_dir):
         raise ValueError("Unsafe remote directory")
-    if not _SAFE_HOST.match(host) or not _SAFE_HOST.match(user):
-        raise ValueError("Unsafe host or user")
-    for attempt in range(1, retries + 1):
-        client = _init_client()
-        sftp = None
-        try:
-            client.connect(host, username=user, password=password)
-            sftp = client.open_sftp()
-            path = Path(local_path)
-            sftp.put(str(path), f"{remote_dir}/{path.name}")
-            return
-        except Exception as exc:  # pragma: no cover - network dependent
-            if attempt == retries:
-                raise TransferError(f"SFTP upload failed: {exc}") from exc
-        finally:
-            if sftp:
-                _safe_close(sftp)
-            _safe_close(client)
+    session = IBMiSession(host, user, password=password)
+    try:
+        # the first attempt connects; later ones only reconnect if needed
+        session.upload(
+            local_path,
+            remote_dir,
+            retries=retries,
+            policy=policy,
+            limiter=limiter,
+            progress=progress,
+        )
+    finally:
+        session.close()
 
 
 def call_program_via_ssh(
@@ -101,24 +313,8 @@ def call_program_via_ssh(
     key_path: Optional[str] = None,
 ) -> None:
     """Run *cmd* on *host* via ``ssh`` using ``paramiko``."""
-    if not _SAFE_HOST.match(host) or not _SAFE_HOST.match(user):
-        raise ValueError("Unsafe host or user")
-
-    args = _sanitize_parts(cmd)
-    command = " ".join(shlex.quote(arg) for arg in args)
-
-    client = _init_client()
-    try:
-        client.connect(host, username=user, key_filename=key_path)
-        _, stdout, stderr = client.exec_command(command)  # nosec B601
-        exit_status = stdout.channel.recv_exit_status()
-        _ = stdout.read().decode()
-        err = stderr.read().decode()
-    finally:
-        _safe_close(client)
-    if exit_status != 0:
-        raise RuntimeError(
-            f"SSH command failed with exit code {exit_status}: {err}"
-        )
+    session = IBMiSession(host, user, key_path=key_path)
+    _sanitize_parts(cmd)
+    with session:
+        session.run(cmd)
     return None
-
@@ -2,76 +2,118 @@ from __future__ import annotations
 
 import argparse
 import logging
-import time
 from pathlib import Path
 from tkinter import HORIZONTAL, LEFT, RIGHT, Button, Label, StringVar, Tk
 from tkinter.ttk import Progressbar
 
 from PIL import Image, ImageTk
 import payroll_b
+from src.worker import BackgroundJob, JobStatus
 
-parser = argparse.ArgumentParser(description="Payroll GUI wrapper")
-parser.add_argument("--dry-run", action="store_true", help="Validate without uploading")
-parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
-args = parser.parse_args()
+# Milliseconds between polls of the worker's event queue
+POLL_MS = 100
+# payroll_b phases: status text and share of the progress bar
+PHASES = {
+    "convert": ("Convirtiendo Excel a CSV...", 10),
+    "connect": ("Conectando al IBM i...", 10),
+    "upload": ("Subiendo archivo", 70),
+    "run": ("Ejecutando el proceso en el IBM i...", 10),
+}
 
-logging.basicConfig(
-    level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s"
-)
 log = logging.getLogger(__name__)
+job: BackgroundJob | None = None
+status: JobStatus | None = None
 
 
 def button_confirm() -> None:
-    try:
-        task = 10
-        for x in range(task):
-            time.sleep(1)
-            progress_bar["value"] += 10
-            percent.set(
-                f"{int(((x + 1) / task) * 100)}% Iniciando Interfaz. Por Favor, Espere Hasta Que El Proceso Termine."
-            )
-            window.update_idletasks()
-        script_path = Path(__file__).with_name("payroll_b.py").resolve()
-        if not script_path.is_file():
-            raise FileNotFoundError(f"Missing payroll_b script: {script_path}")
-        rc = payroll_b.main()
-        if rc != 0:
-            raise RuntimeError(f"payroll_b exited with status {rc}")
-    except Exception as exc:
-        log.error("An error has occurred in payroll_b: %s", exc)
-        raise
-    else:
+    """Start ``payroll_b`` on a background worker unless one is running."""
+    global job, status
+    if job is not None and job.is_alive():
+        return
+    script_path = Path(__file__).with_name("payroll_b.py").resolve()
+    if not script_path.is_file():
+        raise FileNotFoundError(f"Missing payroll_b script: {script_path}")
+    progress_bar["value"] = 0
+    percent.set("Iniciando...")
+    status = JobStatus(PHASES)
+    job = BackgroundJob(payroll_b.main)
+    job.start()
+    window.after(POLL_MS, poll_job)
+
+
+def poll_job() -> None:
+    """Apply the worker's events on the Tk thread and reschedule until done."""
+    for kind, value in job.drain():
+        status.apply(kind, value)
+        if kind == "error":
+            log.error("An error has occurred in payroll_b: %s", value)
+            percent.set(f"Error: {value}")
+    progress_bar["value"] = status.percent
+    if not status.finished:
+        percent.set(status.text)
+        window.after(POLL_MS, poll_job)
+        return
+    if job.cancelled:
+        log.info("payroll_b cancelled")
+        window.quit()
+    elif status.outcome == "done" and status.result == 0:
         log.info("Successful execution of payroll_b")
-    window.quit()
+        window.quit()
+    elif status.outcome == "done":
+        log.error("payroll_b exited with status %s", status.result)
+        percent.set("Error: el proceso remoto fallo")
 
 
 def button_cancel() -> None:
+    """Stop a running transfer, or close the window when idle."""
+    if job is not None and job.is_alive():
+        job.cancel()
+        percent.set("Cancelando...")
+        return
     window.quit()
 
 
-window = Tk()
-window.geometry("500x500")
-window.title("Interfaz Ajustes Salariales de Nomina SPI")
+def main() -> None:
+    global window, progress_bar, percent, image_
+    parser = argparse.ArgumentParser(description="Payroll GUI wrapper")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Validate without uploading"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s"
+    )
+
+    window = Tk()
+    window.geometry("500x500")
+    window.title("Interfaz Ajustes Salariales de Nomina SPI")
+
+    lbl = Label(window, text="¿Desea Confirmar la Ejecucion del Proceso?")
+    lbl.config(font=("Arial", 10))
+    lbl.pack()
+
+    percent = StringVar()
+    progress_bar = Progressbar(
+        window, orient=HORIZONTAL, length=300, mode="determinate"
+    )
+    progress_bar.pack(pady=20)
+    Label(window, textvariable=percent).pack()
 
-lbl = Label(window, text="¿Desea Confirmar la Ejecucion del Proceso?")
-lbl.config(font=("Arial", 10))
-lbl.pack()
+    image = Image.open("icons8-payroll-64.png")
+    image_ = ImageTk.PhotoImage(image)
+    Label(window, image=image_).pack()
 
-percent = StringVar()
-progress_bar = Progressbar(window, orient=HORIZONTAL, length=300, mode="determinate")
-progress_bar.pack(pady=20)
-Label(window, textvariable=percent).pack()
+    Button(window, text="      OK           ", command=button_confirm).pack(
+        side=LEFT, padx=15, pady=20
+    )
+    Button(window, text="    Cancel     ", command=button_cancel).pack(
+        side=RIGHT, padx=15, pady=20
+    )
 
-image = Image.open("icons8-payroll-64.png")
-image_ = ImageTk.PhotoImage(image)
-Label(window, image=image_).pack()
+    window.resizable(False, False)
+    window.mainloop()
 
-Button(window, text="      OK           ", command=button_confirm).pack(
-    side=LEFT, padx=15, pady=20
-)
-Button(window, text="    Cancel     ", command=button_cancel).pack(
-    side=RIGHT, padx=15, pady=20
-)
 
-window.resizable(False, False)
-window.mainloop()
+if __name__ == "__main__":
+    main()
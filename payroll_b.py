@@ -6,14 +6,21 @@ import argparse
 import logging
 import os
 import re
+import sys
 import tempfile
 from dataclasses import dataclass
+from typing import Callable
 
 from colorama import init
 from dotenv import load_dotenv
 
-from ibmi_transfer import call_program_via_ssh, upload_csv_via_sftp
+from ibmi_transfer import IBMiSession
 from payroll_utils import csv_from_excel
+from src.progress import ConsoleProgress, Progress
+from src.retry import RetryPolicy
+
+# Steps of :func:`main`, in order, as reported to ``on_phase``
+PHASES = ("convert", "connect", "upload", "run")
 
 
 @dataclass
@@ -53,32 +60,59 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def main() -> int:
-    """Entrypoint for the payroll uploader CLI."""
+def main(
+    progress: Callable[[Progress], None] | None = None,
+    on_phase: Callable[[str], None] | None = None,
+) -> int:
+    """Entrypoint for the payroll uploader CLI.
+
+    *progress* receives upload :class:`Progress` reports; by default they
+    are drawn on stderr when it is a terminal. *on_phase* is called with
+    each of :data:`PHASES` as it starts.
+    """
+    phase = on_phase or (lambda name: None)
     args = parse_args()
     logging.basicConfig(
         level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s"
     )
     init()
     cfg = load_config()
+    phase("convert")
     csv_from_excel()
     logger = logging.getLogger(__name__)
     if args.dry_run:
         logger.info("Dry run: would upload %s to %s", cfg.csv_file, cfg.remote_dir)
         return 0
-    logger.info("Uploading %s to %s", cfg.csv_file, cfg.remote_dir)
-    upload_csv_via_sftp(cfg.host, cfg.user, cfg.password, cfg.csv_file, cfg.remote_dir)
     if not re.fullmatch(r"\w+", cfg.lib, re.ASCII):
         raise ValueError("Invalid library name")
     if not re.fullmatch(r"\w+", cfg.program, re.ASCII):
         raise ValueError("Invalid program name")
     cmd = f"system 'CALL PGM({cfg.lib}/{cfg.program})'"
-    logger.info("Running remote program via SSH")
-    try:
-        call_program_via_ssh(cfg.host, cfg.user, cmd, os.environ.get("SSH_KEY"))
-    except RuntimeError as exc:
-        logger.error("Remote program failed: %s", exc)
-        return 1
+    # Upload and program call share one authenticated SSH transport; the
+    # connect is retried like the upload
+    policy = RetryPolicy(max_attempts=3)
+    session = IBMiSession(
+        cfg.host,
+        cfg.user,
+        password=cfg.password or None,
+        key_path=os.environ.get("SSH_KEY") or None,
+        retry_policy=policy,
+    )
+    phase("connect")
+    with session:
+        phase("upload")
+        logger.info("Uploading %s to %s", cfg.csv_file, cfg.remote_dir)
+        if progress is None and sys.stderr.isatty():
+            progress = ConsoleProgress()
+        extra = {"progress": progress} if progress is not None else {}
+        session.upload(cfg.csv_file, cfg.remote_dir, policy=policy, **extra)
+        phase("run")
+        logger.info("Running remote program via SSH")
+        try:
+            session.run(cmd)
+        except RuntimeError as exc:
+            logger.error("Remote program failed: %s", exc)
+            return 1
     return 0
 
 
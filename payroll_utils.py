@@ -5,10 +5,13 @@ import logging
 import os
 from typing import Optional
 
-import xlrd
-import xlrd.biffh
 from colorama import Fore
 
+from src.lazy import LazyModule
+
+# Only needed once an .xls workbook is actually opened
+xlrd = LazyModule("xlrd")
+
 logger = logging.getLogger(__name__)
 
 
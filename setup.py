@@ -15,6 +15,7 @@ setup(
         "paramiko~=3.4",
         "pandas~=2.2",
     ],
+    extras_require={"odbc": ["pyodbc>=5.0"], "parquet": ["pyarrow>=14"]},
     entry_points={
         "console_scripts": ["payroll=src.runner:main"],
     },
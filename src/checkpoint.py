@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .metrics import _atomic_write
+
+
+@dataclass
+class Checkpoint:
+    """Phases of one run that have completed, saved after each one.
+
+    *key* identifies the prepared CSV (by SHA-256) and its destination, so
+    a rerun of the same file to the same place finds it; *run_id* is the
+    run that wrote it and *job* the IBM i job it submitted.
+    """
+
+    key: str
+    run_id: str
+    sha256: str
+    file: str
+    host: str | None
+    ifs_dir: str
+    done: list[str] = field(default_factory=list)
+    job: str | None = None
+    updated: float = 0.0
+    path: Path | None = field(default=None, repr=False, compare=False)
+
+    def has(self, phase: str) -> bool:
+        return phase in self.done
+
+    def mark(self, phase: str) -> None:
+        """Record *phase* as complete and save at once."""
+        if phase not in self.done:
+            self.done.append(phase)
+        self.save()
+
+    def save(self) -> None:
+        self.updated = time.time()
+        data = asdict(self)
+        del data["path"]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.path, json.dumps(data, indent=2))
+
+    def clear(self) -> None:
+        """Forget the run once the remote job has finished either way."""
+        self.path.unlink(missing_ok=True)
+
+
+class CheckpointStore:
+    """Directory of :class:`Checkpoint` JSON files, one per key."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+
+    @staticmethod
+    def key(sha256: str, config, export_mode: str) -> str:
+        target = "|".join(
+            str(part)
+            for part in (
+                sha256,
+                getattr(config, "host", None),
+                config.ifs_dir,
+                config.lib_stg,
+                getattr(config, "jobq", None),
+                export_mode,
+            )
+        )
+        return hashlib.sha256(target.encode()).hexdigest()[:16]
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def load(self, key: str) -> Checkpoint | None:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        return Checkpoint(**data, path=path)
+
+    def start(self, key: str, **fields) -> Checkpoint:
+        """Create (or replace) the checkpoint for *key*."""
+        checkpoint = Checkpoint(key=key, path=self._path(key), **fields)
+        checkpoint.save()
+        return checkpoint
@@ -0,0 +1,212 @@
+import random
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+HEADER = ("emp_id", "amount")
+# DECIMAL(9,2) upper bound of the staging tables
+_MAX_AMOUNT_CENTS = 999_999_999
+# Recently issued ids that duplicates are drawn from; bounds memory use
+_RECENT_IDS = 4096
+_XLS_MAX_ROWS = 65_535
+# Row kinds each load path rejects. ``apply.sql`` only filters unparsable
+# lines; a duplicate id or an amount beyond DECIMAL(9,2) aborts RUNSQLSTM.
+_REJECTED = {
+    "odbc": ("malformed", "duplicate", "range"),
+    "sftp": ("malformed",),
+}
+_MALFORMED = (
+    lambda i, a: (f"A{i}", a),  # letter in id
+    lambda i, a: (str(i), a.replace(".", ",")),  # decimal comma -> 3 fields
+    lambda i, a: (str(i), f"{a}.5"),  # two decimal points
+    lambda i, a: (str(i), ""),  # missing amount
+    lambda i, a: ("", a),  # missing id
+    lambda i, a: (str(i), f"${a}"),  # currency symbol
+)
+
+
+@dataclass
+class Mix:
+    """Fraction of rows (0-1) generated with each deliberate defect.
+
+    ``direct_load`` (the ODBC transport) rejects *malformed*, *duplicates*
+    and *out_of_range* rows as ``PARSE_ERROR``, ``DUPLICATE_ID`` and
+    ``OUT_OF_RANGE``. ``apply.sql`` (the SFTP transport) only rejects
+    *malformed* rows; duplicates and out-of-range amounts make its job fail.
+    *negative* amounts are valid adjustments; *crlf* is the share of lines
+    ending in ``\\r\\n``.
+    """
+
+    malformed: float = 0.0
+    duplicates: float = 0.0
+    negative: float = 0.0
+    out_of_range: float = 0.0
+    crlf: float = 0.0
+
+    def __post_init__(self) -> None:
+        for name, value in asdict(self).items():
+            if not 0 <= value <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if self.malformed + self.duplicates + self.out_of_range > 1:
+            raise ValueError("Defect ratios add up to more than 1")
+
+
+@dataclass
+class GenStats:
+    """What a generator run produced (data rows, excluding the header)."""
+
+    rows: int = 0
+    bytes: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def expected_rejects(self, transport: str = "odbc") -> int:
+        """Data rows *transport*'s load path rejects (the header adds one more).
+
+        For ``sftp`` this only holds when :attr:`sftp_safe`.
+        """
+        if transport not in _REJECTED:
+            raise ValueError(f"Unknown transport: {transport}")
+        return sum(self.counts.get(k, 0) for k in _REJECTED[transport])
+
+    @property
+    def sftp_safe(self) -> bool:
+        """Whether ``apply.sql`` can load the file without failing the job."""
+        return not (self.counts.get("duplicate") or self.counts.get("range"))
+
+
+def iter_rows(
+    rows: int, *, seed: int = 0, mix: Mix | None = None, start_id: int = 1001
+) -> Iterator[tuple[str, str, str]]:
+    """Yield ``(kind, emp_id, amount)`` for *rows* rows, deterministic per *seed*.
+
+    *kind* is ``valid``, ``negative``, ``malformed``, ``duplicate`` or
+    ``range``. Ids increase from *start_id*; duplicates repeat a recent id.
+    """
+    mix = mix or Mix()
+    rng = random.Random(seed)
+    recent: deque[int] = deque(maxlen=_RECENT_IDS)
+    malformed = mix.malformed
+    duplicate = malformed + mix.duplicates
+    out_of_range = duplicate + mix.out_of_range
+    next_id = start_id
+    for _ in range(rows):
+        draw = rng.random()
+        cents = rng.randint(0, 250_000)
+        if rng.random() < mix.negative:
+            cents, kind = -cents, "negative"
+        else:
+            kind = "valid"
+        amount = f"{cents / 100:.2f}"
+        if draw < malformed:
+            variant = _MALFORMED[rng.randrange(len(_MALFORMED))]
+            emp_id, amount = variant(next_id, amount)
+            next_id += 1
+            yield "malformed", emp_id, amount
+        elif draw < duplicate and recent:
+            yield "duplicate", str(recent[rng.randrange(len(recent))]), amount
+        elif draw < out_of_range:
+            cents = rng.randint(_MAX_AMOUNT_CENTS + 1, _MAX_AMOUNT_CENTS * 10)
+            yield "range", str(next_id), f"{cents / 100:.2f}"
+            next_id += 1
+        else:
+            recent.append(next_id)
+            yield kind, str(next_id), amount
+            next_id += 1
+
+
+def write_csv(
+    path: str | Path,
+    rows: int,
+    *,
+    seed: int = 0,
+    mix: Mix | None = None,
+    header: bool = True,
+    buffer_rows: int = 10_000,
+) -> GenStats:
+    """Stream *rows* payroll rows to the CSV file *path*."""
+    mix = mix or Mix()
+    rng = random.Random(seed ^ 0x5EED)
+    stats = GenStats()
+    buf: list[str] = [",".join(HEADER) + "\n"] if header else []
+    with Path(path).open("w", encoding="utf-8", newline="") as fh:
+        for kind, emp_id, amount in iter_rows(rows, seed=seed, mix=mix):
+            eol = "\r\n" if mix.crlf and rng.random() < mix.crlf else "\n"
+            if eol == "\r\n":
+                stats.counts["crlf"] = stats.counts.get("crlf", 0) + 1
+            buf.append(f"{emp_id},{amount}{eol}")
+            stats.counts[kind] = stats.counts.get(kind, 0) + 1
+            stats.rows += 1
+            if len(buf) >= buffer_rows:
+                fh.write("".join(buf))
+                buf.clear()
+        fh.write("".join(buf))
+    stats.bytes = Path(path).stat().st_size
+    return stats
+
+
+def _cell(value: str) -> float | str:
+    """Numbers become numeric cells, as in a real spreadsheet export."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def write_xlsx(
+    path: str | Path, rows: int, *, seed: int = 0, mix: Mix | None = None
+) -> GenStats:
+    """Stream *rows* payroll rows to an XLSX file (needs openpyxl)."""
+    try:
+        from openpyxl import Workbook
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("openpyxl is required for XLSX output") from exc
+    book = Workbook(write_only=True)
+    sheet = book.create_sheet("payroll")
+    sheet.append(HEADER)
+    stats = GenStats()
+    for kind, emp_id, amount in iter_rows(rows, seed=seed, mix=mix):
+        sheet.append((_cell(emp_id), _cell(amount)))
+        stats.counts[kind] = stats.counts.get(kind, 0) + 1
+        stats.rows += 1
+    book.save(str(path))
+    stats.bytes = Path(path).stat().st_size
+    return stats
+
+
+def write_xls(
+    path: str | Path, rows: int, *, seed: int = 0, mix: Mix | None = None
+) -> GenStats:
+    """Write *rows* payroll rows to a legacy XLS file (needs xlwt)."""
+    if rows > _XLS_MAX_ROWS:
+        raise ValueError(f"XLS holds at most {_XLS_MAX_ROWS} data rows")
+    try:
+        import xlwt
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("xlwt is required for XLS output") from exc
+    book = xlwt.Workbook()
+    sheet = book.add_sheet("payroll")
+    for col, name in enumerate(HEADER):
+        sheet.write(0, col, name)
+    stats = GenStats()
+    for r, (kind, emp_id, amount) in enumerate(
+        iter_rows(rows, seed=seed, mix=mix), start=1
+    ):
+        sheet.write(r, 0, _cell(emp_id))
+        sheet.write(r, 1, _cell(amount))
+        stats.counts[kind] = stats.counts.get(kind, 0) + 1
+        stats.rows += 1
+    book.save(str(path))
+    stats.bytes = Path(path).stat().st_size
+    return stats
+
+
+def generate(
+    path: str | Path, rows: int, *, seed: int = 0, mix: Mix | None = None
+) -> GenStats:
+    """Write *rows* rows to *path* as CSV, XLSX or XLS by file suffix."""
+    suffix = Path(path).suffix.lower()
+    writers = {".csv": write_csv, ".xlsx": write_xlsx, ".xls": write_xls}
+    if suffix not in writers:
+        raise ValueError(f"Unsupported output type: {suffix or path}")
+    return writers[suffix](path, rows, seed=seed, mix=mix)
@@ -0,0 +1,290 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Iterator, Sequence
+
+_DEFAULT_ODBC_DRIVER = "{iSeries Access ODBC Driver}"
+
+
+def connect(config) -> Any:
+    """Open a DB2 for i ODBC connection for *config* with autocommit off."""
+    try:
+        import pyodbc
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "pyodbc is required for the ODBC transport: pip install pyodbc"
+        ) from exc
+    password = getattr(config, "password", None)
+    if not password:
+        raise ValueError("IBMI_PASSWORD is required for ODBC connections")
+    driver = getattr(config, "odbc_driver", None) or _DEFAULT_ODBC_DRIVER
+    logging.getLogger(__name__).info("ODBC connect to %s", config.host)
+    return pyodbc.connect(
+        driver=driver,
+        system=config.host,
+        uid=config.user,
+        pwd=password,
+        autocommit=False,
+    )
+
+
+def executemany_batched(cursor, sql: str, rows, batch_size: int = 1000) -> int:
+    """Run *sql* for every row in *rows* using parameter arrays of *batch_size*.
+
+    *rows* may be any iterable; only one batch is held in memory at a time.
+    Returns the number of rows sent.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    if hasattr(cursor, "fast_executemany"):
+        # pyodbc: bind the whole batch as one parameter array
+        cursor.fast_executemany = True
+    total = 0
+    batch: list = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+@dataclass
+class PoolMetrics:
+    """Counters and timings collected by :class:`ConnectionPool`."""
+
+    created: int = 0
+    discarded: int = 0
+    borrows: int = 0
+    borrow_wait: float = 0.0
+    max_borrow_wait: float = 0.0
+    queries: int = 0
+    query_time: float = 0.0
+    statement_hits: int = 0
+    statement_misses: int = 0
+
+    def snapshot(self) -> dict[str, float]:
+        return dict(self.__dict__)
+
+
+class PooledConnection:
+    """Connection borrowed from a pool with a per-connection statement cache.
+
+    :meth:`execute` keeps one cursor per SQL text. Re-executing the same SQL
+    on the same cursor lets the driver reuse the prepared statement instead
+    of preparing it again, so rows of a previous :meth:`execute` with the
+    same SQL must be consumed before it is issued again.
+    """
+
+    def __init__(
+        self, raw, metrics: PoolMetrics, lock: threading.Lock, cache_size: int
+    ):
+        self.raw = raw
+        self._metrics = metrics
+        self._lock = lock
+        self._cache_size = cache_size
+        self._cursors: OrderedDict[str, Any] = OrderedDict()
+
+    def execute(self, sql: str, params: Sequence = ()):
+        """Execute *sql* on its cached cursor and return that cursor."""
+        cur = self._cursors.pop(sql, None)
+        hit = cur is not None
+        if cur is None:
+            cur = self.raw.cursor()
+            while len(self._cursors) >= self._cache_size:
+                _, old = self._cursors.popitem(last=False)
+                old.close()
+        self._cursors[sql] = cur
+        start = time.perf_counter()
+        try:
+            cur.execute(sql, params)
+            return cur
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._metrics.queries += 1
+                self._metrics.query_time += elapsed
+                if hit:
+                    self._metrics.statement_hits += 1
+                else:
+                    self._metrics.statement_misses += 1
+
+    def cursor(self):
+        return self.raw.cursor()
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        """Close cached cursors and the underlying connection."""
+        self._close_cursors()
+        self.raw.close()
+
+    def _close_cursors(self) -> None:
+        while self._cursors:
+            _, cur = self._cursors.popitem()
+            try:
+                cur.close()
+            except Exception:  # pragma: no cover - best effort cleanup
+                pass
+
+
+class ConnectionPool:
+    """Bounded pool of DB connections validated on borrow.
+
+    *factory* opens a new raw connection. At most *max_size* connections
+    exist at once; :meth:`connection` blocks up to *timeout* seconds for one
+    to be returned and then raises :class:`TimeoutError`. Idle connections
+    are checked with *validate_sql* before being handed out and replaced
+    when the check fails.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 4,
+        *,
+        timeout: float = 30.0,
+        validate_sql: str | None = "VALUES 1",
+        statement_cache_size: int = 64,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self._factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validate_sql = validate_sql
+        self.statement_cache_size = statement_cache_size
+        self.metrics = PoolMetrics()
+        self._idle: deque[PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._metrics_lock = threading.Lock()
+        self.log = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config, max_size: int = 4, **kwargs) -> "ConnectionPool":
+        """Return a pool of ODBC connections opened with :func:`connect`."""
+        return cls(partial(connect, config), max_size, **kwargs)
+
+    def _validate(self, conn: PooledConnection) -> bool:
+        if not self.validate_sql:
+            return True
+        try:
+            cur = conn.raw.cursor()
+            try:
+                cur.execute(self.validate_sql)
+                cur.fetchall()
+            finally:
+                cur.close()
+        except Exception as exc:
+            self.log.warning("Discarding pooled connection: %s", exc)
+            return False
+        return True
+
+    def _discard(self, conn: PooledConnection) -> None:
+        try:
+            conn.close()
+        except Exception:  # pragma: no cover - best effort cleanup
+            pass
+        with self._cond:
+            self._size -= 1
+            self.metrics.discarded += 1
+            self._cond.notify()
+
+    def _acquire(self) -> PooledConnection:
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.perf_counter()
+                    if self._closed or remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a pooled connection")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                conn = self._idle.popleft() if self._idle else None
+                if conn is None:
+                    self._size += 1
+            if conn is None:
+                try:
+                    raw = self._factory()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                conn = PooledConnection(
+                    raw, self.metrics, self._metrics_lock, self.statement_cache_size
+                )
+                with self._metrics_lock:
+                    self.metrics.created += 1
+            elif not self._validate(conn):
+                self._discard(conn)
+                continue
+            waited = time.perf_counter() - start
+            with self._metrics_lock:
+                self.metrics.borrows += 1
+                self.metrics.borrow_wait += waited
+                self.metrics.max_borrow_wait = max(self.metrics.max_borrow_wait, waited)
+            return conn
+
+    def _release(self, conn: PooledConnection) -> None:
+        # connections are not autocommit: never hand an open transaction (and
+        # its row locks) to the next borrower; after a commit this is a no-op
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+            else:
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Borrow a connection, returning it to the pool afterwards.
+
+        Work left uncommitted when the block ends, normally or by raising,
+        is rolled back; commit inside the block to keep it.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        """Close idle connections; borrowed ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,232 @@
+import copy
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from statistics import median
+
+from . import datagen
+from .ibmi_client import IBMiClient
+
+# paramiko's default SSH window (transport.DEFAULT_WINDOW_SIZE)
+DEFAULT_WINDOW = 64 * 2**15
+_MB = 1e6
+
+
+@dataclass
+class Diagnosis:
+    """Link measurements (seconds, MB/s) and the settings they suggest."""
+
+    host: str
+    handshake: list[float] = field(default_factory=list)
+    exec_rtt: list[float] = field(default_factory=list)
+    stat_rtt: list[float] = field(default_factory=list)
+    put_mb_s: dict[int, float] = field(default_factory=dict)
+    get_mb_s: dict[int, float] = field(default_factory=dict)
+    csv_put_mb_s: float | None = None
+    compressed_put_mb_s: float | None = None
+    parallel_put_mb_s: dict[int, float] = field(default_factory=dict)
+    cipher: str | None = None
+    recommendations: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def rows(self) -> list[dict]:
+        """Flatten the measurements for :func:`src.history.format_table`."""
+        rows = [
+            {"measure": name, "value": median(values) * 1000, "unit": "ms p50"}
+            for name, values in (
+                ("handshake", self.handshake),
+                ("exec round trip", self.exec_rtt),
+                ("sftp stat round trip", self.stat_rtt),
+            )
+            if values
+        ]
+        for block, rate in self.put_mb_s.items():
+            rows.append({"measure": f"put {block // 1024}KB blocks", "value": rate})
+        for block, rate in self.get_mb_s.items():
+            rows.append({"measure": f"get {block // 1024}KB blocks", "value": rate})
+        if self.csv_put_mb_s is not None:
+            rows.append({"measure": "put CSV", "value": self.csv_put_mb_s})
+        if self.compressed_put_mb_s is not None:
+            rows.append(
+                {"measure": "put CSV compressed", "value": self.compressed_put_mb_s}
+            )
+        for n, rate in self.parallel_put_mb_s.items():
+            rows.append({"measure": f"put {n} parallel channels", "value": rate})
+        for row in rows:
+            row.setdefault("unit", "MB/s")
+        return rows
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _put(sftp, local: Path, remote: str, block: int) -> float:
+    """Upload *local* in *block*-sized pipelined writes and return MB/s."""
+    size = local.stat().st_size
+    start = time.perf_counter()
+    with local.open("rb") as src, sftp.open(remote, "wb") as dst:
+        dst.set_pipelined(True)
+        for chunk in iter(lambda: src.read(block), b""):
+            dst.write(chunk)
+    return size / _MB / (time.perf_counter() - start)
+
+
+def _get(sftp, remote: str, block: int) -> float:
+    """Read *remote* in *block*-sized prefetched reads and return MB/s."""
+    size = sftp.stat(remote).st_size
+    start = time.perf_counter()
+    with sftp.open(remote, "rb") as src:
+        src.prefetch(size)
+        while src.read(block):
+            pass
+    return size / _MB / (time.perf_counter() - start)
+
+
+def _parallel_put(client, local: Path, remote_dir: str, n: int, block: int) -> float:
+    """Upload *local* over *n* SFTP channels of one transport; aggregate MB/s."""
+    channels = [client.open_sftp() for _ in range(n)]
+    errors: list[BaseException] = []
+
+    def _worker(i: int) -> None:
+        try:
+            _put(channels[i], local, f"{remote_dir}/par{i}.bin", block)
+        except BaseException as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(n)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - start
+    for i, sftp in enumerate(channels):
+        sftp.remove(f"{remote_dir}/par{i}.bin")
+        sftp.close()
+    if errors:
+        raise errors[0]
+    return n * local.stat().st_size / _MB / seconds
+
+
+def recommend(diag: Diagnosis, window: int = DEFAULT_WINDOW) -> list[str]:
+    """Turn measurements into transfer setting advice."""
+    tips = []
+    rtt = median(diag.stat_rtt) if diag.stat_rtt else 0.0
+    best_block, best_put = max(diag.put_mb_s.items(), key=lambda kv: kv[1])
+    best_get = max(diag.get_mb_s.values(), default=0.0)
+    bdp = best_put * _MB * rtt
+    if bdp > window / 2:
+        size = 1 << max(int(4 * bdp - 1).bit_length(), 21)
+        tips.append(
+            f"Bandwidth-delay product {bdp / 2**20:.1f}MiB is close to the "
+            f"{window / 2**20:.0f}MiB SSH window: set IBMI_SSH_WINDOW="
+            f"{size // 2**20}M."
+        )
+    tips.append(f"Use {best_block // 1024}KB transfer blocks ({best_put:.1f} MB/s).")
+    if diag.compressed_put_mb_s is not None and diag.csv_put_mb_s:
+        gain = diag.compressed_put_mb_s / diag.csv_put_mb_s
+        if gain > 1.2:
+            tips.append(f"Enable SSH compression: CSV uploads ran {gain:.1f}x faster.")
+        else:
+            tips.append("Leave SSH compression off: it did not speed up CSV uploads.")
+    if diag.parallel_put_mb_s:
+        n, rate = max(diag.parallel_put_mb_s.items(), key=lambda kv: kv[1])
+        if rate > 1.3 * best_put:
+            tips.append(
+                f"Use {n} parallel SFTP channels: {rate:.1f} MB/s vs "
+                f"{best_put:.1f} MB/s on one (per-channel window or latency bound)."
+            )
+        else:
+            tips.append("Parallel channels did not help: the link itself is the limit.")
+    if best_get and best_put < 0.5 * best_get:
+        tips.append(
+            "Uploads are much slower than downloads with the same cipher: suspect "
+            "IFS write speed on the IBM i (disk, journaling or scanning)."
+        )
+    if diag.handshake and median(diag.handshake) > 1.0:
+        tips.append(
+            "SSH handshake takes over 1s: reuse one session per run and check "
+            "reverse DNS (UseDNS no) and KEX choice on the IBM i sshd."
+        )
+    if diag.exec_rtt and rtt and median(diag.exec_rtt) > 5 * rtt:
+        tips.append(
+            "Remote commands cost far more than a network round trip (job start "
+            "on the IBM i): batch CL work into fewer ssh_run calls."
+        )
+    return tips
+
+
+def diagnose(
+    config,
+    *,
+    samples: int = 5,
+    size_mb: float = 8.0,
+    blocks: tuple[int, ...] = (32_768, 65_536, 262_144, 1_048_576),
+    compression: bool = True,
+    parallel: tuple[int, ...] = (2, 4),
+    workdir: Path | None = None,
+) -> Diagnosis:
+    """Measure the link to ``config.host`` with :class:`IBMiClient`.
+
+    Uses a scratch directory ``<ifs_dir>/diag`` on the IBM i and removes
+    the files it writes.
+    """
+    log = logging.getLogger(__name__)
+    diag = Diagnosis(host=config.host)
+    remote_dir = f"{config.ifs_dir}/diag"
+    work = Path(workdir or Path("outputs"))
+    work.mkdir(parents=True, exist_ok=True)
+    payload = work / "diag_payload.bin"
+    csv_payload = work / "diag_payload.csv"
+    with payload.open("wb") as fh:
+        for _ in range(max(1, int(size_mb))):
+            fh.write(os.urandom(1_000_000))
+    try:
+        for _ in range(samples):
+            client = IBMiClient(config)
+            diag.handshake.append(_timed(client.connect))
+            client.close()
+        with IBMiClient(config) as client:
+            transport = client.client.get_transport()
+            diag.cipher = getattr(transport, "remote_cipher", None)
+            client.ensure_remote_dirs([remote_dir])
+            for _ in range(samples):
+                diag.exec_rtt.append(_timed(lambda: client.ssh_run("true")))
+                diag.stat_rtt.append(_timed(lambda: client.sftp.stat(remote_dir)))
+            remote = f"{remote_dir}/payload.bin"
+            for block in blocks:
+                log.info("Measuring %s byte blocks", block)
+                diag.put_mb_s[block] = _put(client.sftp, payload, remote, block)
+                diag.get_mb_s[block] = _get(client.sftp, remote, block)
+            best = max(diag.put_mb_s, key=diag.put_mb_s.get)
+            for n in parallel:
+                diag.parallel_put_mb_s[n] = _parallel_put(
+                    client.client, payload, remote_dir, n, best
+                )
+            client.sftp.remove(remote)
+            if compression:
+                rows = max(1, int(size_mb * _MB / 14))
+                datagen.write_csv(csv_payload, rows, seed=1)
+                diag.csv_put_mb_s = _put(client.sftp, csv_payload, remote, best)
+                packed = copy.copy(config)
+                packed.compress = True
+                with IBMiClient(packed) as zipped:
+                    diag.compressed_put_mb_s = _put(
+                        zipped.sftp, csv_payload, remote, best
+                    )
+                client.sftp.remove(remote)
+    finally:
+        payload.unlink(missing_ok=True)
+        csv_payload.unlink(missing_ok=True)
+    profile = getattr(config, "ssh_profile", None)
+    window = getattr(profile, "window_size", None) or DEFAULT_WINDOW
+    diag.recommendations = recommend(diag, window)
+    return diag
@@ -0,0 +1,137 @@
+import logging
+import re
+from contextlib import closing
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+
+from .db import executemany_batched
+
+# Same acceptance rules as the parsing step of ``ibmi/apply.sql``
+_ID_RE = re.compile(r"^[0-9]+$")
+_AMOUNT_RE = re.compile(r"^-?[0-9]+(\.[0-9]+)?$")
+_MAX_ID = 2**31 - 1  # INT
+_MAX_AMOUNT = Decimal("9999999.99")  # DECIMAL(9,2)
+_RAW_LINE_LEN = 512
+_APPLY_SQL = Path("ibmi") / "apply.sql"
+_DIRECT_MARKER = "DIRECT LOAD START"
+
+
+@dataclass
+class LoadResult:
+    """Row counts of a direct ODBC load."""
+
+    valid: int = 0
+    rejected: int = 0
+    inserted: int = 0
+    updated: int = 0
+
+
+def _classify(line: str, seen: set[int]) -> tuple[int, Decimal] | tuple[str, str]:
+    """Return ``(id, amount)`` for a valid *line* or ``(raw_line, reason)``."""
+    raw = line[:_RAW_LINE_LEN]
+    emp_id, sep, amount = line.partition(",")
+    if not sep or not _ID_RE.match(emp_id) or not _AMOUNT_RE.match(amount):
+        return raw, "PARSE_ERROR"
+    value = int(emp_id)
+    money = Decimal(amount)
+    if value > _MAX_ID or abs(money) > _MAX_AMOUNT:
+        return raw, "OUT_OF_RANGE"
+    if value in seen:
+        return raw, "DUPLICATE_ID"
+    seen.add(value)
+    return value, money
+
+
+def split_rows(csv_path: Path) -> tuple[Iterator[tuple], list[tuple[str, str]]]:
+    """Stream valid rows of *csv_path* and collect rejects.
+
+    Returns an iterator of ``(id, amount)`` tuples and the list that rejects
+    are appended to as the iterator is consumed.
+    """
+    rejects: list[tuple[str, str]] = []
+
+    def _valid() -> Iterator[tuple]:
+        seen: set[int] = set()
+        with csv_path.open(encoding="utf-8", newline="") as fh:
+            for line in fh:
+                line = line.rstrip("\r\n")
+                if not line:
+                    continue
+                row = _classify(line, seen)
+                if isinstance(row[0], int):
+                    yield row
+                else:
+                    rejects.append(row)
+
+    return _valid(), rejects
+
+
+def apply_statements(lib_stg: str, script: Path = _APPLY_SQL) -> list[str]:
+    """Return the ``apply.sql`` statements shared with the ODBC path."""
+    text = script.read_text(encoding="utf-8")
+    _, marker, tail = text.partition(_DIRECT_MARKER)
+    if not marker:
+        raise ValueError(f"{script} has no '{_DIRECT_MARKER}' section")
+    lines = [ln for ln in tail.splitlines()[1:] if not ln.lstrip().startswith("--")]
+    body = "\n".join(lines).replace("&LIB_STG", lib_stg)
+    return [stmt.strip() for stmt in body.split(";") if stmt.strip()]
+
+
+def load_rows(
+    conn,
+    csv_path: Path,
+    lib_stg: str,
+    *,
+    batch_size: int = 1000,
+    script: Path = _APPLY_SQL,
+) -> LoadResult:
+    """Bulk-insert *csv_path* into the staging tables and apply it.
+
+    Everything runs in one transaction on *conn*, which is committed on
+    success and rolled back on any error.
+    """
+    log = logging.getLogger(__name__)
+    result = LoadResult()
+    statements = apply_statements(lib_stg, script)
+    valid, rejects = split_rows(csv_path)
+    try:
+        with closing(conn.cursor()) as cur:
+            for table in ("RAC_STG_VALID", "RAC_STG_REJECTS", "RAC_RUN_DELTA"):
+                cur.execute(f"DELETE FROM {lib_stg}.{table}")  # nosec B608
+            result.valid = executemany_batched(
+                cur,
+                f"INSERT INTO {lib_stg}.RAC_STG_VALID"  # nosec B608
+                " (ID, AMOUNT) VALUES (?, ?)",
+                valid,
+                batch_size,
+            )
+            result.rejected = executemany_batched(
+                cur,
+                f"INSERT INTO {lib_stg}.RAC_STG_REJECTS"  # nosec B608
+                " (RAW_LINE, REASON) VALUES (?, ?)",
+                rejects,
+                batch_size,
+            )
+            for stmt in statements:
+                cur.execute(stmt)
+            cur.execute(
+                f"SELECT ACTION, COUNT(*) FROM {lib_stg}.RAC_RUN_DELTA"  # nosec B608
+                " GROUP BY ACTION"
+            )
+            counts = dict(cur.fetchall())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    result.inserted = counts.get("I", 0)
+    result.updated = counts.get("U", 0)
+    log.info(
+        "Direct load: %s valid (%s inserted, %s updated), %s rejected",
+        result.valid,
+        result.inserted,
+        result.updated,
+        result.rejected,
+    )
+    return result
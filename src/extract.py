@@ -0,0 +1,195 @@
+import csv
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from datetime import time as time_of_day
+from decimal import Decimal
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, Sequence
+
+_DEFAULT_BATCH = 5000
+
+
+@dataclass
+class ExtractStats:
+    """Summary of a streamed extract."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def iter_batches(
+    cursor, sql: str, params: Sequence = (), batch_size: int = _DEFAULT_BATCH
+) -> Iterator[list]:
+    """Execute *sql* on *cursor* and yield rows in lists of *batch_size*."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    cursor.arraysize = batch_size
+    cursor.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def _columns(cursor) -> list[str]:
+    return [col[0] for col in cursor.description or ()]
+
+
+def _finish(rows: int, start: float, out: Path) -> ExtractStats:
+    stats = ExtractStats(rows, time.perf_counter() - start)
+    logging.getLogger(__name__).info(
+        "Extracted %s rows to %s in %.2fs (%.0f rows/s)",
+        rows,
+        out,
+        stats.seconds,
+        stats.rows_per_sec,
+    )
+    return stats
+
+
+def extract_to_csv(
+    conn,
+    sql: str,
+    out: Path,
+    params: Sequence = (),
+    *,
+    batch_size: int = _DEFAULT_BATCH,
+    header: bool = True,
+) -> ExtractStats:
+    """Stream the result of *sql* into the CSV file *out*.
+
+    Only one batch of rows is held in memory at a time. The header row is
+    written even when the query returns no rows.
+    """
+    start = time.perf_counter()
+    total = 0
+    cursor = conn.cursor()
+    try:
+        with Path(out).open("w", encoding="utf-8", newline="") as fh:
+            writer = csv.writer(fh, lineterminator="\n")
+            batches = iter_batches(cursor, sql, params, batch_size)
+            # the first fetch runs the query, so the column names are known
+            first = next(batches, None)
+            if header:
+                writer.writerow(_columns(cursor))
+            for rows in chain([first] if first else [], batches):
+                writer.writerows(rows)
+                total += len(rows)
+    finally:
+        cursor.close()
+    return _finish(total, start, out)
+
+
+def _arrow_type(pa, type_code, precision=None, scale=None):
+    """Map a DB-API ``type_code`` to a pyarrow type, or None when unknown."""
+    if type_code is Decimal:
+        if not precision:
+            return None
+        if precision > 38:
+            return pa.decimal256(precision, scale or 0)
+        return pa.decimal128(precision, scale or 0)
+    types = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bytes: pa.binary(),
+        bytearray: pa.binary(),
+        datetime: pa.timestamp("us"),
+        date: pa.date32(),
+        time_of_day: pa.time64("us"),
+    }
+    return types.get(type_code)
+
+
+def _arrow_types(pa, description, batches: list[list]) -> list:
+    """Resolve one pyarrow type per column; None where nothing is known yet."""
+    types = []
+    for index, col in enumerate(description or ()):
+        col = tuple(col) + (None,) * 7
+        arrow = _arrow_type(pa, col[1], col[4], col[5])
+        if arrow is None:
+            values = [row[index] for rows in batches for row in rows]
+            values = [value for value in values if value is not None]
+            if values and isinstance(values[0], Decimal):
+                # No precision from the driver: keep the widest scale seen.
+                scale = max(-value.as_tuple().exponent for value in values)
+                arrow = pa.decimal128(38, max(scale, 0))
+            elif values:
+                arrow = _arrow_type(pa, type(values[0])) or pa.array(values[:1]).type
+        types.append(arrow)
+    return types
+
+
+def _arrow_table(pa, rows: list, schema):
+    columns = zip(*rows, strict=True)
+    arrays = [
+        pa.array(list(col), type=field.type)
+        for col, field in zip(columns, schema, strict=True)
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def extract_to_parquet(
+    conn,
+    sql: str,
+    out: Path,
+    params: Sequence = (),
+    *,
+    batch_size: int = _DEFAULT_BATCH,
+) -> ExtractStats:
+    """Stream the result of *sql* into the Parquet file *out* (needs pyarrow).
+
+    Each fetched batch becomes one row group. Column types come from
+    ``cursor.description`` (DECIMAL keeps its precision and scale); a column
+    the driver does not type takes the type of its first non-NULL value, and
+    batches are held back until every column has one. No file is written when
+    the query returns no rows.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("pyarrow is required for Parquet extracts") from exc
+    start = time.perf_counter()
+    total = 0
+    writer = None
+    pending: list[list] = []
+    cursor = conn.cursor()
+    try:
+        for rows in iter_batches(cursor, sql, params, batch_size):
+            total += len(rows)
+            if writer is not None:
+                writer.write_table(_arrow_table(pa, rows, writer.schema))
+                continue
+            pending.append(rows)
+            types = _arrow_types(pa, cursor.description, pending)
+            if None in types:
+                continue
+            schema = pa.schema(list(zip(_columns(cursor), types, strict=True)))
+            writer = pq.ParquetWriter(str(out), schema)
+            for batch in pending:
+                writer.write_table(_arrow_table(pa, batch, schema))
+            pending = []
+        if pending:
+            # Columns that stayed NULL in every row have nothing to type them.
+            types = [
+                t or pa.null() for t in _arrow_types(pa, cursor.description, pending)
+            ]
+            schema = pa.schema(list(zip(_columns(cursor), types, strict=True)))
+            writer = pq.ParquetWriter(str(out), schema)
+            for batch in pending:
+                writer.write_table(_arrow_table(pa, batch, schema))
+    finally:
+        if writer is not None:
+            writer.close()
+        cursor.close()
+    return _finish(total, start, out)
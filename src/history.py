@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id    TEXT PRIMARY KEY,
+    started   REAL NOT NULL,
+    file      TEXT,
+    sha256    TEXT,
+    bytes     INTEGER NOT NULL DEFAULT 0,
+    rows      INTEGER NOT NULL DEFAULT 0,
+    host      TEXT,
+    jobq      TEXT,
+    transport TEXT,
+    dry_run   INTEGER NOT NULL DEFAULT 0,
+    status    TEXT NOT NULL,
+    seconds   REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS phases (
+    run_id  TEXT NOT NULL REFERENCES runs(run_id),
+    name    TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    bytes   INTEGER NOT NULL DEFAULT 0,
+    rows    INTEGER NOT NULL DEFAULT 0,
+    ok      INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS phases_name ON phases(name);
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the *q* quantile of *values* by linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+class RunHistory:
+    """Append-only SQLite store of workflow run reports.
+
+    Each record is the dict returned by :meth:`src.metrics.Recorder.end_run`:
+    one ``runs`` row with the labels, input size and outcome, and one
+    ``phases`` row per timed phase.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def append(self, report: dict) -> None:
+        """Store one run *report*."""
+        labels = report.get("labels", {})
+        phases = report.get("phases", [])
+        prepared = next((p for p in phases if p["name"] == "prepare"), {})
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                (
+                    report["run_id"],
+                    report.get("started", time.time()),
+                    labels.get("file"),
+                    report.get("sha256"),
+                    prepared.get("bytes", 0),
+                    prepared.get("rows", 0),
+                    labels.get("host"),
+                    labels.get("jobq"),
+                    labels.get("transport"),
+                    int(bool(labels.get("dry_run"))),
+                    report.get("status", "UNKNOWN"),
+                    report.get("seconds", 0.0),
+                ),
+            )
+            conn.execute("DELETE FROM phases WHERE run_id = ?", (report["run_id"],))
+            conn.executemany(
+                "INSERT INTO phases VALUES (?,?,?,?,?,?)",
+                [
+                    (
+                        report["run_id"],
+                        p["name"],
+                        p["seconds"],
+                        p.get("bytes", 0),
+                        p.get("rows", 0),
+                        int(p.get("ok", True)),
+                    )
+                    for p in phases
+                ],
+            )
+
+    def _since(self, days: float | None) -> float:
+        return 0.0 if days is None else time.time() - days * 86400
+
+    def phase_stats(self, *, days: float | None = None) -> list[dict]:
+        """Return run count, p50, p95 and max seconds per phase."""
+        samples: dict[str, list[float]] = {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT p.name, p.seconds FROM phases p "
+                "JOIN runs r ON r.run_id = p.run_id "
+                "WHERE r.started >= ? AND r.dry_run = 0 AND p.ok = 1",
+                (self._since(days),),
+            ).fetchall()
+        for name, seconds in rows:
+            samples.setdefault(name, []).append(seconds)
+        return [
+            {
+                "phase": name,
+                "runs": len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": max(values),
+            }
+            for name, values in sorted(samples.items())
+        ]
+
+    def throughput(self, *, days: float | None = None) -> list[dict]:
+        """Return runs, failures, rows and MB/s per day of successful runs."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT date(started, 'unixepoch', 'localtime') AS day, "
+                "COUNT(*), SUM(status != 'SUCCESS'), "
+                "SUM(CASE WHEN status = 'SUCCESS' THEN rows ELSE 0 END), "
+                "SUM(CASE WHEN status = 'SUCCESS' THEN bytes ELSE 0 END), "
+                "SUM(CASE WHEN status = 'SUCCESS' THEN seconds ELSE 0 END) "
+                "FROM runs WHERE started >= ? AND dry_run = 0 "
+                "GROUP BY day ORDER BY day",
+                (self._since(days),),
+            ).fetchall()
+        return [
+            {
+                "day": day,
+                "runs": runs,
+                "failed": failed,
+                "rows": nrows,
+                "mb_per_sec": (nbytes / 1e6 / seconds) if seconds else 0.0,
+            }
+            for day, runs, failed, nrows, nbytes, seconds in rows
+        ]
+
+    def slowest_hosts(self, *, days: float | None = None, limit: int = 5) -> list[dict]:
+        """Return hosts ordered by p95 run time, slowest first."""
+        samples: dict[str, list[float]] = {}
+        failures: dict[str, int] = {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT COALESCE(host, '?'), seconds, status FROM runs "
+                "WHERE started >= ? AND dry_run = 0",
+                (self._since(days),),
+            ).fetchall()
+        for host, seconds, status in rows:
+            if status == "SUCCESS":
+                samples.setdefault(host, []).append(seconds)
+            else:
+                failures[host] = failures.get(host, 0) + 1
+                samples.setdefault(host, [])
+        ranked = [
+            {
+                "host": host,
+                "runs": len(values) + failures.get(host, 0),
+                "failed": failures.get(host, 0),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+            }
+            for host, values in samples.items()
+        ]
+        ranked.sort(key=lambda r: r["p95"], reverse=True)
+        return ranked[:limit]
+
+
+def format_table(rows: list[dict]) -> str:
+    """Render *rows* as a fixed-width text table."""
+    if not rows:
+        return "(no runs recorded)"
+    cols = list(rows[0])
+    cells = [
+        [f"{r[c]:.3f}" if isinstance(r[c], float) else str(r[c]) for c in cols]
+        for r in rows
+    ]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths, strict=True))]
+    for row in cells:
+        lines.append("  ".join(v.rjust(w) for v, w in zip(row, widths, strict=True)))
+    return "\n".join(lines)
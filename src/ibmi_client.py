@@ -2,13 +2,29 @@ import logging
 import re
 import shlex
 from pathlib import Path
-from typing import Iterable
-
-import paramiko
+from typing import Callable, Iterable
 
+from .lazy import LazyModule
+from .progress import Progress, ProgressTracker, chain
+from .ratelimit import TokenBucket
+from .retry import (
+    RetryMetrics,
+    RetryPolicy,
+    TransferTracker,
+    resume_get,
+    resume_put,
+    retry_call,
+)
 from .utils import timed
 
+# Loaded on first connect, so dry runs and --help never import paramiko
+paramiko = LazyModule("paramiko")
+
 _SAFE_PATH = re.compile(r"^[A-Za-z0-9_./-]+$")
+# Argument of ``system``: one CL command such as RUNSQLSTM or SBMJOB
+# ``$``, ``#`` and ``@`` may appear in IBM i names (``Q$BATCH``) but never
+# start a ``$(...)`` substitution; ssh_run also single-quotes each part
+_SAFE_CL = re.compile(r"^(?:[A-Za-z0-9_./*'() -]|[$#@](?=[A-Za-z0-9_$#@./)]))+$")
 # Block common shell separators including newlines to avoid command injection
 _UNSAFE_SEP = re.compile(r"[;&|\r\n]")
 _SFTP_CLIENT_NOT_CONNECTED = "SFTP client not connected"
@@ -24,20 +40,51 @@ def _sanitize_parts(cmd: str | Iterable[str]) -> list[str]:
         parts = list(cmd)
     if not parts:
         raise ValueError("Empty command")
-    for part in parts:
-        if _UNSAFE_SEP.search(part) or not _SAFE_PATH.match(part):
+    for i, part in enumerate(parts):
+        pattern = _SAFE_CL if i and parts[0] == "system" else _SAFE_PATH
+        if _UNSAFE_SEP.search(part) or not pattern.match(part):
             raise ValueError("Unsafe shell command")
     return parts
 
 
+def _quiet_close(obj) -> None:
+    """Close *obj* if set, ignoring errors from an already broken channel."""
+    if obj is None:
+        return
+    try:
+        obj.close()
+    except Exception:  # pragma: no cover - best effort cleanup
+        pass
+
+
 class IBMiClient:
-    """Thin SSH/SFTP wrapper around paramiko."""
+    """Thin SSH/SFTP wrapper around paramiko.
 
-    def __init__(self, config, dry_run: bool = False):
+    Connecting and SFTP transfers retry transient failures per
+    *retry_policy*, reusing the transport while it is healthy and resuming
+    partial transfers; ``ssh_run`` is never retried because remote commands
+    such as ``SBMJOB`` are not idempotent. Transfers are throttled by
+    *limiter* (default: one built from ``config.rate_limit``); pass the
+    same :class:`TokenBucket` to several clients to share one budget.
+    """
+
+    def __init__(
+        self,
+        config,
+        dry_run: bool = False,
+        retry_policy: RetryPolicy | None = None,
+        limiter: TokenBucket | None = None,
+    ):
         self.config = config
         self.dry_run = dry_run
+        rate = getattr(config, "rate_limit", None)
+        if limiter is None and rate:
+            limiter = TokenBucket(rate, hours=getattr(config, "rate_limit_hours", None))
+        self.limiter = limiter
         self.client: paramiko.SSHClient | None = None
         self.sftp: paramiko.SFTPClient | None = None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_metrics = RetryMetrics()
         self.log = logging.getLogger(__name__)
 
     def __enter__(self):
@@ -51,10 +98,24 @@ class IBMiClient:
 
     @timed
     def connect(self) -> None:
-        """Establish SSH and SFTP connections."""
+        """Establish SSH and SFTP connections, retrying transient failures."""
         if self.dry_run:
             self.log.info("DRY-RUN connect to %s", self.config.host)
             return
+        try:
+            retry_call(
+                self._open,
+                self.retry_policy,
+                metrics=self.retry_metrics,
+                what=f"SSH connect to {self.config.host}",
+            )
+        except NotImplementedError:
+            # Allow tests or minimal paramiko implementations that raise
+            # NotImplementedError for unimplemented network calls.
+            self.sftp = None
+
+    def _open(self) -> None:
+        """Create the SSH client, authenticate and open the SFTP channel."""
         self.client = paramiko.SSHClient()
         try:
             self.client.load_system_host_keys()
@@ -71,7 +132,16 @@ class IBMiClient:
             # Older paramiko versions on some platforms may not implement
             # host key handling; continue without overriding the default
             pass
-        kwargs = {"hostname": self.config.host, "username": self.config.user}
+        kwargs = {
+            "hostname": self.config.host,
+            "port": getattr(self.config, "port", 22),
+            "username": self.config.user,
+        }
+        if getattr(self.config, "compress", False):
+            kwargs["compress"] = True
+        profile = getattr(self.config, "ssh_profile", None)
+        if profile is not None:
+            kwargs.update(profile.connect_kwargs())
         key = getattr(self.config, "ssh_key", None)
         pw = getattr(self.config, "password", None)
         if key:
@@ -82,9 +152,10 @@ class IBMiClient:
             self.client.connect(**kwargs)
             self.sftp = self.client.open_sftp()
         except NotImplementedError:
-            # Allow tests or minimal paramiko implementations that raise
-            # NotImplementedError for unimplemented network calls.
-            self.sftp = None
+            raise
+        except Exception:
+            _quiet_close(self.client)
+            raise
 
     def close(self) -> None:
         """Close any active SSH or SFTP connections."""
@@ -93,6 +164,53 @@ class IBMiClient:
         if self.client:
             self.client.close()
 
+    def is_active(self) -> bool:
+        """Return whether the SSH transport is still usable (always in dry-run)."""
+        return self.dry_run or self._transport_active()
+
+    def _transport_active(self) -> bool:
+        get_transport = getattr(self.client, "get_transport", None)
+        transport = get_transport() if get_transport else None
+        return bool(transport and transport.is_active())
+
+    def _recover(self, exc: BaseException, attempt: int) -> None:
+        """Drop the SFTP channel, and the transport too if it has died."""
+        _quiet_close(self.sftp)
+        self.sftp = None
+        if self.client and not self._transport_active():
+            _quiet_close(self.client)
+            self.client = None
+            self.retry_metrics.reconnects += 1
+
+    def _transfer(
+        self, first: Callable[[], None], resume: Callable[[], None], what: str
+    ) -> None:
+        """Run *first*, then *resume* on retries of transient failures.
+
+        *resume* must only trust bytes *first* is known to have written.
+        """
+        attempts = 0
+
+        def _attempt() -> None:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                first()
+                return
+            if self.client is None:
+                self._open()
+            elif self.sftp is None:
+                self.sftp = self.client.open_sftp()
+            resume()
+
+        retry_call(
+            _attempt,
+            self.retry_policy,
+            metrics=self.retry_metrics,
+            on_retry=self._recover,
+            what=what,
+        )
+
     @timed
     def ssh_run(
         self, cmd: str | Iterable[str], timeout: int = 60
@@ -115,25 +233,85 @@ class IBMiClient:
             self.log.error("Command failed rc=%s stderr=%s", rc, err.strip())
         return out, err, rc
 
+    def _callback(
+        self,
+        limiter: TokenBucket | None,
+        progress: Callable[[Progress], None] | None,
+        name: str,
+    ) -> dict:
+        """``callback`` keyword for paramiko transfers, if one is needed."""
+        limiter = limiter or self.limiter
+        cb = chain(
+            limiter.callback() if limiter is not None else None,
+            ProgressTracker(progress, name) if progress is not None else None,
+        )
+        return {"callback": cb} if cb is not None else {}
+
     @timed
-    def sftp_put(self, local: Path, remote: str) -> None:
-        """Upload *local* file to *remote* path via SFTP."""
+    def sftp_put(
+        self,
+        local: Path,
+        remote: str,
+        *,
+        limiter: TokenBucket | None = None,
+        progress: Callable[[Progress], None] | None = None,
+    ) -> None:
+        """Upload *local* file to *remote* path via SFTP.
+
+        *progress* receives a :class:`Progress` several times a second.
+        """
         self.log.info("PUT %s -> %s", local, remote)
         if self.dry_run:
             return
         if not self.sftp:
             raise RuntimeError(_SFTP_CLIENT_NOT_CONNECTED)
-        self.sftp.put(str(local), remote)
+        cb = self._callback(limiter, progress, Path(local).name)
+        tracker = TransferTracker(cb.get("callback"))
+        self._transfer(
+            lambda: self.sftp.put(str(local), remote, callback=tracker),
+            lambda: resume_put(
+                self.sftp,
+                Path(local),
+                remote,
+                self.retry_metrics,
+                tracker,
+                written=tracker.written,
+            ),
+            f"SFTP put {remote}",
+        )
 
     @timed
-    def sftp_get(self, remote: str, local: Path) -> None:
-        """Download *remote* file to *local* path via SFTP."""
+    def sftp_get(
+        self,
+        remote: str,
+        local: Path,
+        *,
+        limiter: TokenBucket | None = None,
+        progress: Callable[[Progress], None] | None = None,
+    ) -> None:
+        """Download *remote* file to *local* path via SFTP.
+
+        *progress* receives a :class:`Progress` several times a second.
+        """
         self.log.info("GET %s -> %s", remote, local)
         if self.dry_run:
             return
         if not self.sftp:
             raise RuntimeError(_SFTP_CLIENT_NOT_CONNECTED)
-        self.sftp.get(remote, str(local))
+        cb = self._callback(limiter, progress, remote.rsplit("/", 1)[-1])
+        tracker = TransferTracker(cb.get("callback"))
+        self._transfer(
+            lambda: self.sftp.get(remote, str(local), callback=tracker),
+            lambda: resume_get(
+                self.sftp,
+                remote,
+                Path(local),
+                self.retry_metrics,
+                tracker,
+                written=tracker.written,
+            ),
+            f"SFTP get {remote}",
+        )
 
     def _ensure_dir(self, path: str) -> None:
         """Create *path* on the remote host if it does not exist."""
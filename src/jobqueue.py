@@ -0,0 +1,395 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    file        TEXT NOT NULL,
+    host        TEXT NOT NULL,
+    jobq        TEXT NOT NULL,
+    ifs_dir     TEXT NOT NULL,
+    priority    INTEGER NOT NULL DEFAULT 5,
+    deadline    REAL,
+    args        TEXT NOT NULL DEFAULT '[]',
+    state       TEXT NOT NULL DEFAULT 'queued',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    owner       TEXT,
+    lease_until REAL,
+    created     REAL NOT NULL,
+    started     REAL,
+    finished    REAL,
+    exit_code   INTEGER,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state, priority, deadline);
+"""
+# Queued jobs run lowest priority number first (like SBMJOB JOBPTY), then
+# earliest deadline, then oldest
+_ORDER = "priority, deadline IS NULL, deadline, created, job_id"
+STATES = ("queued", "running", "done", "failed", "cancelled")
+
+
+@dataclass
+class QueuedJob:
+    """One row of the ``jobs`` table."""
+
+    job_id: int
+    file: str
+    host: str
+    jobq: str
+    ifs_dir: str
+    priority: int
+    deadline: float | None
+    args: list[str]
+    state: str
+    attempts: int
+    owner: str | None
+    lease_until: float | None
+    created: float
+    started: float | None
+    finished: float | None
+    exit_code: int | None
+    error: str | None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "QueuedJob":
+        values = dict(row)
+        values["args"] = json.loads(values["args"])
+        return cls(**values)
+
+
+def parse_limits(value: str | None) -> dict[str, int]:
+    """Parse ``QBATCH=1,QSYSNOMAX=4`` into per-JOBQ caps."""
+    limits = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        name, _, cap = item.partition("=")
+        limits[name.strip().upper()] = int(cap)
+    return limits
+
+
+def parse_deadline(value: str | None, now: float | None = None) -> float | None:
+    """Parse ``+30m``/``+2h``/``+90s`` or an ISO date-time into epoch seconds."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    now = time.time() if now is None else now
+    if value.startswith("+"):
+        scale = {"s": 1, "m": 60, "h": 3600, "d": 86400}.get(value[-1:].lower())
+        number = value[1:-1] if scale else value[1:]
+        return now + float(number) * (scale or 1)
+    return datetime.fromisoformat(value).timestamp()
+
+
+@dataclass
+class Limits:
+    """Concurrency caps: running jobs per host and per JOBQ on each host.
+
+    *jobq* maps a JOBQ name to its cap; others get *default_jobq*. Jobs for
+    the same host and IFS directory never overlap whatever the caps, since
+    ``process.clp`` reads ``in/data.csv`` and writes ``run/*.status`` there.
+    """
+
+    host: int = 2
+    default_jobq: int = 1
+    jobq: dict[str, int] = field(default_factory=dict)
+
+    def for_jobq(self, name: str) -> int:
+        return self.jobq.get(name.upper(), self.default_jobq)
+
+    @classmethod
+    def from_env(cls) -> "Limits":
+        return cls(
+            host=int(os.getenv("IBMI_QUEUE_HOST_LIMIT", "2")),
+            default_jobq=int(os.getenv("IBMI_QUEUE_JOBQ_DEFAULT", "1")),
+            jobq=parse_limits(os.getenv("IBMI_QUEUE_JOBQ_LIMITS")),
+        )
+
+
+class JobQueue:
+    """Durable SQLite queue of pending workflow runs.
+
+    Workers :meth:`claim` a job under a lease that they :meth:`renew` while
+    it runs. If a worker dies, its lease runs out and the next claim puts
+    the job back in the queue, until it has been tried *max_attempts* times.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], *, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+
+    def _connect(self) -> sqlite3.Connection:
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def enqueue(
+        self,
+        file: str | os.PathLike[str],
+        *,
+        host: str,
+        jobq: str,
+        ifs_dir: str,
+        priority: int = 5,
+        deadline: float | None = None,
+        args: list[str] | tuple[str, ...] = (),
+    ) -> int:
+        """Add a run of *file* and return its job id."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (file, host, jobq, ifs_dir, priority, deadline,"
+                " args, created) VALUES (?,?,?,?,?,?,?,?)",
+                (
+                    str(Path(file).resolve()),
+                    host,
+                    jobq.upper(),
+                    ifs_dir,
+                    priority,
+                    deadline,
+                    json.dumps(list(args)),
+                    time.time(),
+                ),
+            )
+            return cur.lastrowid
+
+    def get(self, job_id: int) -> QueuedJob | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return QueuedJob.from_row(row) if row else None
+
+    def jobs(self, states: tuple[str, ...] = STATES) -> list[QueuedJob]:
+        """Return jobs in *states*: running first, then in run order."""
+        marks = ",".join("?" * len(states))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE state IN ({marks}) "
+                f"ORDER BY state != 'running', state != 'queued', {_ORDER}",
+                states,
+            ).fetchall()
+        return [QueuedJob.from_row(row) for row in rows]
+
+    def _expire(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'queued' END, owner = NULL, lease_until = NULL, "
+            "error = 'worker lease expired' "
+            "WHERE state = 'running' AND lease_until < ?",
+            (self.max_attempts, now),
+        )
+
+    def claim(
+        self, limits: Limits, owner: str, lease: float, now: float | None = None
+    ) -> QueuedJob | None:
+        """Start the first queued job the caps allow, or return ``None``."""
+        now = time.time() if now is None else now
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire(conn, now)
+                per_host: dict[str, int] = {}
+                per_jobq: dict[tuple[str, str], int] = {}
+                busy_dirs = set()
+                for row in conn.execute(
+                    "SELECT host, jobq, ifs_dir FROM jobs WHERE state = 'running'"
+                ):
+                    host, jobq, ifs_dir = row
+                    per_host[host] = per_host.get(host, 0) + 1
+                    per_jobq[host, jobq] = per_jobq.get((host, jobq), 0) + 1
+                    busy_dirs.add((host, ifs_dir))
+                chosen = None
+                for row in conn.execute(
+                    f"SELECT * FROM jobs WHERE state = 'queued' ORDER BY {_ORDER}"
+                ):
+                    job = QueuedJob.from_row(row)
+                    if (
+                        per_host.get(job.host, 0) < limits.host
+                        and per_jobq.get((job.host, job.jobq), 0)
+                        < limits.for_jobq(job.jobq)
+                        and (job.host, job.ifs_dir) not in busy_dirs
+                    ):
+                        chosen = job
+                        break
+                if chosen is not None:
+                    conn.execute(
+                        "UPDATE jobs SET state = 'running', owner = ?, "
+                        "lease_until = ?, started = ?, attempts = attempts + 1, "
+                        "error = NULL WHERE job_id = ?",
+                        (owner, now + lease, now, chosen.job_id),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(chosen.job_id) if chosen is not None else None
+
+    def renew(self, job_ids: list[int], owner: str, lease: float) -> None:
+        """Extend the lease of *owner*'s running *job_ids*."""
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_until = ? "
+                "WHERE job_id = ? AND owner = ? AND state = 'running'",
+                [(time.time() + lease, job_id, owner) for job_id in job_ids],
+            )
+
+    def finish(self, job_id: int, exit_code: int, error: str | None = None) -> None:
+        """Record the end of a running job: ``done`` if *exit_code* is 0."""
+        state = "done" if exit_code == 0 else "failed"
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, exit_code = ?, error = ?, finished = ?,"
+                " owner = NULL, lease_until = NULL WHERE job_id = ?",
+                (state, exit_code, error, time.time(), job_id),
+            )
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started yet; return whether it was queued."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = 'cancelled', finished = ? "
+                "WHERE job_id = ? AND state = 'queued'",
+                (time.time(), job_id),
+            )
+            return cur.rowcount == 1
+
+    def counts(self) -> dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        return {state: count for state, count in rows}
+
+
+def runner_command(job: QueuedJob) -> list[str]:
+    """Return the ``src.runner`` command line that performs *job*.
+
+    Jobs are only claimed again after a worker's lease expired, so a later
+    attempt adds ``--resume`` to pick up the dead run's checkpoint instead
+    of repeating its upload and submitting a second job.
+    """
+    cmd = [
+        sys.executable,
+        "-m",
+        "src.runner",
+        "--file",
+        job.file,
+        "--jobq",
+        job.jobq,
+        "--ifs-dir",
+        job.ifs_dir,
+        *job.args,
+    ]
+    if job.attempts > 1 and "--resume" not in job.args:
+        cmd.append("--resume")
+    return cmd
+
+
+def launch(job: QueuedJob) -> subprocess.Popen:
+    """Run *job* in its own ``src.runner`` process against ``job.host``."""
+    env = dict(os.environ, IBMI_HOST=job.host)
+    return subprocess.Popen(runner_command(job), env=env)
+
+
+class Scheduler:
+    """Start queued jobs as the :class:`Limits` allow and track them.
+
+    Each job runs in its own ``src.runner`` process (see :func:`launch`),
+    so run reports, metrics and outputs stay separate. While a job runs
+    its lease is renewed every *lease* / 3 seconds.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        limits: Limits,
+        *,
+        owner: str | None = None,
+        lease: float = 60.0,
+        poll: float = 1.0,
+        launcher: Callable[[QueuedJob], subprocess.Popen] = launch,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.queue = queue
+        self.limits = limits
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = lease
+        self.poll = poll
+        self.launcher = launcher
+        self.running: dict[int, subprocess.Popen] = {}
+        self._clock = clock
+        self._renewed = clock()
+        self.log = logging.getLogger(__name__)
+
+    def _reap(self) -> None:
+        for job_id, proc in list(self.running.items()):
+            code = proc.poll()
+            if code is None:
+                continue
+            del self.running[job_id]
+            error = None if code == 0 else f"runner exited with status {code}"
+            self.queue.finish(job_id, code, error)
+            self.log.info("Job %d finished with status %d", job_id, code)
+
+    def _renew(self) -> None:
+        if self.running and self._clock() - self._renewed >= self.lease / 3:
+            self.queue.renew(list(self.running), self.owner, self.lease)
+            self._renewed = self._clock()
+
+    def step(self, *, start: bool = True) -> int:
+        """Reap finished jobs, renew leases and start what the caps allow."""
+        self._reap()
+        self._renew()
+        started = 0
+        while start:
+            job = self.queue.claim(self.limits, self.owner, self.lease)
+            if job is None:
+                break
+            if job.deadline is not None and job.deadline < time.time():
+                self.log.warning("Job %d starts after its deadline", job.job_id)
+            self.log.info(
+                "Starting job %d: %s on %s JOBQ(%s)",
+                job.job_id,
+                Path(job.file).name,
+                job.host,
+                job.jobq,
+            )
+            try:
+                self.running[job.job_id] = self.launcher(job)
+            except OSError as exc:
+                self.queue.finish(job.job_id, -1, str(exc))
+                continue
+            started += 1
+        return started
+
+    def run(self, stop: threading.Event | None = None, *, once: bool = False) -> None:
+        """Schedule until *stop* is set (or, with *once*, the queue is empty).
+
+        On stop no new jobs start; running ones are waited for so their
+        results are recorded.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.step()
+            if once and not self.running and not self.queue.counts().get("queued"):
+                return
+            stop.wait(self.poll)
+        while self.running:
+            self.step(start=False)
+            time.sleep(self.poll)
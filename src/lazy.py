@@ -0,0 +1,27 @@
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute use.
+
+    Keeps heavy dependencies (pandas, paramiko, xlrd) off the startup path
+    of commands that never touch them, while ``module.attr`` code and
+    ``monkeypatch.setattr(mod, "paramiko", fake)`` keep working.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: ModuleType | None = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .metrics import RECORDER, Recorder
+
+# ``RTVSYSVAL QDATETIME``: YYYYMMDDhhmmss followed by microseconds
+_STAMP = "%Y%m%d%H%M%S%f"
+
+
+@dataclass(frozen=True)
+class RemotePhase:
+    """One ``phase=`` line written by ``process.clp``."""
+
+    name: str
+    start: datetime
+    end: datetime
+    rows: int = 0
+    ok: bool = True
+
+    @property
+    def seconds(self) -> float:
+        return max(0.0, (self.end - self.start).total_seconds())
+
+
+@dataclass
+class Marker:
+    """Parsed ``run/*.status`` file: the status line plus the job's phases."""
+
+    status: str
+    phases: list[RemotePhase] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        return "FAILED" in self.status
+
+    @property
+    def busy_seconds(self) -> float:
+        """Seconds from the first phase's start to the last one's end."""
+        if not self.phases:
+            return 0.0
+        start = min(p.start for p in self.phases)
+        end = max(p.end for p in self.phases)
+        return max(0.0, (end - start).total_seconds())
+
+
+def parse_marker(text: str) -> Marker:
+    """Parse a marker; older single-line markers just have no phases.
+
+    Phase lines look like ``phase=import start=<QDATETIME> end=<QDATETIME>
+    rows=0000001234 ok=1``; malformed lines are skipped.
+    """
+    lines = text.strip().splitlines() or [""]
+    phases = []
+    for line in lines[1:]:
+        fields = dict(item.partition("=")[::2] for item in line.split())
+        try:
+            phases.append(
+                RemotePhase(
+                    name=fields["phase"],
+                    start=datetime.strptime(fields["start"], _STAMP),
+                    end=datetime.strptime(fields["end"], _STAMP),
+                    rows=int(fields.get("rows") or 0),
+                    ok=fields.get("ok", "1") != "0",
+                )
+            )
+        except (KeyError, ValueError):
+            continue
+    return Marker(lines[0].strip(), phases)
+
+
+def record_remote_phases(
+    marker: Marker, waited: float, recorder: Recorder = RECORDER
+) -> None:
+    """Add the job's phases to *recorder* as ``remote_<name>`` spans.
+
+    Only durations measured on the IBM i are used, so clock skew between
+    the machines does not matter. The spans are placed to end when the
+    marker was read, and ``remote_queue`` is the rest of the *waited*
+    seconds: time on the job queue plus marker polling latency.
+    """
+    if not marker.phases:
+        return
+    end = recorder.elapsed()
+    first = min(p.start for p in marker.phases)
+    busy = marker.busy_seconds
+    queued = max(0.0, waited - busy)
+    recorder.add_span("remote_queue", queued, end=end - busy)
+    for p in marker.phases:
+        offset = (p.end - first).total_seconds()
+        recorder.add_span(
+            f"remote_{p.name}",
+            p.seconds,
+            end=end - busy + offset,
+            rows=p.rows,
+            ok=p.ok,
+        )
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, ContextManager, Iterator
+
+from . import tracing
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)  # fmt: skip
+
+
+@dataclass
+class Span:
+    """One timed phase of a run; *start* is seconds since the run began."""
+
+    name: str
+    start: float
+    seconds: float = 0.0
+    bytes: int = 0
+    rows: int = 0
+    ok: bool = True
+
+
+@dataclass
+class Histogram:
+    """Cumulative latency histogram in Prometheus bucket layout."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate the *q* quantile from the bucket bounds."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, seen in zip(self.buckets, self.counts, strict=True):
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Recorder:
+    """Per-phase spans of the current run plus histograms across runs.
+
+    Phases are timed with :func:`time.perf_counter`. Spans are reset by
+    :meth:`begin_run`; histograms and byte/row totals accumulate for the
+    lifetime of the recorder so a long-lived process can export them.
+    Each of :attr:`hooks` is called with the phase name and entered as a
+    context manager around every phase (used by the CPU profiler).
+    """
+
+    def __init__(self) -> None:
+        self.hooks: list[Callable[[str], ContextManager]] = []
+        self._lock = threading.Lock()
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.totals: dict[tuple[str, str], list[int]] = {}
+        self.spans: list[Span] = []
+        self.run: dict = {}
+        self._t0 = time.perf_counter()
+
+    def begin_run(self, **labels) -> str:
+        """Start a new run report and return its run id."""
+        with self._lock:
+            self.spans = []
+            self._t0 = time.perf_counter()
+            self.run = {
+                "run_id": uuid.uuid4().hex,
+                "started": time.time(),
+                "labels": labels,
+                "status": "RUNNING",
+            }
+            return self.run["run_id"]
+
+    def end_run(self, status: str, **extra) -> dict:
+        """Finish the current run report with *status* and return it."""
+        with self._lock:
+            self.run["status"] = status
+            self.run["seconds"] = time.perf_counter() - self._t0
+            self.run.update(extra)
+            return self.report()
+
+    def annotate(self, **extra) -> None:
+        """Attach *extra* fields to the current run report."""
+        with self._lock:
+            self.run.update(extra)
+
+    def observe(
+        self,
+        name: str,
+        seconds: float,
+        *,
+        kind: str = "phase",
+        bytes: int = 0,
+        rows: int = 0,
+    ) -> None:
+        """Record one *seconds* sample for *name* without creating a span."""
+        key = (kind, name)
+        with self._lock:
+            self.histograms.setdefault(key, Histogram()).observe(seconds)
+            totals = self.totals.setdefault(key, [0, 0])
+            totals[0] += bytes
+            totals[1] += rows
+
+    def elapsed(self) -> float:
+        """Seconds since the current run began."""
+        return time.perf_counter() - self._t0
+
+    def add_span(
+        self,
+        name: str,
+        seconds: float,
+        *,
+        end: float | None = None,
+        bytes: int = 0,
+        rows: int = 0,
+        ok: bool = True,
+    ) -> Span:
+        """Record phase *name* timed elsewhere, e.g. by the job on the IBM i.
+
+        *end* is seconds since the run began (default: now).
+        """
+        end = self.elapsed() if end is None else end
+        span = Span(name, end - seconds, seconds, bytes=bytes, rows=rows, ok=ok)
+        with self._lock:
+            self.spans.append(span)
+        self.observe(name, seconds, bytes=bytes, rows=rows)
+        return span
+
+    @contextmanager
+    def phase(self, name: str, *, bytes: int = 0, rows: int = 0) -> Iterator[Span]:
+        """Time the enclosed block as phase *name*.
+
+        The yielded :class:`Span` may be updated with ``bytes``/``rows``
+        once they are known.
+        """
+        start = time.perf_counter()
+        span = Span(name, start - self._t0, bytes=bytes, rows=rows)
+        with tracing.span(name, cat="phase") as trace_args, ExitStack() as hooks:
+            for hook in list(self.hooks):
+                hooks.enter_context(hook(name))
+            try:
+                yield span
+            except BaseException:
+                span.ok = False
+                raise
+            finally:
+                span.seconds = time.perf_counter() - start
+                with self._lock:
+                    self.spans.append(span)
+                self.observe(name, span.seconds, bytes=span.bytes, rows=span.rows)
+                if trace_args is not None:
+                    trace_args.update(bytes=span.bytes, rows=span.rows)
+
+    def report(self) -> dict:
+        """Return the current run as a JSON-serialisable dict."""
+        report = dict(self.run)
+        report["phases"] = [asdict(s) for s in self.spans]
+        return report
+
+    def write_json(self, path: str | os.PathLike[str]) -> None:
+        """Write the current run report to *path*."""
+        _atomic_write(Path(path), json.dumps(self.report(), indent=2, default=str))
+
+    def prometheus(self, prefix: str = "ibmi") -> str:
+        """Render histograms and totals in Prometheus text format."""
+        lines: list[str] = []
+        with self._lock:
+            items = sorted(self.histograms.items())
+            totals = dict(self.totals)
+        for kind in sorted({k for k, _ in self.histograms}):
+            metric = f"{prefix}_{kind}_seconds"
+            lines.append(f"# HELP {metric} Duration of workflow {kind}s")
+            lines.append(f"# TYPE {metric} histogram")
+            for (k, name), hist in items:
+                if k != kind:
+                    continue
+                label = f'{kind}="{name}"'
+                for bound, seen in zip(hist.buckets, hist.counts, strict=True):
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {seen}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {hist.count}')
+                lines.append(f"{metric}_sum{{{label}}} {hist.total:.6f}")
+                lines.append(f"{metric}_count{{{label}}} {hist.count}")
+        for unit, idx in (("bytes", 0), ("rows", 1)):
+            metric = f"{prefix}_phase_{unit}_total"
+            lines.append(f"# HELP {metric} {unit.capitalize()} processed per phase")
+            lines.append(f"# TYPE {metric} counter")
+            for (kind, name), values in sorted(totals.items()):
+                if kind == "phase":
+                    lines.append(f'{metric}{{phase="{name}"}} {values[idx]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(
+        self, path: str | os.PathLike[str], prefix: str = "ibmi"
+    ) -> None:
+        """Write :meth:`prometheus` output for the node_exporter textfile collector."""
+        _atomic_write(Path(path), self.prometheus(prefix))
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Write *text* via a temporary file so readers never see partial output."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+#: Process-wide recorder used by :func:`src.utils.timed` and the workflow
+RECORDER = Recorder()
+
+
+def phase(name: str, **kwargs) -> ContextManager[Span]:
+    """Shortcut for ``RECORDER.phase``."""
+    return RECORDER.phase(name, **kwargs)
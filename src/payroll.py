@@ -1,72 +1,106 @@
-import time
 from pathlib import Path
 from tkinter import HORIZONTAL, LEFT, RIGHT, StringVar, Tk
 from tkinter.ttk import Button, Label, Progressbar
 
 from PIL import Image, ImageTk
 import payroll_b
+from src.worker import BackgroundJob, JobStatus
+
+# Milliseconds between polls of the worker's event queue
+POLL_MS = 100
+# payroll_b phases: status text and share of the progress bar
+PHASES = {
+    "convert": ("Convirtiendo Excel a CSV...", 10),
+    "connect": ("Conectando al IBM i...", 10),
+    "upload": ("Subiendo archivo", 70),
+    "run": ("Ejecutando el proceso en el IBM i...", 10),
+}
+
+job = None
+status = None
 
 
 def button_confirm():
-    """runs the interface"""
-    try:
-        task = 10
-        x = 0
-        while x < task:
-            time.sleep(1)
-            progress_bar['value'] += 10
-            x += 1
-            percent.set(
-                str(int((x / task) * 100)) + "% Iniciando Interfaz. Por Favor, Espere Hasta Que El Proceso Termine.")
-            WindowFrame.update_idletasks()
-
-        payroll_b_path = (Path(__file__).resolve().parent.parent / "payroll_b.py").resolve()
-        if not payroll_b_path.is_file():
-            raise FileNotFoundError(f"Missing payroll_b script: {payroll_b_path}")
-        rc = payroll_b.main()
-        if rc != 0:
-            raise RuntimeError(f"payroll_b exited with status {rc}")
-    except Exception as exc:
-        print(f"An error has occurred in payroll_b: {exc}")
-        raise
-    else:
+    """starts the interface work on a background worker"""
+    global job, status
+    if job is not None and job.is_alive():
+        return
+    payroll_b_path = (Path(__file__).resolve().parent.parent / "payroll_b.py").resolve()
+    if not payroll_b_path.is_file():
+        raise FileNotFoundError(f"Missing payroll_b script: {payroll_b_path}")
+    progress_bar['value'] = 0
+    percent.set("Iniciando Interfaz. Por Favor, Espere Hasta Que El Proceso Termine.")
+    status = JobStatus(PHASES)
+    job = BackgroundJob(payroll_b.main)
+    job.start()
+    WindowFrame.after(POLL_MS, poll_job)
+
+
+def poll_job():
+    """applies worker events on the Tk thread until the work is finished"""
+    for kind, value in job.drain():
+        status.apply(kind, value)
+        if kind == "error":
+            print(f"An error has occurred in payroll_b: {value}")
+            percent.set(f"Error: {value}")
+    progress_bar['value'] = status.percent
+    if not status.finished:
+        percent.set(status.text)
+        WindowFrame.after(POLL_MS, poll_job)
+        return
+    if job.cancelled:
+        print("payroll_b cancelled")
+        WindowFrame.quit()
+    elif status.outcome == "done" and status.result == 0:
         print("Successful execution of payroll_b")
-
-    WindowFrame.quit()
+        WindowFrame.quit()
+    elif status.outcome == "done":
+        print(f"An error has occurred in payroll_b: exited with status {status.result}")
+        percent.set("Error: el proceso remoto fallo")
 
 
 def button_cancel():
     """Cancel process and exit..."""
+    if job is not None and job.is_alive():
+        job.cancel()
+        percent.set("Cancelando...")
+        return
     WindowFrame.quit()
 
 
-WindowFrame = Tk()
-WindowFrame.geometry('500x500')
-WindowFrame.title("Interfaz Ajustes Salariales de Nomina SPI")
+def main():
+    global WindowFrame, progress_bar, percent, image_
+    WindowFrame = Tk()
+    WindowFrame.geometry('500x500')
+    WindowFrame.title("Interfaz Ajustes Salariales de Nomina SPI")
+
+    lbl = Label(WindowFrame, text='¿Desea Confirmar la Ejecucion del Proceso?')
+    lbl.config(font=('Arial)', 10))
+    lbl.pack()
+
+    # Progress bar ...
+    percent = StringVar()
+    progress_bar = Progressbar(WindowFrame, orient=HORIZONTAL, length=300, mode="determinate")
+    progress_bar.pack(pady=20)
 
-lbl = Label(WindowFrame, text='¿Desea Confirmar la Ejecucion del Proceso?')
-lbl.config(font=('Arial)', 10))
-lbl.pack()
+    Label(WindowFrame, textvariable=percent).pack()
 
-# Progress bar ...
-percent = StringVar()
-progress_bar = Progressbar(WindowFrame, orient=HORIZONTAL, length=300, mode="determinate")
-progress_bar.pack(pady=20)
+    image = Image.open("icons8-payroll-64.png")
+    image_ = ImageTk.PhotoImage(image)
+    lbl_img = Label(WindowFrame, image=image_)
+    lbl_img.pack()
 
-Label(WindowFrame, textvariable=percent).pack()
+    but1 = Button(WindowFrame, text='      OK           ', command=button_confirm)
+    but1.pack(side=LEFT, padx=15, pady=20)
+    but1.pack()
 
-image = Image.open("icons8-payroll-64.png")
-image_ = ImageTk.PhotoImage(image)
-lbl_img = Label(WindowFrame, image=image_)
-lbl_img.pack()
+    but2 = Button(WindowFrame, text='    Cancel     ', command=button_cancel)
+    but2.pack(side=RIGHT, padx=15, pady=20)
+    but2.pack()
 
-but1 = Button(WindowFrame, text='      OK           ', command=button_confirm)
-but1.pack(side=LEFT, padx=15, pady=20)
-but1.pack()
+    WindowFrame.resizable(0, 0)
+    WindowFrame.mainloop()
 
-but2 = Button(WindowFrame, text='    Cancel     ', command=button_cancel)
-but2.pack(side=RIGHT, padx=15, pady=20)
-but2.pack()
 
-WindowFrame.resizable(0, 0)
-WindowFrame.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import cProfile
+import io
+import logging
+import pstats
+import tracemalloc
+from contextlib import ContextDecorator, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from .metrics import RECORDER
+
+_TOP = 15
+
+
+class CPUProfile:
+    """cProfile the run with one profile per workflow phase.
+
+    While installed as a ``RECORDER`` phase hook, the active profiler is
+    switched at every phase boundary so hotspots are attributed to the phase
+    they occurred in; time outside any phase is kept under ``(run)``.
+    """
+
+    def __init__(self) -> None:
+        self.profiles: dict[str, cProfile.Profile] = {"(run)": cProfile.Profile()}
+        self._stack: list[cProfile.Profile] = [self.profiles["(run)"]]
+
+    @contextmanager
+    def phase_hook(self, name: str) -> Iterator[None]:
+        prev = self._stack[-1]
+        prof = self.profiles.setdefault(name, cProfile.Profile())
+        prev.disable()
+        prof.enable()
+        self._stack.append(prof)
+        try:
+            yield
+        finally:
+            prof.disable()
+            self._stack.pop()
+            prev.enable()
+
+    def __enter__(self) -> "CPUProfile":
+        RECORDER.hooks.append(self.phase_hook)
+        self._stack[0].enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stack[0].disable()
+        RECORDER.hooks.remove(self.phase_hook)
+
+    def write(self, out_dir: Path, top: int = _TOP) -> Path:
+        """Dump ``cpu_<phase>.pstats`` files and a hotspot summary."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        summary = io.StringIO()
+        for name, prof in self.profiles.items():
+            stats = pstats.Stats(prof, stream=summary)
+            if not stats.stats:
+                continue
+            safe = name.strip("()")
+            prof.dump_stats(str(out_dir / f"cpu_{safe}.pstats"))
+            summary.write(f"===== phase {name} =====\n")
+            stats.sort_stats("cumulative").print_stats(top)
+        path = out_dir / "cpu_hotspots.txt"
+        path.write_text(summary.getvalue(), encoding="utf-8")
+        return path
+
+
+@dataclass
+class MemoryProbe:
+    """Allocation statistics of one probed call."""
+
+    name: str
+    peak: int = 0
+    net: int = 0
+    top: list[str] = field(default_factory=list)
+
+
+class MemoryProfile:
+    """Collect ``tracemalloc`` snapshots around :class:`memory_probe` blocks."""
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.probes: list[MemoryProbe] = []
+        self._peaks: list[int] = []
+
+    def __enter__(self) -> "MemoryProfile":
+        global _MEMORY
+        tracemalloc.start(25)
+        _MEMORY = self
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _MEMORY
+        _MEMORY = None
+        tracemalloc.stop()
+
+    def _enter(self) -> tracemalloc.Snapshot:
+        if self._peaks:
+            # keep the enclosing probe's peak before resetting it for ours
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        self._peaks.append(0)
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def _exit(self, name: str, before: tracemalloc.Snapshot) -> None:
+        current_peak = tracemalloc.get_traced_memory()[1]
+        peak = max(self._peaks.pop(), current_peak)
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        after = tracemalloc.take_snapshot()
+        diff = after.compare_to(before, "lineno")
+        probe = MemoryProbe(
+            name,
+            peak=peak,
+            net=sum(stat.size_diff for stat in diff),
+            top=[str(stat) for stat in diff[: self.top]],
+        )
+        self.probes.append(probe)
+
+    def write(self, out_dir: Path) -> Path:
+        """Write peak allocation and top allocation sites per probe."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for probe in self.probes:
+            lines.append(
+                f"===== {probe.name}: peak {probe.peak / 1024:.1f} KiB, "
+                f"net {probe.net / 1024:+.1f} KiB ====="
+            )
+            lines.extend(probe.top)
+        path = out_dir / "mem_report.txt"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+_MEMORY: MemoryProfile | None = None
+
+
+class memory_probe(ContextDecorator):
+    """Snapshot allocations around a block or function when memory profiling.
+
+    Does nothing unless a :class:`MemoryProfile` is active.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._before: list = []
+
+    def __enter__(self) -> "memory_probe":
+        profile = _MEMORY
+        self._before.append((profile, profile._enter() if profile else None))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        profile, before = self._before.pop()
+        if profile is not None:
+            profile._exit(self.name, before)
+
+
+@contextmanager
+def profile(mode: str | None, out_dir: Path) -> Iterator[None]:
+    """Profile the enclosed run in *mode* ``cpu`` or ``mem`` into *out_dir*."""
+    if not mode:
+        yield
+        return
+    if mode not in ("cpu", "mem"):
+        raise ValueError(f"Unknown profile mode: {mode}")
+    prof = CPUProfile() if mode == "cpu" else MemoryProfile()
+    try:
+        with prof:
+            yield
+    finally:
+        report = prof.write(Path(out_dir))
+        if isinstance(prof, MemoryProfile):
+            RECORDER.annotate(
+                memory={p.name: {"peak": p.peak, "net": p.net} for p in prof.probes}
+            )
+        logging.getLogger(__name__).info("%s profile written to %s", mode, report)
@@ -0,0 +1,137 @@
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, TextIO
+
+# Weight of the newest sample in the smoothed instantaneous rate
+_ALPHA = 0.3
+
+
+@dataclass(frozen=True)
+class Progress:
+    """One progress report for a transfer (rates in bytes/s, times in s)."""
+
+    name: str
+    done: int
+    total: int
+    elapsed: float
+    rate: float
+    average: float
+
+    @property
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds left at the current rate, or ``None`` before it is known."""
+        rate = self.rate or self.average
+        if self.done >= self.total:
+            return 0.0
+        return (self.total - self.done) / rate if rate else None
+
+    @property
+    def finished(self) -> bool:
+        return self.done >= self.total
+
+
+class ProgressTracker:
+    """Paramiko-style ``callback(done, total)`` reporting :class:`Progress`.
+
+    paramiko calls back after every 32KiB block, so each call only reads
+    the clock; *on_progress* runs at most every *interval* seconds plus once
+    when the transfer completes. The instantaneous rate is smoothed over
+    those intervals.
+    """
+
+    def __init__(
+        self,
+        on_progress: Callable[[Progress], None],
+        name: str = "",
+        *,
+        interval: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.on_progress = on_progress
+        self.name = name
+        self.interval = interval
+        self._clock = clock
+        self._start = clock()
+        self._last_time = self._start
+        self._last_done = 0
+        self._rate = 0.0
+
+    def __call__(self, done: int, total: int) -> None:
+        now = self._clock()
+        if now - self._last_time < self.interval and done < total:
+            return
+        if done < self._last_done:  # restarted from the beginning
+            self._last_done = 0
+        span = now - self._last_time
+        if span > 0:
+            sample = (done - self._last_done) / span
+            self._rate = sample if not self._rate else (
+                _ALPHA * sample + (1 - _ALPHA) * self._rate
+            )
+        self._last_time, self._last_done = now, done
+        elapsed = now - self._start
+        self.on_progress(
+            Progress(
+                name=self.name,
+                done=done,
+                total=total,
+                elapsed=elapsed,
+                rate=self._rate,
+                average=done / elapsed if elapsed > 0 else 0.0,
+            )
+        )
+
+
+def chain(*callbacks: Callable[[int, int], None] | None) -> Callable | None:
+    """Combine paramiko-style callbacks, skipping ``None``; ``None`` if empty."""
+    active = [cb for cb in callbacks if cb is not None]
+    if not active:
+        return None
+    if len(active) == 1:
+        return active[0]
+
+    def _all(done: int, total: int) -> None:
+        for cb in active:
+            cb(done, total)
+
+    return _all
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1000 or unit == "GB":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1000
+    return f"{n:.1f}GB"  # pragma: no cover - loop always returns
+
+
+def format_progress(p: Progress) -> str:
+    """Return ``name  45% 450.0MB/1.0GB 12.3MB/s ETA 0:45`` for *p*."""
+    eta = p.eta
+    eta_text = "--:--" if eta is None else f"{int(eta // 60)}:{int(eta % 60):02d}"
+    return (
+        f"{p.name} {p.fraction:4.0%} {_size(p.done)}/{_size(p.total)} "
+        f"{_size(p.rate)}/s ETA {eta_text}"
+    )
+
+
+class ConsoleProgress:
+    """Render :class:`Progress` reports as one updating line on a terminal."""
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream or sys.stderr
+
+    def __call__(self, p: Progress) -> None:
+        line = format_progress(p)
+        if p.finished:
+            line = (
+                f"{p.name} done {_size(p.total)} in {p.elapsed:.1f}s "
+                f"({_size(p.average)}/s)"
+            )
+        self.stream.write(f"\r\x1b[K{line}" + ("\n" if p.finished else ""))
+        self.stream.flush()
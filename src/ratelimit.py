@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+# Longest single sleep, so rate changes take effect promptly
+_MAX_WAIT = 0.25
+
+
+def parse_rate(value: str | None) -> float | None:
+    """Parse ``2M``, ``512K`` or ``1500000`` bytes/s; empty or ``0`` is unlimited."""
+    value = (value or "").strip().upper().removesuffix("/S").removesuffix("B")
+    if not value:
+        return None
+    scale = {"K": 1e3, "M": 1e6, "G": 1e9}.get(value[-1:], 1.0)
+    rate = float(value.rstrip("KMG")) * scale
+    if rate < 0:
+        raise ValueError("Rate limit must not be negative")
+    return rate or None
+
+
+def parse_hours(value: str | None) -> tuple[int, int] | None:
+    """Parse ``7-19`` (local hours, end exclusive); empty means all day."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    start, _, end = value.partition("-")
+    hours = int(start), int(end)
+    if not all(0 <= h <= 24 for h in hours):
+        raise ValueError(f"Invalid hour range: {value}")
+    return hours
+
+
+class TokenBucket:
+    """Thread-safe byte rate limit shared by any number of transfers.
+
+    Up to *burst* bytes (default one second's worth) pass at once; after
+    that callers block so the long-run rate stays at *rate* bytes/s.
+    ``rate=None`` disables the limit. :attr:`rate` can be changed while
+    transfers are running. With *hours* ``(start, end)`` the limit only
+    applies between those local hours, e.g. ``(7, 19)`` for office hours.
+    """
+
+    def __init__(
+        self,
+        rate: float | None,
+        *,
+        burst: float | None = None,
+        hours: tuple[int, int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self._now = now
+        self._burst = burst
+        self.hours = hours
+        self._rate = rate or None
+        self._tokens = self.burst
+        self._stamp = clock()
+        self.waited = 0.0
+
+    @property
+    def rate(self) -> float | None:
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float | None) -> None:
+        with self._lock:
+            self._refill()
+            unlimited = self._rate is None
+            self._rate = value or None
+            # coming from unlimited, start with a full bucket rather than debt
+            self._tokens = self.burst if unlimited else min(self._tokens, self.burst)
+
+    @property
+    def burst(self) -> float:
+        return self._burst or self._rate or 0.0
+
+    def active(self) -> bool:
+        """Return whether the limit applies right now."""
+        if self._rate is None:
+            return False
+        if self.hours is None:
+            return True
+        start, end = self.hours
+        hour = self._now().hour
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self._rate:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._stamp) * self._rate
+            )
+        self._stamp = now
+
+    def consume(self, nbytes: int) -> None:
+        """Block until *nbytes* may be sent.
+
+        A request larger than the bucket is let through once the bucket is
+        not in debt and leaves it negative, so big writes never deadlock and
+        later callers pay the difference.
+        """
+        while True:
+            with self._lock:
+                if not self.active():
+                    return
+                self._refill()
+                if self._tokens >= 0:
+                    self._tokens -= nbytes
+                    return
+                wait = -self._tokens / self._rate
+            wait = min(wait, _MAX_WAIT)
+            self.waited += wait
+            self._sleep(wait)
+
+    def callback(self) -> Callable[[int, int], None]:
+        """Return a paramiko-style ``callback(done, total)`` that throttles."""
+        seen = 0
+
+        def _cb(done: int, total: int) -> None:
+            nonlocal seen
+            if done < seen:  # the transfer restarted from the beginning
+                seen = 0
+            if done > seen:
+                self.consume(done - seen)
+            seen = done
+
+        return _cb
@@ -0,0 +1,275 @@
+import itertools
+import json
+import os
+import shlex
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .ibmi_client import IBMiClient
+from .progress import ProgressTracker
+
+_VERSION = 1
+
+
+def _verb(cmd: str | Iterable[str]) -> str:
+    """Return only the command name (the CL verb for ``system``)."""
+    parts = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    if not parts:
+        return ""
+    if parts[0] == "system" and len(parts) > 1 and parts[1].split():
+        return parts[1].split()[0].upper()
+    return os.path.basename(parts[0])
+
+
+def _op_key(event: dict) -> str:
+    return f"{event['op']}:{event['verb']}" if "verb" in event else event["op"]
+
+
+@dataclass
+class Recording:
+    """Timed sequence of ``IBMiClient`` calls from one or more runs.
+
+    Events hold the operation, its offset from the start (``at``), its
+    duration and sizes only: never paths, commands arguments, file contents
+    or credentials. ``ssh_run`` keeps the command name (``RUNSQLSTM``,
+    ``SBMJOB``) and marker downloads keep ``SUCCESS``/``FAILED``.
+    """
+
+    events: list[dict] = field(default_factory=list)
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        payload = {"version": _VERSION, "events": self.events}
+        Path(path).write_text(json.dumps(payload, indent=1), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> "Recording":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("version") != _VERSION:
+            raise ValueError(f"Unsupported recording version in {path}")
+        return cls(payload["events"])
+
+    def latencies(self, key: str) -> list[float]:
+        """Durations of events with *key* (``op`` or ``op:verb``)."""
+        return [e["seconds"] for e in self.events if _op_key(e) == key]
+
+    @property
+    def marker_delay(self) -> float:
+        """Seconds from the end of ``SBMJOB`` until the marker was first seen."""
+        submitted = None
+        for event in self.events:
+            if _op_key(event) == "ssh_run:SBMJOB":
+                submitted = event["at"] + event["seconds"]
+            elif event["op"] == "listdir" and event.get("status") and submitted:
+                return max(0.0, event["at"] + event["seconds"] - submitted)
+        return 0.0
+
+
+class _RecordingSFTP:
+    """Proxy for ``client.sftp`` that records marker-directory polls."""
+
+    def __init__(self, owner: "RecordingClient", sftp) -> None:
+        self._owner = owner
+        self._sftp = sftp
+
+    def listdir(self, path: str) -> list[str]:
+        start = time.perf_counter()
+        entries = self._sftp.listdir(path)
+        has_status = any(name.endswith(".status") for name in entries)
+        self._owner._record("listdir", start, entries=len(entries), status=has_status)
+        return entries
+
+    def __getattr__(self, name: str):
+        return getattr(self._sftp, name)
+
+
+class RecordingClient:
+    """Wrap an ``IBMiClient`` and append each call's timing to a recording."""
+
+    def __init__(self, inner, recording: Recording) -> None:
+        self._inner = inner
+        self.recording = recording
+        self._t0 = time.perf_counter()
+
+    def _record(self, op: str, start: float, **fields) -> None:
+        now = time.perf_counter()
+        event = {"op": op, "at": start - self._t0, "seconds": now - start}
+        event.update(fields)
+        self.recording.events.append(event)
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def connect(self) -> None:
+        start = time.perf_counter()
+        self._inner.connect()
+        self._record("connect", start)
+
+    def close(self) -> None:
+        start = time.perf_counter()
+        self._inner.close()
+        self._record("close", start)
+
+    def ensure_remote_dirs(self, paths: Iterable[str]) -> None:
+        paths = list(paths)
+        start = time.perf_counter()
+        self._inner.ensure_remote_dirs(paths)
+        self._record("ensure_remote_dirs", start, count=len(paths))
+
+    def sftp_put(self, local: Path, remote: str, **kwargs) -> None:
+        start = time.perf_counter()
+        self._inner.sftp_put(local, remote, **kwargs)
+        self._record("sftp_put", start, bytes=os.path.getsize(local))
+
+    def sftp_get(self, remote: str, local: Path, **kwargs) -> None:
+        start = time.perf_counter()
+        self._inner.sftp_get(remote, local, **kwargs)
+        fields = {"bytes": os.path.getsize(local) if os.path.exists(local) else 0}
+        if remote.endswith(".status") and os.path.exists(local):
+            text = Path(local).read_text(errors="ignore")
+            fields["marker"] = "FAILED" if "FAILED" in text else "SUCCESS"
+        self._record("sftp_get", start, **fields)
+
+    def ssh_run(self, cmd, timeout: int = 60) -> tuple[str, str, int]:
+        start = time.perf_counter()
+        out, err, rc = self._inner.ssh_run(cmd, timeout=timeout)
+        self._record("ssh_run", start, verb=_verb(cmd), rc=rc)
+        return out, err, rc
+
+    @property
+    def sftp(self):
+        inner = self._inner.sftp
+        return None if inner is None else _RecordingSFTP(self, inner)
+
+    def __getattr__(self, name: str):
+        return getattr(self._inner, name)
+
+
+def recording_factory(
+    recording: Recording, factory: Callable | None = None
+) -> Callable:
+    """Return a ``client_factory`` for ``run_workflow`` that records calls."""
+    factory = factory or IBMiClient
+
+    def _make(config, dry_run: bool = False) -> RecordingClient:
+        return RecordingClient(factory(config, dry_run=dry_run), recording)
+
+    return _make
+
+
+class _ReplaySFTP:
+    def __init__(self, owner: "ReplayClient") -> None:
+        self._owner = owner
+
+    def listdir(self, path: str) -> list[str]:
+        return self._owner._listdir(path)
+
+
+class ReplayClient:
+    """``IBMiClient`` stand-in that reproduces a recording's timing.
+
+    Each call sleeps for the next recorded duration of the same operation
+    (cycling when the recording runs out), divided by *speed*. Transfers
+    scale with the size of the file actually sent. The status marker shows
+    up :attr:`Recording.marker_delay` seconds after ``SBMJOB``, so polling
+    changes see a realistic wait.
+    """
+
+    def __init__(
+        self,
+        config,
+        dry_run: bool = False,
+        *,
+        recording: Recording,
+        speed: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.config = config
+        self.dry_run = dry_run
+        self.recording = recording
+        self.speed = speed
+        self._sleep = sleep
+        self._cycles: dict[str, Iterator[dict]] = {}
+        self._submitted: float | None = None
+        self._marker = "FAILED" not in {
+            e.get("marker") for e in recording.events if "marker" in e
+        }
+        self.sftp = _ReplaySFTP(self)
+
+    def _next(self, key: str) -> dict | None:
+        if key not in self._cycles:
+            events = [e for e in self.recording.events if _op_key(e) == key]
+            self._cycles[key] = itertools.cycle(events) if events else iter(())
+        return next(self._cycles[key], None)
+
+    def _pace(self, key: str, nbytes: int | None = None) -> dict:
+        event = self._next(key) or {}
+        seconds = event.get("seconds", 0.0)
+        if nbytes is not None and event.get("bytes"):
+            seconds *= nbytes / event["bytes"]
+        if seconds and not self.dry_run:
+            self._sleep(seconds / self.speed)
+        return event
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def connect(self) -> None:
+        self._pace("connect")
+
+    def close(self) -> None:
+        self._pace("close")
+
+    def ensure_remote_dirs(self, paths: Iterable[str]) -> None:
+        self._pace("ensure_remote_dirs")
+
+    def sftp_put(self, local: Path, remote: str, *, progress=None, **_) -> None:
+        size = os.path.getsize(local)
+        self._pace("sftp_put", size)
+        if progress is not None:
+            ProgressTracker(progress, Path(local).name)(size, size)
+
+    def sftp_get(self, remote: str, local: Path, **_) -> None:
+        if remote.endswith(".status"):
+            self._pace("sftp_get")
+            Path(local).write_text("SUCCESS\n" if self._marker else "FAILED\n")
+            return
+        event = self._pace("sftp_get")
+        with open(local, "wb") as fh:
+            fh.truncate(event.get("bytes", 0))
+
+    def ssh_run(self, cmd, timeout: int = 60) -> tuple[str, str, int]:
+        verb = _verb(cmd)
+        event = self._pace(f"ssh_run:{verb}")
+        if verb == "SBMJOB":
+            self._submitted = time.monotonic()
+        return "", "", event.get("rc", 0)
+
+    def _listdir(self, path: str) -> list[str]:
+        self._pace("listdir")
+        if self._submitted is None:
+            return []
+        waited = time.monotonic() - self._submitted
+        if waited >= self.recording.marker_delay / self.speed:
+            return ["RUN00000000000000.status"]
+        return []
+
+
+def replay_factory(recording: Recording, *, speed: float = 1.0) -> Callable:
+    """Return a ``client_factory`` for ``run_workflow`` that replays *recording*."""
+
+    def _make(config, dry_run: bool = False) -> ReplayClient:
+        return ReplayClient(config, dry_run, recording=recording, speed=speed)
+
+    return _make
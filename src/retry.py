@@ -0,0 +1,232 @@
+import errno
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# Exception class names (matched anywhere in the MRO so paramiko need not be
+# imported here) that will fail the same way however often they are retried.
+_FATAL_NAMES = {
+    "AuthenticationException",
+    "BadAuthenticationType",
+    "PasswordRequiredException",
+    "BadHostKeyException",
+}
+_FATAL_ERRNOS = {errno.ENOENT, errno.EACCES, errno.EPERM, errno.ENOTDIR, errno.EISDIR}
+_CHUNK = 32768
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with jitter, bounded by attempts and a time budget.
+
+    The n-th retry waits ``base_delay * multiplier ** (n - 1)`` seconds,
+    capped at *max_delay*, minus a random share of up to *jitter* of that
+    delay. No retry is started once *budget* seconds would be exceeded.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    budget: float = 300.0
+
+    def delay(self, retry: int, rng: Callable[[], float] = random.random) -> float:
+        """Return the sleep before the *retry*-th retry (1-based)."""
+        raw = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return raw * (1 - self.jitter * rng())
+
+
+@dataclass
+class RetryMetrics:
+    """Counters describing retry behaviour, shared across calls."""
+
+    attempts: int = 0
+    retries: int = 0
+    fatal: int = 0
+    exhausted: int = 0
+    slept: float = 0.0
+    reconnects: int = 0
+    resumed_bytes: int = 0
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return whether *exc* looks transient (network, timeout, IPL window).
+
+    Authentication and host-key failures, bad arguments and missing or
+    forbidden remote files are permanent and are not retried.
+    """
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & _FATAL_NAMES:
+        return False
+    if "SSHException" in names:
+        # RejectPolicy failures are permanent, protocol/banner errors are not
+        return "known_hosts" not in str(exc)
+    if isinstance(exc, (TimeoutError, ConnectionError, EOFError)):
+        return True
+    if isinstance(exc, OSError):
+        return exc.errno not in _FATAL_ERRNOS
+    return False
+
+
+def retry_call(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    *,
+    metrics: RetryMetrics | None = None,
+    on_retry: Callable[[BaseException, int], None] | None = None,
+    sleep: Callable[[float], None] | None = None,
+    rng: Callable[[], float] = random.random,
+    what: str = "operation",
+) -> T:
+    """Call *fn* until it succeeds, retrying transient errors per *policy*.
+
+    *on_retry* runs before each retry with the error and the failed attempt
+    number, e.g. to re-establish a dead transport. The last error is
+    re-raised when it is permanent or the policy is exhausted.
+    """
+    log = logging.getLogger(__name__)
+    sleep = sleep or time.sleep
+    metrics = metrics if metrics is not None else RetryMetrics()
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        metrics.attempts += 1
+        try:
+            return fn()
+        except Exception as exc:
+            if not is_retryable(exc):
+                metrics.fatal += 1
+                raise
+            delay = policy.delay(attempt, rng)
+            elapsed = time.monotonic() - start
+            if attempt >= policy.max_attempts or elapsed + delay > policy.budget:
+                metrics.exhausted += 1
+                log.error("%s failed after %s attempts: %s", what, attempt, exc)
+                raise
+            metrics.retries += 1
+            metrics.slept += delay
+            log.warning(
+                "%s failed (attempt %s/%s): %s; retrying in %.1fs",
+                what,
+                attempt,
+                policy.max_attempts,
+                exc,
+                delay,
+            )
+            sleep(delay)
+            if on_retry is not None:
+                on_retry(exc, attempt)
+
+
+def _remote_size(sftp, remote: str) -> int:
+    try:
+        return sftp.stat(remote).st_size or 0
+    except IOError:
+        return 0
+
+
+def _cb_kwargs(callback: Callable[[int, int], None] | None) -> dict:
+    return {"callback": callback} if callback is not None else {}
+
+
+class TransferTracker:
+    """Transfer callback recording how many bytes this transfer has written.
+
+    Pass it as the ``callback`` of every attempt of one transfer, and its
+    :attr:`written` to :func:`resume_put`/:func:`resume_get`, so a retry
+    only trusts bytes it knows it wrote. *callback*, if given, is chained.
+    """
+
+    def __init__(self, callback: Callable[[int, int], None] | None = None) -> None:
+        self.written = 0
+        self._callback = callback
+
+    def __call__(self, done: int, total: int) -> None:
+        # a restarted attempt reports from zero again, so keep the latest
+        self.written = done
+        if self._callback is not None:
+            self._callback(done, total)
+
+
+def resume_put(
+    sftp,
+    local: Path,
+    remote: str,
+    metrics: RetryMetrics | None = None,
+    callback: Callable[[int, int], None] | None = None,
+    *,
+    written: int = 0,
+) -> None:
+    """Finish uploading *local* after an interrupted attempt.
+
+    *written* is how many bytes earlier attempts of this upload confirmed
+    (see :class:`TransferTracker`). Only a remote file no longer than that
+    is kept as a prefix; anything else, such as a stale file from an
+    earlier run, is overwritten by a full upload. *callback* gets
+    ``(bytes_done, total)`` like paramiko's ``put``.
+    """
+    size = os.path.getsize(local)
+    offset = _remote_size(sftp, remote)
+    if not 0 < offset <= min(written, size):
+        sftp.put(str(local), remote, **_cb_kwargs(callback))
+        return
+    if offset == size:
+        return
+    with open(local, "rb") as src, sftp.open(remote, "r+b") as dst:
+        src.seek(offset)
+        dst.seek(offset)
+        dst.set_pipelined(True)
+        done = offset
+        for chunk in iter(lambda: src.read(_CHUNK), b""):
+            dst.write(chunk)
+            done += len(chunk)
+            if callback is not None:
+                callback(done, size)
+    if metrics is not None:
+        metrics.resumed_bytes += offset
+    logging.getLogger(__name__).info("Resumed upload of %s at byte %s", local, offset)
+
+
+def resume_get(
+    sftp,
+    remote: str,
+    local: Path,
+    metrics: RetryMetrics | None = None,
+    callback: Callable[[int, int], None] | None = None,
+    *,
+    written: int = 0,
+) -> None:
+    """Finish downloading *remote* into a partially written *local* file.
+
+    As with :func:`resume_put`, only the *written* bytes this download
+    confirmed are kept; any other existing *local* file is replaced.
+    """
+    size = sftp.stat(remote).st_size or 0
+    offset = local.stat().st_size if local.exists() else 0
+    if not 0 < offset <= min(written, size):
+        sftp.get(remote, str(local), **_cb_kwargs(callback))
+        return
+    if offset == size:
+        return
+    with sftp.open(remote, "rb") as src, open(local, "ab") as dst:
+        src.seek(offset)
+        src.prefetch(size)
+        done = offset
+        for chunk in iter(lambda: src.read(_CHUNK), b""):
+            dst.write(chunk)
+            done += len(chunk)
+            if callback is not None:
+                callback(done, size)
+    if metrics is not None:
+        metrics.resumed_bytes += offset
+    logging.getLogger(__name__).info(
+        "Resumed download of %s at byte %s", remote, offset
+    )
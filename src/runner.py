@@ -1,7 +1,20 @@
 import argparse
+import json
 import logging
+import os
+import signal
+import sys
+import threading
+import time
+from dataclasses import asdict
 from pathlib import Path
 
+from . import datagen, diagnose, profiling, replay, tracing
+from .checkpoint import CheckpointStore
+from .history import RunHistory, format_table
+from .metrics import RECORDER
+from .progress import ConsoleProgress
+from .ratelimit import parse_rate
 from .utils import load_config, setup_logger
 from .workflow import run_workflow
 
@@ -17,17 +30,392 @@ def parse_args() -> argparse.Namespace:
         "--dry-run", action="store_true", help="Print actions without executing"
     )
     parser.add_argument("--timeout-seconds", type=int, default=600)
+    parser.add_argument(
+        "--export",
+        choices=("full", "delta"),
+        default="full",
+        help="Export the whole shadow table or only rows touched by this run",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("sftp", "odbc"),
+        default="sftp",
+        help="Upload via SFTP + submitted job, or bulk-load directly over ODBC",
+    )
     parser.add_argument("--jobq")
     parser.add_argument("--outq")
     parser.add_argument("--lib-stg")
     parser.add_argument("--ifs-dir")
     parser.add_argument("--teardown", action="store_true", help="Drop staging schema")
+    parser.add_argument("--metrics-json", help="Write a JSON run report to this file")
+    parser.add_argument(
+        "--metrics-prom", help="Write Prometheus textfile-collector metrics here"
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE", help="Write a Chrome trace-event JSON timeline"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=("cpu", "mem"),
+        help="Profile CPU hotspots per phase or memory of local preparation",
+    )
+    parser.add_argument(
+        "--profile-dir", default="outputs/profile", help="Where profile reports go"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Save the IBMiClient call timings (no data or credentials)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Replay a --record file instead of connecting to the IBM i",
+    )
+    parser.add_argument(
+        "--replay-speed", type=float, default=1.0, help="Replay N times faster"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        help="Cap SFTP transfers, e.g. 2M bytes/s (0 = unlimited; IBMI_RATE_LIMIT)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run of this file from its last finished phase",
+    )
+    parser.add_argument(
+        "--end-job",
+        action=argparse.BooleanOptionalAction,
+        default=os.getenv("IBMI_END_JOB", "false").lower() == "true",
+        help="ENDJOB the submitted job on timeout or Ctrl-C (IBMI_END_JOB)",
+    )
+    parser.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        help="Show upload progress (default: when stderr is a terminal)",
+    )
     return parser.parse_args()
 
 
+def _write_reports(args: argparse.Namespace) -> None:
+    try:
+        tracer = tracing.stop_tracing()
+        if tracer is not None and args.trace:
+            tracer.write(args.trace)
+        if args.metrics_json:
+            RECORDER.write_json(args.metrics_json)
+        if args.metrics_prom:
+            RECORDER.write_prometheus(args.metrics_prom)
+    except OSError as exc:  # pragma: no cover - reporting must not fail a run
+        logging.warning("Could not write metrics: %s", exc)
+
+
+def _history(argv: list[str]) -> int:
+    """``history`` subcommand: print phase, throughput and host trends."""
+    parser = argparse.ArgumentParser(
+        prog="payroll history", description="Query the local run history"
+    )
+    parser.add_argument(
+        "--db",
+        default=os.getenv("IBMI_HISTORY_DB") or "outputs/history.db",
+        help="History database (default IBMI_HISTORY_DB or outputs/history.db)",
+    )
+    parser.add_argument("--days", type=float, help="Only runs from the last N days")
+    parser.add_argument("--limit", type=int, default=5, help="Hosts to list")
+    parser.add_argument(
+        "--report",
+        choices=("phases", "throughput", "hosts", "all"),
+        default="all",
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+    if not Path(args.db).is_file():
+        logging.error("No run history at %s", args.db)
+        return 1
+    store = RunHistory(args.db)
+    reports = {
+        "phases": lambda: store.phase_stats(days=args.days),
+        "throughput": lambda: store.throughput(days=args.days),
+        "hosts": lambda: store.slowest_hosts(days=args.days, limit=args.limit),
+    }
+    wanted = list(reports) if args.report == "all" else [args.report]
+    results = {name: reports[name]() for name in wanted}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, rows in results.items():
+            print(f"== {name} ==")
+            print(format_table(rows))
+            print()
+    return 0
+
+
+def _generate(argv: list[str]) -> int:
+    """``generate`` subcommand: write a synthetic payroll CSV/XLSX/XLS file."""
+    parser = argparse.ArgumentParser(
+        prog="payroll generate", description="Generate synthetic payroll data"
+    )
+    parser.add_argument("--out", required=True, help="Output .csv, .xlsx or .xls")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    for name, help_text in (
+        ("malformed", "rejected as PARSE_ERROR"),
+        ("duplicates", "repeat a recent id (DUPLICATE_ID; fails an SFTP run)"),
+        ("negative", "valid negative adjustments"),
+        ("out-of-range", "amount above DECIMAL(9,2) (OUT_OF_RANGE; fails SFTP)"),
+        ("crlf", "lines ending in CRLF (CSV only)"),
+    ):
+        parser.add_argument(
+            f"--{name}", type=float, default=0.0, help=f"Fraction {help_text}"
+        )
+    args = parser.parse_args(argv)
+    mix = datagen.Mix(
+        malformed=args.malformed,
+        duplicates=args.duplicates,
+        negative=args.negative,
+        out_of_range=args.out_of_range,
+        crlf=args.crlf,
+    )
+    stats = datagen.generate(Path(args.out), args.rows, seed=args.seed, mix=mix)
+    print(
+        json.dumps(
+            {
+                "out": args.out,
+                "rows": stats.rows,
+                "bytes": stats.bytes,
+                "counts": stats.counts,
+                # apply.sql fails the whole job instead of rejecting these
+                "expected_rejects": {
+                    "odbc": stats.expected_rejects("odbc"),
+                    "sftp": (
+                        stats.expected_rejects("sftp") if stats.sftp_safe else None
+                    ),
+                },
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+def _diagnose(argv: list[str]) -> int:
+    """``diagnose`` subcommand: measure the link and suggest transfer settings."""
+    parser = argparse.ArgumentParser(
+        prog="payroll diagnose",
+        description="Measure handshake, exec latency and SFTP throughput",
+    )
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--size-mb", type=float, default=8.0, help="Bulk payload")
+    parser.add_argument(
+        "--blocks", default="32,64,256,1024", help="Transfer block sizes in KB"
+    )
+    parser.add_argument(
+        "--parallel", default="2,4", help="Parallel SFTP channel counts to try"
+    )
+    parser.add_argument("--no-compression", action="store_true")
+    parser.add_argument("--ifs-dir", help="Scratch parent (default IFS_STAGING_DIR)")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+    cfg = load_config()
+    if args.ifs_dir:
+        cfg.ifs_dir = args.ifs_dir
+    result = diagnose.diagnose(
+        cfg,
+        samples=args.samples,
+        size_mb=args.size_mb,
+        blocks=tuple(int(b) * 1024 for b in args.blocks.split(",") if b),
+        compression=not args.no_compression,
+        parallel=tuple(int(n) for n in args.parallel.split(",") if n),
+    )
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+        return 0
+    print(f"== {result.host} ({result.cipher or 'unknown cipher'}) ==")
+    print(format_table(result.rows()))
+    print()
+    for tip in result.recommendations:
+        print(f"- {tip}")
+    return 0
+
+
+def _watch(argv: list[str]) -> int:
+    """``watch`` subcommand: push files dropped into a folder in micro-batches."""
+    from .watch import DropFolderWatcher
+
+    parser = argparse.ArgumentParser(
+        prog="payroll watch",
+        description="Watch a drop folder and push new files over one SSH session",
+    )
+    parser.add_argument("--dir", required=True, help="Drop folder to watch")
+    parser.add_argument("--done-dir", help="Processed files (default DIR/done)")
+    parser.add_argument("--failed-dir", help="Rejected files (default DIR/failed)")
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="Seconds a file must stay unchanged before it is picked up",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=2.0,
+        help="Close a batch after this many seconds without new files",
+    )
+    parser.add_argument("--max-batch", type=int, default=100, help="Files per batch")
+    parser.add_argument(
+        "--max-wait", type=float, default=30.0, help="Longest wait for a batch"
+    )
+    parser.add_argument("--poll", type=float, default=0.5, help="Scan interval")
+    parser.add_argument(
+        "--once", action="store_true", help="Exit once the folder is empty"
+    )
+    parser.add_argument("--sync", action="store_true", help="Upload scripts first")
+    parser.add_argument("--fetch-outputs", action="store_true")
+    parser.add_argument("--export", choices=("full", "delta"), default="full")
+    parser.add_argument("--timeout-seconds", type=int, default=600)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+    watcher = DropFolderWatcher(
+        load_config(),
+        Path(args.dir),
+        done=Path(args.done_dir) if args.done_dir else None,
+        failed=Path(args.failed_dir) if args.failed_dir else None,
+        settle=args.settle,
+        window=args.batch_window,
+        max_files=args.max_batch,
+        max_wait=args.max_wait,
+        poll=args.poll,
+        sync=args.sync,
+        fetch_outputs=args.fetch_outputs,
+        timeout=args.timeout_seconds,
+        export_mode=args.export,
+        dry_run=args.dry_run,
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        watcher.run(stop, once=args.once)
+    except KeyboardInterrupt:
+        logging.info("Stopped")
+    failed = [r for r in watcher.results if r.status == "FAILED"]
+    return 1 if args.once and failed else 0
+
+
+def _queue(argv: list[str]) -> int:
+    """``queue`` subcommand: add, list, cancel or run queued workflow runs."""
+    from . import jobqueue
+
+    parser = argparse.ArgumentParser(
+        prog="payroll queue", description="Durable local queue of workflow runs"
+    )
+    parser.add_argument(
+        "--db",
+        default=os.getenv("IBMI_QUEUE_DB") or "outputs/queue.db",
+        help="Queue database (default IBMI_QUEUE_DB or outputs/queue.db)",
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+    add = actions.add_parser(
+        "add", help="Queue a file; other runner flags (--sync, ...) pass through"
+    )
+    add.add_argument("--file", required=True)
+    add.add_argument("--host", help="Default IBMI_HOST")
+    add.add_argument("--jobq", help="Default JOBQ")
+    add.add_argument("--ifs-dir", help="Default IFS_STAGING_DIR")
+    add.add_argument(
+        "--priority", type=int, default=5, help="0-9, lower runs first (default 5)"
+    )
+    add.add_argument("--deadline", help="ISO date-time, or +30m / +2h from now")
+    listing = actions.add_parser("list", help="Show queued and running jobs")
+    listing.add_argument("--all", action="store_true", help="Include finished jobs")
+    listing.add_argument("--json", action="store_true", help="Print JSON")
+    cancel = actions.add_parser("cancel", help="Cancel a job that has not started")
+    cancel.add_argument("job_id", type=int)
+    run = actions.add_parser("run", help="Start queued jobs within the caps")
+    run.add_argument(
+        "--host-limit", type=int, help="Jobs per host (IBMI_QUEUE_HOST_LIMIT, 2)"
+    )
+    run.add_argument("--jobq-limits", help="Per-JOBQ caps, e.g. QBATCH=1,QSYSNOMAX=4")
+    run.add_argument("--poll", type=float, default=1.0)
+    run.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.action != "add":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    queue = jobqueue.JobQueue(args.db)
+    if args.action == "add":
+        if not (args.host and args.jobq and args.ifs_dir):
+            cfg = load_config()
+        job_id = queue.enqueue(
+            args.file,
+            host=args.host or cfg.host,
+            jobq=args.jobq or cfg.jobq,
+            ifs_dir=args.ifs_dir or cfg.ifs_dir,
+            priority=args.priority,
+            deadline=jobqueue.parse_deadline(args.deadline),
+            args=extra,
+        )
+        print(job_id)
+    elif args.action == "list":
+        states = jobqueue.STATES if args.all else ("queued", "running")
+        jobs = queue.jobs(states)
+        if args.json:
+            print(json.dumps([asdict(job) for job in jobs], indent=2))
+        else:
+            rows = [
+                {
+                    "id": job.job_id,
+                    "state": job.state,
+                    "pty": job.priority,
+                    "deadline": (
+                        time.strftime("%Y-%m-%d %H:%M", time.localtime(job.deadline))
+                        if job.deadline
+                        else ""
+                    ),
+                    "host": job.host,
+                    "jobq": job.jobq,
+                    "file": Path(job.file).name,
+                }
+                for job in jobs
+            ]
+            print(format_table(rows))
+    elif args.action == "cancel":
+        if not queue.cancel(args.job_id):
+            logging.error("Job %d is not queued", args.job_id)
+            return 1
+    else:
+        limits = jobqueue.Limits.from_env()
+        if args.host_limit is not None:
+            limits.host = args.host_limit
+        if args.jobq_limits:
+            limits.jobq.update(jobqueue.parse_limits(args.jobq_limits))
+        scheduler = jobqueue.Scheduler(queue, limits, poll=args.poll)
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            scheduler.run(stop, once=args.once)
+        except KeyboardInterrupt:
+            logging.info("Stopped")
+    return 0
+
+
+# ``python -m src.runner <name> ...`` dispatches here instead of a workflow run
+_SUBCOMMANDS = {
+    "history": _history,
+    "generate": _generate,
+    "diagnose": _diagnose,
+    "watch": _watch,
+    "queue": _queue,
+}
+
+
 def main() -> int:
     setup_logger()
+    if sys.argv[1:2] and sys.argv[1] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
     args = parse_args()
+    recording = None
+    if args.trace:
+        tracing.start_tracing()
     try:
         cfg = load_config()
         if args.jobq:
@@ -38,22 +426,48 @@ def main() -> int:
             cfg.lib_stg = args.lib_stg
         if args.ifs_dir:
             cfg.ifs_dir = args.ifs_dir
+        if args.rate_limit is not None:
+            cfg.rate_limit = parse_rate(args.rate_limit)
         if args.teardown:
             from .workflow import teardown
 
             teardown(cfg, dry_run=args.dry_run)
         else:
-            run_workflow(
-                Path(args.file),
-                cfg,
-                sync=args.sync,
-                fetch_outputs=args.fetch_outputs,
-                timeout=args.timeout_seconds,
-                dry_run=args.dry_run,
-            )
+            client_factory = None
+            if args.replay:
+                recorded = replay.Recording.load(args.replay)
+                client_factory = replay.replay_factory(
+                    recorded, speed=args.replay_speed
+                )
+            elif args.record:
+                recording = replay.Recording()
+                client_factory = replay.recording_factory(recording)
+            show = args.progress if args.progress is not None else sys.stderr.isatty()
+            with profiling.profile(args.profile, Path(args.profile_dir)):
+                run_workflow(
+                    Path(args.file),
+                    cfg,
+                    sync=args.sync,
+                    fetch_outputs=args.fetch_outputs,
+                    timeout=args.timeout_seconds,
+                    dry_run=args.dry_run,
+                    export_mode=args.export,
+                    transport=args.transport,
+                    client_factory=client_factory,
+                    progress=ConsoleProgress() if show else None,
+                    checkpoints=CheckpointStore(
+                        os.getenv("IBMI_CHECKPOINT_DIR") or "outputs/checkpoints"
+                    ),
+                    resume=args.resume,
+                    end_job=args.end_job,
+                )
     except Exception as exc:  # pragma: no cover - CLI wrapper
         logging.error("%s", exc)
         return 1
+    finally:
+        if recording is not None:
+            recording.save(args.record)
+        _write_reports(args)
     return 0
 
 
@@ -0,0 +1,136 @@
+import os
+from dataclasses import dataclass, replace
+from typing import Callable, Mapping
+
+
+@dataclass(frozen=True)
+class TransportProfile:
+    """Preferred SSH algorithms and channel sizes for a paramiko transport.
+
+    Algorithms listed here are tried first, in order; the remaining ones
+    paramiko supports stay enabled after them so a server lacking the
+    preferred choices can still negotiate. Empty fields keep paramiko's
+    defaults (2MiB window, 32KiB packets).
+    """
+
+    name: str = "default"
+    ciphers: tuple[str, ...] = ()
+    kex: tuple[str, ...] = ()
+    macs: tuple[str, ...] = ()
+    window_size: int | None = None
+    max_packet_size: int | None = None
+
+    @property
+    def is_default(self) -> bool:
+        return not (
+            self.ciphers
+            or self.kex
+            or self.macs
+            or self.window_size
+            or self.max_packet_size
+        )
+
+    def apply(self, transport) -> None:
+        """Reorder *transport*'s algorithm preferences before it starts."""
+        opts = transport.get_security_options()
+        for attr, preferred in (
+            ("ciphers", self.ciphers),
+            ("kex", self.kex),
+            ("digests", self.macs),
+        ):
+            if not preferred:
+                continue
+            current = getattr(opts, attr)
+            first = tuple(name for name in preferred if name in current)
+            rest = tuple(name for name in current if name not in first)
+            setattr(opts, attr, first + rest)
+
+    def transport_factory(self) -> Callable:
+        """Return a ``transport_factory`` for :meth:`paramiko.SSHClient.connect`."""
+        import paramiko
+
+        def _make(sock, **kwargs):
+            if self.window_size:
+                kwargs["default_window_size"] = self.window_size
+            if self.max_packet_size:
+                kwargs["default_max_packet_size"] = self.max_packet_size
+            transport = paramiko.Transport(sock, **kwargs)
+            self.apply(transport)
+            return transport
+
+        return _make
+
+    def connect_kwargs(self) -> dict:
+        """Extra ``SSHClient.connect`` arguments; empty for paramiko defaults."""
+        if self.is_default:
+            return {}
+        return {"transport_factory": self.transport_factory()}
+
+
+PROFILES = {
+    "default": TransportProfile(),
+    # AES-GCM needs no separate MAC pass and is hardware accelerated on
+    # POWER8 and later; curve25519 keeps the handshake cheap
+    "fast": TransportProfile(
+        name="fast",
+        ciphers=("aes128-gcm@openssh.com", "aes256-gcm@openssh.com", "aes128-ctr"),
+        kex=("curve25519-sha256@libssh.org", "ecdh-sha2-nistp256"),
+        macs=("hmac-sha2-256-etm@openssh.com", "hmac-sha2-256"),
+        window_size=16 * 2**20,
+        max_packet_size=2**15,
+    ),
+    # Older IBM i OpenSSH builds without GCM or curve25519 support
+    "legacy": TransportProfile(
+        name="legacy",
+        ciphers=("aes128-ctr", "aes256-ctr"),
+        kex=(
+            "diffie-hellman-group14-sha256",
+            "diffie-hellman-group-exchange-sha256",
+            "diffie-hellman-group14-sha1",
+        ),
+        macs=("hmac-sha2-256", "hmac-sha1"),
+        window_size=8 * 2**20,
+    ),
+}
+
+
+def _names(value: str) -> tuple[str, ...]:
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+def _size(value: str) -> int:
+    """Parse ``16777216``, ``16M`` or ``256K`` as bytes."""
+    value = value.strip().upper().removesuffix("B").removesuffix("I")
+    scale = {"K": 2**10, "M": 2**20}.get(value[-1:], 1)
+    return int(value.rstrip("KM")) * scale
+
+
+def profile_from_env(environ: Mapping[str, str] | None = None) -> TransportProfile:
+    """Build the profile named by ``IBMI_SSH_PROFILE`` plus per-field overrides.
+
+    ``IBMI_SSH_CIPHERS``, ``IBMI_SSH_KEX`` and ``IBMI_SSH_MACS`` take
+    comma-separated algorithm names; ``IBMI_SSH_WINDOW`` and
+    ``IBMI_SSH_PACKET`` take sizes such as ``16M``.
+    """
+    env = os.environ if environ is None else environ
+    name = env.get("IBMI_SSH_PROFILE", "").strip() or "default"
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown IBMI_SSH_PROFILE {name!r}; choose from {', '.join(PROFILES)}"
+        )
+    profile = PROFILES[name]
+    overrides: dict = {}
+    for key, attr in (
+        ("IBMI_SSH_CIPHERS", "ciphers"),
+        ("IBMI_SSH_KEX", "kex"),
+        ("IBMI_SSH_MACS", "macs"),
+    ):
+        if env.get(key):
+            overrides[attr] = _names(env[key])
+    for key, attr in (
+        ("IBMI_SSH_WINDOW", "window_size"),
+        ("IBMI_SSH_PACKET", "max_packet_size"),
+    ):
+        if env.get(key):
+            overrides[attr] = _size(env[key])
+    return replace(profile, **overrides) if overrides else profile
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Iterator
+
+# Returned by span() while tracing is off so disabled tracing costs one
+# global lookup per span and allocates nothing.
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """Collects Chrome trace-event "complete" (``X``) events.
+
+    The file written by :meth:`write` loads in ``chrome://tracing``,
+    Perfetto and other trace-event viewers; nesting follows from the
+    timestamps of spans on the same thread.
+    """
+
+    def __init__(self, process_name: str = "ibmi-payroll") -> None:
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter()
+        self.events: list[dict] = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": 0,
+                "args": {"name": process_name},
+            }
+        ]
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._t0) * 1e6
+
+    @contextmanager
+    def span(self, name: str, cat: str = "workflow", **args) -> Iterator[dict]:
+        """Record the enclosed block; the yielded dict becomes the event args."""
+        start = self._now_us()
+        try:
+            yield args
+        except BaseException as exc:
+            args["error"] = type(exc).__name__
+            raise
+        finally:
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round(start, 3),
+                "dur": round(self._now_us() - start, 3),
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def write(self, path: str | os.PathLike[str]) -> None:
+        """Write the collected events as a trace-event JSON object."""
+        with self._lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        Path(path).write_text(json.dumps(data, default=str), encoding="utf-8")
+
+
+_ACTIVE: Tracer | None = None
+
+
+def start_tracing(process_name: str = "ibmi-payroll") -> Tracer:
+    """Install and return a process-wide :class:`Tracer`."""
+    global _ACTIVE
+    _ACTIVE = Tracer(process_name)
+    return _ACTIVE
+
+
+def stop_tracing() -> Tracer | None:
+    """Uninstall the active tracer and return it."""
+    global _ACTIVE
+    tracer, _ACTIVE = _ACTIVE, None
+    return tracer
+
+
+def span(name: str, cat: str = "workflow", **args) -> ContextManager[dict | None]:
+    """Trace the enclosed block if tracing is on; a no-op otherwise."""
+    tracer = _ACTIVE
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, cat, **args)
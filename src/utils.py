@@ -3,14 +3,23 @@ import hashlib
 import logging
 import os
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import wraps
 from pathlib import Path
 from typing import Callable
 
-import pandas as pd
 from dotenv import load_dotenv
 
+from . import tracing
+from .lazy import LazyModule
+from .metrics import RECORDER
+from .profiling import memory_probe
+from .ratelimit import parse_hours, parse_rate
+from .sshtune import TransportProfile, profile_from_env
+
+# Only ``xlsx_to_csv`` needs pandas; importing it costs ~0.3s at startup
+pd = LazyModule("pandas")
+
 
 def setup_logger(level: int = logging.INFO) -> None:
     """Configure root logger."""
@@ -20,15 +29,21 @@ def setup_logger(level: int = logging.INFO) -> None:
 
 
 def timed(fn: Callable) -> Callable:
-    """Decorator logging execution time of functions."""
+    """Decorator timing functions into the ``call`` histograms of ``RECORDER``.
+
+    Uses the monotonic high-resolution :func:`time.perf_counter`, emits a
+    trace span when tracing is on and still logs each call at DEBUG level.
+    """
 
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter()
         try:
-            return fn(*args, **kwargs)
+            with tracing.span(fn.__qualname__, cat="call"):
+                return fn(*args, **kwargs)
         finally:
-            duration = time.time() - start
+            duration = time.perf_counter() - start
+            RECORDER.observe(fn.__name__, duration, kind="call")
             logging.getLogger(fn.__module__).debug(
                 "%s took %.2fs", fn.__name__, duration
             )
@@ -36,6 +51,7 @@ def timed(fn: Callable) -> Callable:
     return wrapper
 
 
+@memory_probe("sniff_csv")
 def sniff_csv(path: Path) -> type[csv.Dialect]:
     """Sniff CSV dialect and normalise to UTF-8 LF."""
     data = path.read_text(encoding="utf-8")
@@ -45,10 +61,11 @@ def sniff_csv(path: Path) -> type[csv.Dialect]:
 
 
 @timed
+@memory_probe("xlsx_to_csv")
 def xlsx_to_csv(in_xlsx: Path, out_csv: Path) -> Path:
     """Convert XLSX to CSV using pandas."""
     df = pd.read_excel(in_xlsx)
-    df.to_csv(out_csv, index=False, line_terminator="\n")
+    df.to_csv(out_csv, index=False, lineterminator="\n")
     return out_csv
 
 
@@ -77,6 +94,14 @@ class Config:
     jobq: str
     outq: str
     allow_auto_hostkey: bool = False
+    odbc_driver: str = "{iSeries Access ODBC Driver}"
+    history_db: str | None = "outputs/history.db"
+    port: int = 22
+    poll_interval: float = 5.0
+    ssh_profile: TransportProfile = field(default_factory=TransportProfile)
+    # bytes/s for SFTP transfers, only between ``rate_limit_hours`` if set
+    rate_limit: float | None = None
+    rate_limit_hours: tuple[int, int] | None = None
 
 
 def load_config(env_file: str = ".env") -> Config:
@@ -91,7 +116,28 @@ def load_config(env_file: str = ".env") -> Config:
     jobq = os.getenv("JOBQ", "QSYSNOMAX")
     outq = os.getenv("OUTQ", "QPRINT")
     allow = os.getenv("ALLOW_AUTO_HOSTKEY", "false").lower() == "true"
+    odbc_driver = os.getenv("IBMI_ODBC_DRIVER", "{iSeries Access ODBC Driver}")
     if not all([host, user, lib_stg, ifs_dir]):
         raise ValueError("Missing required config keys")
-    cfg = Config(host, user, ssh_key, password, lib_stg, ifs_dir, jobq, outq, allow)
+    history_db = os.getenv("IBMI_HISTORY_DB", "outputs/history.db") or None
+    port = int(os.getenv("IBMI_PORT", "22"))
+    poll_interval = float(os.getenv("IBMI_POLL_SECONDS", "5"))
+    cfg = Config(
+        host,
+        user,
+        ssh_key,
+        password,
+        lib_stg,
+        ifs_dir,
+        jobq,
+        outq,
+        allow,
+        odbc_driver,
+        history_db,
+        port,
+        poll_interval,
+        profile_from_env(),
+        parse_rate(os.getenv("IBMI_RATE_LIMIT")),
+        parse_hours(os.getenv("IBMI_RATE_LIMIT_HOURS")),
+    )
     return cfg
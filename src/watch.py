@@ -0,0 +1,388 @@
+import logging
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from .ibmi_client import IBMiClient
+from .utils import xlsx_to_csv
+from .workflow import run_workflow
+
+# ``process.clp`` imports ``<ifs_dir>/in/data.csv``, so every batch is sent
+# under this name
+BATCH_NAME = "data.csv"
+_SUFFIXES = (".csv", ".xlsx")
+# Hidden temp files (rsync ``.name.XXXX``) and Office lock files (``~$name``)
+_SKIP_PREFIXES = (".", "~$")
+
+
+def scan(inbox: Path) -> list[Path]:
+    """Return the candidate input files directly inside *inbox*, oldest first."""
+    found = []
+    for path in inbox.iterdir():
+        if path.name.startswith(_SKIP_PREFIXES) or path.suffix.lower() not in _SUFFIXES:
+            continue
+        try:
+            if path.is_file():
+                found.append((path.stat().st_mtime_ns, path.name, path))
+        except FileNotFoundError:
+            continue
+    return [path for _, _, path in sorted(found)]
+
+
+class StabilityTracker:
+    """Report files whose size and mtime have not changed for *settle* seconds.
+
+    A file still being copied into the drop folder keeps growing, so it is
+    only handed on once a writer has been quiet for the whole period.
+    """
+
+    def __init__(
+        self, settle: float, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.settle = settle
+        self._clock = clock
+        self._seen: dict[Path, tuple[tuple[int, int], float]] = {}
+
+    def update(self, paths: list[Path]) -> list[Path]:
+        """Record the current state of *paths* and return the stable ones."""
+        now = self._clock()
+        seen = {}
+        stable = []
+        for path in paths:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (st.st_size, st.st_mtime_ns)
+            previous = self._seen.get(path)
+            since = previous[1] if previous and previous[0] == signature else now
+            seen[path] = (signature, since)
+            if now - since >= self.settle:
+                stable.append(path)
+        self._seen = seen
+        return stable
+
+
+class MicroBatcher:
+    """Group stable files that arrive close together into one batch.
+
+    A batch is due once no new file has become stable for *window* seconds,
+    when it holds *max_files* files, or when its oldest file has waited
+    *max_wait* seconds (so a steady trickle cannot postpone it forever).
+    """
+
+    def __init__(
+        self,
+        window: float,
+        *,
+        max_files: int = 100,
+        max_wait: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_files < 1:
+            raise ValueError("max_files must be at least 1")
+        self.window = window
+        self.max_files = max_files
+        self.max_wait = max_wait
+        self._clock = clock
+        self._pending: dict[Path, float] = {}
+        self._last = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, paths: list[Path]) -> None:
+        now = self._clock()
+        for path in paths:
+            if path not in self._pending:
+                self._pending[path] = now
+                self._last = now
+
+    def due(self) -> bool:
+        if not self._pending:
+            return False
+        now = self._clock()
+        oldest = next(iter(self._pending.values()))
+        return (
+            len(self._pending) >= self.max_files
+            or now - self._last >= self.window
+            or (self.max_wait is not None and now - oldest >= self.max_wait)
+        )
+
+    def take(self) -> list[Path]:
+        """Remove and return up to *max_files* files, in arrival order."""
+        batch = list(self._pending)[: self.max_files]
+        for path in batch:
+            del self._pending[path]
+        return batch
+
+
+def merge_csv(
+    files: list[Path], out: Path, work: Path
+) -> tuple[list[Path], list[tuple[Path, str]], int]:
+    """Concatenate *files* into *out* with a single header line.
+
+    ``.xlsx`` files are first converted in a temporary directory under
+    *work*, so a drop file named ``data.xlsx`` cannot overwrite *out*. A
+    file that is empty, not UTF-8 or whose header differs from the first
+    accepted file is rejected without touching the rows already written.
+    Returns the accepted files, ``(file, reason)`` for each rejected one
+    and the number of data rows written.
+    """
+    accepted: list[Path] = []
+    rejected: list[tuple[Path, str]] = []
+    header: str | None = None
+    rows = 0
+    with out.open("wb") as dst, tempfile.TemporaryDirectory(dir=work) as tmp:
+        for path in files:
+            start = dst.tell()
+            count = 0
+            try:
+                src = path
+                if path.suffix.lower() == ".xlsx":
+                    src = xlsx_to_csv(path, Path(tmp) / f"{path.stem}.csv")
+                with src.open(encoding="utf-8-sig", newline=None) as fh:
+                    first = fh.readline().rstrip("\n")
+                    if not first.strip():
+                        raise ValueError("empty file")
+                    if header is None:
+                        header = first
+                        dst.write(f"{header}\n".encode())
+                    elif first != header:
+                        raise ValueError(f"header {first!r} differs from {header!r}")
+                    for line in fh:
+                        if not line.strip():
+                            continue
+                        dst.write(line.rstrip("\n").encode() + b"\n")
+                        count += 1
+            except FileNotFoundError:
+                dst.seek(start)
+                dst.truncate()
+                continue  # removed from the drop folder meanwhile
+            except Exception as exc:
+                dst.seek(start)
+                dst.truncate()
+                if not accepted:
+                    header = None
+                rejected.append((path, str(exc)))
+                continue
+            accepted.append(path)
+            rows += count
+    return accepted, rejected, rows
+
+
+def move_to(path: Path, folder: Path, reason: str | None = None) -> Path:
+    """Move *path* into *folder* without overwriting; write ``<name>.error``."""
+    folder.mkdir(parents=True, exist_ok=True)
+    target = folder / path.name
+    n = 1
+    while target.exists():
+        target = folder / f"{path.stem}.{n}{path.suffix}"
+        n += 1
+    path.replace(target)
+    if reason:
+        target.with_name(f"{target.name}.error").write_text(f"{reason}\n")
+    return target
+
+
+class PersistentSession:
+    """``client_factory`` that keeps one connected client across workflow runs.
+
+    Each call hands out the same client in a context manager that does not
+    close it, reconnecting first if the transport has died while idle.
+    Call :meth:`discard` after a failed run and :meth:`close` at the end.
+    """
+
+    def __init__(self, client_factory: Callable = IBMiClient) -> None:
+        self.client_factory = client_factory
+        self.client = None
+        self.connects = 0
+
+    def __call__(self, config, dry_run: bool = False):
+        if self.client is not None and not self.client.is_active():
+            logging.getLogger(__name__).info("Session lost; reconnecting")
+            self.discard()
+        if self.client is None:
+            client = self.client_factory(config, dry_run=dry_run)
+            client.connect()
+            self.client = client
+            self.connects += 1
+        return nullcontext(self.client)
+
+    def discard(self) -> None:
+        if self.client is not None:
+            try:
+                self.client.close()
+            except Exception:  # pragma: no cover - already broken
+                pass
+            self.client = None
+
+    close = discard
+
+
+def _clear_markers(client, ifs_dir: str) -> None:
+    """Remove ``run/*.status`` left by the previous batch's job."""
+    sftp = getattr(client, "sftp", None)
+    if sftp is None:
+        return
+    marker_dir = f"{ifs_dir}/run"
+    try:
+        names = sftp.listdir(marker_dir)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".status"):
+            sftp.remove(f"{marker_dir}/{name}")
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one micro-batch."""
+
+    files: list[Path]
+    rows: int
+    status: str
+    seconds: float
+    rejected: list[tuple[Path, str]] = field(default_factory=list)
+    error: str | None = None
+
+
+class DropFolderWatcher:
+    """Push files dropped into *inbox* to the IBM i in micro-batches.
+
+    Files are picked up once stable (see :class:`StabilityTracker`), grouped
+    by :class:`MicroBatcher`, merged into one ``data.csv`` and run through
+    :func:`src.workflow.run_workflow` over a single
+    :class:`PersistentSession`, so there is no per-file process start or
+    SSH handshake. Processed files move to *done*, and rejected or failed
+    ones to *failed* with a ``.error`` note (defaults: ``done/`` and
+    ``failed/`` inside *inbox*). Scripts are synced before the first batch
+    only.
+    """
+
+    def __init__(
+        self,
+        config,
+        inbox: Path,
+        *,
+        done: Path | None = None,
+        failed: Path | None = None,
+        settle: float = 2.0,
+        window: float = 2.0,
+        max_files: int = 100,
+        max_wait: float | None = 30.0,
+        poll: float = 0.5,
+        sync: bool = False,
+        fetch_outputs: bool = False,
+        timeout: int = 600,
+        export_mode: str = "full",
+        dry_run: bool = False,
+        client_factory: Callable = IBMiClient,
+        progress: Callable | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.config = config
+        self.inbox = Path(inbox)
+        self.done = Path(done) if done else self.inbox / "done"
+        self.failed = Path(failed) if failed else self.inbox / "failed"
+        self.work = self.inbox / ".work"
+        self.poll = poll
+        self.sync = sync
+        self.fetch_outputs = fetch_outputs
+        self.timeout = timeout
+        self.export_mode = export_mode
+        self.dry_run = dry_run
+        self.progress = progress
+        self.session = PersistentSession(client_factory)
+        self.tracker = StabilityTracker(settle, clock=clock)
+        self.batcher = MicroBatcher(
+            window, max_files=max_files, max_wait=max_wait, clock=clock
+        )
+        self._clock = clock
+        self._synced = False
+        self.results: list[BatchResult] = []
+        self.log = logging.getLogger(__name__)
+
+    def poll_once(self) -> BatchResult | None:
+        """Scan the inbox once and run a batch if one is due."""
+        self.batcher.add(self.tracker.update(scan(self.inbox)))
+        if not self.batcher.due():
+            return None
+        return self.process(self.batcher.take())
+
+    def process(self, files: list[Path]) -> BatchResult:
+        """Merge *files*, run the workflow on them and file them away."""
+        start = self._clock()
+        self.work.mkdir(parents=True, exist_ok=True)
+        batch_csv = self.work / BATCH_NAME
+        accepted, rejected, rows = merge_csv(files, batch_csv, self.work)
+        for path, reason in rejected:
+            self.log.warning("Rejected %s: %s", path.name, reason)
+            move_to(path, self.failed, reason)
+        status, error = "SKIPPED", None
+        if accepted:
+            try:
+                self._run(batch_csv)
+            except Exception as exc:
+                status, error = "FAILED", str(exc)
+                self.session.discard()
+            else:
+                status = "SUCCESS"
+        for path in accepted:
+            move_to(path, self.done if status == "SUCCESS" else self.failed, error)
+        result = BatchResult(
+            files=accepted,
+            rows=rows,
+            status=status,
+            seconds=self._clock() - start,
+            rejected=rejected,
+            error=error,
+        )
+        self.log.info(
+            "Batch of %d file(s), %d rows: %s in %.1fs%s",
+            len(accepted),
+            rows,
+            status,
+            result.seconds,
+            f" ({error})" if error else "",
+        )
+        self.results.append(result)
+        return result
+
+    def _run(self, batch_csv: Path) -> None:
+        with self.session(self.config, dry_run=self.dry_run) as client:
+            _clear_markers(client, self.config.ifs_dir)
+        run_workflow(
+            batch_csv,
+            self.config,
+            sync=self.sync and not self._synced,
+            fetch_outputs=self.fetch_outputs,
+            timeout=self.timeout,
+            dry_run=self.dry_run,
+            export_mode=self.export_mode,
+            client_factory=self.session,
+            progress=self.progress,
+        )
+        self._synced = True
+
+    def idle(self) -> bool:
+        """True when nothing is waiting in the inbox or in a batch."""
+        return not self.batcher and not scan(self.inbox)
+
+    def run(self, stop: threading.Event | None = None, *, once: bool = False) -> None:
+        """Watch until *stop* is set, or with *once* until the inbox is empty."""
+        stop = stop or threading.Event()
+        self.inbox.mkdir(parents=True, exist_ok=True)
+        self.log.info("Watching %s", self.inbox)
+        try:
+            while not stop.is_set():
+                self.poll_once()
+                if once and self.idle():
+                    break
+                stop.wait(self.poll)
+        finally:
+            self.session.close()
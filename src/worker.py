@@ -0,0 +1,130 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+from .progress import Progress
+
+
+class Cancelled(Exception):
+    """Raised inside the job when :meth:`BackgroundJob.cancel` was called."""
+
+
+class BackgroundJob:
+    """Run *target* on a daemon thread and report to a GUI through a queue.
+
+    *target* is called as ``target(progress=..., on_phase=...)`` and must
+    pass those callbacks down to the transfer code. Both only put events on
+    :attr:`events` (``("phase", name)``, ``("progress", Progress)`` and a
+    final ``("done", rc)``, ``("error", exc)`` or ``("cancelled", None)``),
+    so the Tk thread never blocks; it polls with :meth:`drain`. After
+    :meth:`cancel` the next callback raises :class:`Cancelled`, which aborts
+    a running SFTP transfer at the next 32KiB block.
+    """
+
+    def __init__(self, target: Callable[..., int]) -> None:
+        self.target = target
+        self.events: queue.Queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _check(self) -> None:
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def _on_phase(self, name: str) -> None:
+        self._check()
+        self.events.put(("phase", name))
+
+    def _on_progress(self, progress: Progress) -> None:
+        self._check()
+        self.events.put(("progress", progress))
+
+    def _run(self) -> None:
+        try:
+            rc = self.target(progress=self._on_progress, on_phase=self._on_phase)
+        except BaseException as exc:  # reported to the GUI thread
+            if self._cancel.is_set():
+                self.events.put(("cancelled", None))
+            else:
+                self.events.put(("error", exc))
+        else:
+            self.events.put(("done", rc))
+
+    def drain(self) -> list[tuple[str, object]]:
+        """Return the events queued since the last call, without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+
+@dataclass
+class JobStatus:
+    """Progress-bar state folded from :class:`BackgroundJob` events.
+
+    *phases* maps each phase name to ``(label, weight)``, in order. The bar
+    jumps to a phase's start when it begins and moves through its share as
+    ``Progress`` reports arrive (bytes sent during the upload).
+    """
+
+    phases: dict[str, tuple[str, float]]
+    percent: float = 0.0
+    text: str = ""
+    phase: str | None = None
+    finished: bool = False
+    outcome: str | None = None
+    result: object = None
+
+    def _start_of(self, name: str) -> float:
+        total = sum(weight for _, weight in self.phases.values())
+        before = 0.0
+        for key, (_, weight) in self.phases.items():
+            if key == name:
+                break
+            before += weight
+        return 100 * before / total if total else 0.0
+
+    def _weight(self, name: str) -> float:
+        total = sum(weight for _, weight in self.phases.values())
+        return 100 * self.phases[name][1] / total if total else 0.0
+
+    def apply(self, kind: str, value: object) -> None:
+        if kind == "phase" and value in self.phases:
+            self.phase = value
+            self.percent = self._start_of(value)
+            self.text = self.phases[value][0]
+        elif kind == "progress" and self.phase in self.phases:
+            p: Progress = value
+            self.percent = self._start_of(self.phase) + p.fraction * self._weight(
+                self.phase
+            )
+            eta = "" if p.eta is None else f", {p.eta:.0f}s"
+            self.text = (
+                f"{self.phases[self.phase][0]} {p.fraction:.0%} "
+                f"({p.rate / 1e6:.1f} MB/s{eta})"
+            )
+        elif kind in ("done", "error", "cancelled"):
+            self.finished = True
+            self.outcome = kind
+            self.result = value
+            if kind == "done" and value == 0:
+                self.percent = 100.0
@@ -1,12 +1,32 @@
 import logging
 import re
+import sqlite3
 import time
+from contextlib import ExitStack, closing
+from dataclasses import asdict
 from pathlib import Path
+from typing import Callable
 
+from . import db, tracing
+from .checkpoint import Checkpoint, CheckpointStore
+from .direct_load import load_rows
+from .history import RunHistory
 from .ibmi_client import IBMiClient
+from .marker import parse_marker, record_remote_phases
+from .metrics import RECORDER, phase
+from .profiling import memory_probe
 from .utils import sha256_file, sniff_csv, timed, xlsx_to_csv
 
 _SAFE_NAME = re.compile(r"^[A-Za-z0-9_./]+$")
+# Result export modes understood by ``process.clp``: FULL copies the whole
+# shadow table, DELTA only the rows inserted/updated/rejected by this run.
+_EXPORT_MODES = {"full": "FULL", "delta": "DELTA"}
+_TRANSPORTS = ("sftp", "odbc")
+# SBMJOB's completion message CPC1221: "Job 123456/USER/PROCESS submitted to
+# job queue ..."; the qualified name is what ENDJOB needs
+_SUBMITTED = re.compile(
+    r"Job (\d{6}/[A-Z0-9$#@_.]{1,10}/[A-Z0-9$#@_.]{1,10}) submitted", re.IGNORECASE
+)
 
 
 def _ensure_safe(value: str, field: str) -> str:
@@ -15,6 +35,7 @@ def _ensure_safe(value: str, field: str) -> str:
     return value
 
 
+@memory_probe("_prepare_csv")
 def _prepare_csv(src: Path, log: logging.Logger) -> Path:
     if src.suffix.lower() == ".xlsx":
         csv_path = src.with_suffix(".csv")
@@ -24,9 +45,21 @@ def _prepare_csv(src: Path, log: logging.Logger) -> Path:
     sniff_csv(csv_path)
     digest = sha256_file(csv_path)
     log.info("Local SHA256=%s", digest)
+    RECORDER.annotate(sha256=digest)
     return csv_path
 
 
+def _count_rows(path: Path) -> int:
+    """Return the number of lines in *path* without loading it into memory."""
+    rows = 0
+    last = b"\n"
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            rows += chunk.count(b"\n")
+            last = chunk[-1:]
+    return rows if last == b"\n" else rows + 1
+
+
 def _remote_dirs(ifs_dir: str) -> list[str]:
     return [
         ifs_dir,
@@ -52,35 +85,99 @@ def _run_setup(client: IBMiClient, ifs_dir: str, lib_stg: str) -> None:
     client.ssh_run(setup_cmd)
 
 
-def _submit_job(client: IBMiClient, lib_stg: str, ifs_dir: str, outq: str, jobq: str) -> None:
+def _export_parm(export_mode: str) -> str:
+    try:
+        return _EXPORT_MODES[export_mode]
+    except KeyError:
+        raise ValueError(f"Unknown export mode: {export_mode}") from None
+
+
+def _submit_job(
+    client: IBMiClient,
+    lib_stg: str,
+    ifs_dir: str,
+    outq: str,
+    jobq: str,
+    export_mode: str = "full",
+) -> str | None:
+    """Submit ``PROCESS`` and return the job's qualified name when reported."""
+    export = _export_parm(export_mode)
     submit_cmd = (
         f"system \"SBMJOB CMD(CALL PGM({lib_stg}/PROCESS) PARM('{lib_stg}' "
-        f"'{ifs_dir}' '{outq}')) JOBQ({jobq})\""
+        f"'{ifs_dir}' '{outq}' '{export}')) JOBQ({jobq})\""
     )
-    client.ssh_run(submit_cmd)
+    result = client.ssh_run(submit_cmd)
+    return parse_submitted_job(" ".join(result[:2]) if result else "")
+
+
+def parse_submitted_job(output: str) -> str | None:
+    """Return ``number/user/name`` from ``SBMJOB`` output, if it names a job."""
+    match = _SUBMITTED.search(output)
+    return match.group(1).upper() if match else None
+
 
+def _end_job(client: IBMiClient, job: str, reason: str, log: logging.Logger) -> None:
+    """End the submitted *job* with ``ENDJOB *IMMED`` and record the outcome.
 
-def _find_status_file(client: IBMiClient, marker_dir: str, end: float) -> str:
-    """Poll *marker_dir* until a ``.status`` file appears or timeout."""
+    The CL command is passed as one argument, which ``ssh_run`` single-quotes,
+    so ``$`` in a job or user name such as ``Q$BATCH`` reaches ENDJOB as is.
+    """
+    out, err, rc = client.ssh_run(["system", f"ENDJOB JOB({job}) OPTION(*IMMED)"])
+    message = (out + err).strip()
+    if rc == 0:
+        log.warning("Ended job %s after %s", job, reason)
+    else:
+        log.warning("Could not end job %s after %s: %s", job, reason, message)
+    RECORDER.annotate(
+        job_ended={"job": job, "reason": reason, "ok": rc == 0, "message": message}
+    )
+
+
+def _find_status_file(
+    client: IBMiClient, marker_dir: str, end: float, interval: float = 5.0
+) -> str:
+    """Poll *marker_dir* every *interval* seconds until a ``.status`` file appears."""
+    attempt = 0
     while time.time() < end:
-        entries = client.sftp.listdir(marker_dir)
+        attempt += 1
+        with tracing.span("poll_marker", cat="poll", attempt=attempt):
+            entries = client.sftp.listdir(marker_dir)
         status = next((name for name in entries if name.endswith(".status")), None)
         if status:
             return status
-        time.sleep(5)
+        time.sleep(interval)
     raise TimeoutError("Timed out waiting for marker file")
 
 
-def _fetch_result(client: IBMiClient, ifs_dir: str, csv_path: Path, log: logging.Logger) -> None:
-    """Retrieve result CSV from remote system, logging any failure."""
+def _fetch_output(
+    client: IBMiClient, ifs_dir: str, name: str, log: logging.Logger
+) -> None:
+    """Retrieve ``out/<name>`` from remote system, logging any failure."""
     out_dir = Path("outputs")
     out_dir.mkdir(exist_ok=True)
-    result_remote = f"{ifs_dir}/out/{csv_path.stem}_result.csv"
-    result_local = out_dir / f"{csv_path.stem}_result.csv"
-    try:
-        client.sftp_get(result_remote, result_local)
-    except Exception as exc:  # pragma: no cover - remote optional
-        log.warning("Could not fetch result CSV: %s", exc)
+    local = out_dir / name
+    with phase("fetch") as span:
+        try:
+            client.sftp_get(f"{ifs_dir}/out/{name}", local)
+        except Exception as exc:  # pragma: no cover - remote optional
+            log.warning("Could not fetch result CSV: %s", exc)
+        else:
+            if local.exists():
+                span.bytes = local.stat().st_size
+
+
+def _fetch_result(
+    client: IBMiClient, ifs_dir: str, csv_path: Path, log: logging.Logger
+) -> None:
+    """Retrieve the full result CSV from remote system."""
+    _fetch_output(client, ifs_dir, f"{csv_path.stem}_result.csv", log)
+
+
+def _fetch_delta(
+    client: IBMiClient, ifs_dir: str, csv_path: Path, log: logging.Logger
+) -> None:
+    """Retrieve the delta CSV (touched rows plus rejects) from remote system."""
+    _fetch_output(client, ifs_dir, f"{csv_path.stem}_delta.csv", log)
 
 
 def _wait_for_marker(
@@ -91,36 +188,78 @@ def _wait_for_marker(
     fetch_outputs: bool,
     log: logging.Logger,
     timeout: int,
+    export_mode: str = "full",
+    poll_interval: float = 5.0,
 ) -> None:
     marker_dir = f"{ifs_dir}/run"
-    status_file = _find_status_file(client, marker_dir, time.time() + timeout)
-    local_marker = Path("outputs") / status_file
-    client.sftp_get(f"{marker_dir}/{status_file}", local_marker)
-    result = local_marker.read_text().strip()
-    if "FAILED" in result:
-        raise RuntimeError(f"Remote job failed: {result}")
+    with phase("wait") as waited:
+        status_file = _find_status_file(
+            client, marker_dir, time.time() + timeout, poll_interval
+        )
+        local_marker = Path("outputs") / status_file
+        local_marker.parent.mkdir(exist_ok=True)
+        client.sftp_get(f"{marker_dir}/{status_file}", local_marker)
+        marker = parse_marker(local_marker.read_text())
+    record_remote_phases(marker, waited.seconds)
+    if marker.failed:
+        failed = next((p.name for p in marker.phases if not p.ok), None)
+        detail = f" in {failed}" if failed else ""
+        raise RuntimeError(f"Remote job failed{detail}: {marker.status}")
     if fetch_outputs:
-        _fetch_result(client, ifs_dir, csv_path, log)
+        if export_mode == "delta":
+            _fetch_delta(client, ifs_dir, csv_path, log)
+        else:
+            _fetch_result(client, ifs_dir, csv_path, log)
 
 
-@timed
-def run_workflow(
-    file_path: Path,
+def _run_direct(
+    csv_path: Path,
     config,
+    lib_stg: str,
+    connect_db: Callable,
     *,
-    sync: bool = False,
-    fetch_outputs: bool = False,
-    timeout: int = 600,
-    dry_run: bool = False,
+    dry_run: bool,
+    log: logging.Logger,
+    db_pool: db.ConnectionPool | None = None,
 ) -> None:
-    """High level ingest/apply workflow."""
-    log = logging.getLogger(__name__)
-
-    src = Path(file_path)
-    csv_path = _prepare_csv(src, log)
+    """Load *csv_path* straight into the staging tables over ODBC."""
+    if dry_run:
+        log.info("DRY-RUN ODBC load of %s into %s", csv_path, lib_stg)
+        return
+    if db_pool is not None:
+        with db_pool.connection() as conn:
+            load_rows(conn, csv_path, lib_stg)
+        return
+    with closing(connect_db(config)) as conn:
+        load_rows(conn, csv_path, lib_stg)
+
+
+def _run_remote(
+    csv_path: Path,
+    config,
+    *,
+    ifs_dir: str,
+    lib_stg: str,
+    sync: bool,
+    fetch_outputs: bool,
+    timeout: int,
+    dry_run: bool,
+    export_mode: str,
+    nbytes: int,
+    nrows: int,
+    log: logging.Logger,
+    client_factory: Callable = IBMiClient,
+    progress: Callable | None = None,
+    checkpoint: Checkpoint | None = None,
+    end_job: bool = False,
+) -> None:
+    """Upload *csv_path*, submit the PROCESS job and wait for its marker.
 
-    ifs_dir = _ensure_safe(config.ifs_dir, "ifs_dir")
-    lib_stg = _ensure_safe(config.lib_stg, "lib_stg")
+    Phases already recorded in *checkpoint* are skipped (the upload only if
+    the remote file still has the right size) and each completed phase is
+    recorded; the checkpoint is cleared once the job has finished. With
+    *end_job*, a timeout or Ctrl-C during the wait ends the submitted job.
+    """
     outq = _ensure_safe(config.outq, "outq")
     jobq = _ensure_safe(config.jobq, "jobq")
 
@@ -129,25 +268,284 @@ def run_workflow(
     csv_name = _ensure_safe(csv_path.name, "csv file name")
     remote_csv = f"{ifs_dir}/in/{csv_name}"
 
-    with IBMiClient(config, dry_run=dry_run) as client:
-        client.ensure_remote_dirs(remote_dirs)
+    with ExitStack() as stack:
+        with phase("connect"):
+            client = stack.enter_context(client_factory(config, dry_run=dry_run))
+
+        if not _skip(checkpoint, "provision", log):
+            with phase("provision"):
+                client.ensure_remote_dirs(remote_dirs)
+                if sync:
+                    _sync_scripts(client, ifs_dir)
+            _mark(checkpoint, "provision")
+
+        if not _skip(
+            checkpoint,
+            "upload",
+            log,
+            still_valid=lambda: _remote_size(client, remote_csv) == nbytes,
+        ):
+            with phase("upload", bytes=nbytes, rows=nrows):
+                upload_kwargs = {"progress": progress} if progress is not None else {}
+                client.sftp_put(csv_path, remote_csv, **upload_kwargs)
+            _mark(checkpoint, "upload")
+        if not _skip(checkpoint, "setup", log):
+            with phase("setup"):
+                _run_setup(client, ifs_dir, lib_stg)
+            _mark(checkpoint, "setup")
+        job = checkpoint.job if checkpoint is not None else None
+        if not _skip(checkpoint, "submit", log):
+            with phase("submit"):
+                job = _submit_job(client, lib_stg, ifs_dir, outq, jobq, export_mode)
+            if checkpoint is not None:
+                checkpoint.job = job
+            _mark(checkpoint, "submit")
+        if job:
+            log.info("Submitted job %s", job)
+            RECORDER.annotate(job=job)
+
+        try:
+            if not dry_run:
+                try:
+                    _wait_for_marker(
+                        client,
+                        ifs_dir,
+                        csv_path,
+                        fetch_outputs=fetch_outputs,
+                        log=log,
+                        timeout=timeout,
+                        export_mode=export_mode,
+                        poll_interval=getattr(config, "poll_interval", 5.0),
+                    )
+                except RuntimeError:  # the job ran and failed; nothing to resume
+                    if checkpoint is not None:
+                        checkpoint.clear()
+                    raise
+                except (TimeoutError, KeyboardInterrupt) as exc:
+                    if end_job and job:
+                        timed_out = isinstance(exc, TimeoutError)
+                        reason = "timeout" if timed_out else "Ctrl-C"
+                        try:
+                            _end_job(client, job, reason, log)
+                        except Exception as end_exc:  # e.g. the link is down too
+                            # keep the checkpoint: the job may still be running
+                            log.error("Could not end job %s: %s", job, end_exc)
+                            RECORDER.annotate(
+                                job_ended={
+                                    "job": job,
+                                    "reason": reason,
+                                    "ok": False,
+                                    "message": str(end_exc),
+                                }
+                            )
+                        else:
+                            if checkpoint is not None:
+                                checkpoint.clear()
+                    raise
+            if checkpoint is not None:
+                checkpoint.clear()
+        finally:
+            retry_metrics = getattr(client, "retry_metrics", None)
+            if retry_metrics is not None:
+                RECORDER.annotate(retry=asdict(retry_metrics))
+
+
+def _skip(
+    checkpoint: Checkpoint | None,
+    name: str,
+    log: logging.Logger,
+    still_valid: Callable[[], bool] | None = None,
+) -> bool:
+    """Return whether phase *name* is checkpointed and can be skipped."""
+    if checkpoint is None or not checkpoint.has(name):
+        return False
+    if still_valid is not None and not still_valid():
+        log.info("Resume: %s from run %s is stale; redoing it", name, checkpoint.run_id)
+        return False
+    log.info("Resume: %s already done in run %s", name, checkpoint.run_id)
+    return True
+
+
+def _mark(checkpoint: Checkpoint | None, name: str) -> None:
+    if checkpoint is not None:
+        checkpoint.mark(name)
 
-        if sync:
-            _sync_scripts(client, ifs_dir)
 
-        client.sftp_put(csv_path, remote_csv)
-        _run_setup(client, ifs_dir, lib_stg)
-        _submit_job(client, lib_stg, ifs_dir, outq, jobq)
+def _remote_size(client: IBMiClient, remote: str) -> int | None:
+    try:
+        return client.sftp.stat(remote).st_size
+    except (AttributeError, OSError):
+        return None
+
+
+def _open_checkpoint(
+    checkpoints: CheckpointStore,
+    csv_path: Path,
+    config,
+    export_mode: str,
+    run_id: str,
+    *,
+    resume: bool,
+    log: logging.Logger,
+) -> Checkpoint:
+    """Return the checkpoint to resume from, or start a fresh one.
+
+    Without *resume*, an unfinished run that already submitted its job is
+    refused rather than submitted twice.
+    """
+    digest = RECORDER.run.get("sha256") or sha256_file(csv_path)
+    key = checkpoints.key(digest, config, export_mode)
+    previous = checkpoints.load(key)
+    if previous is not None and resume:
+        log.info("Resuming run %s after: %s", previous.run_id, ", ".join(previous.done))
+        RECORDER.annotate(resumed_from=previous.run_id, skipped=list(previous.done))
+        return previous
+    if previous is not None and previous.has("submit"):
+        # the job may still be running; a second one would race it for the
+        # staging tables and in/data.csv
+        job = f" as job {previous.job}" if previous.job else ""
+        raise RuntimeError(
+            f"Run {previous.run_id} already submitted this file{job} and it has "
+            f"not finished; rerun with --resume to wait for it, or delete "
+            f"{previous.path} to submit it again"
+        )
+    if resume:
+        log.info("Nothing to resume for %s; starting from the beginning", csv_path)
+    return checkpoints.start(
+        key,
+        run_id=run_id,
+        sha256=digest,
+        file=str(csv_path),
+        host=getattr(config, "host", None),
+        ifs_dir=config.ifs_dir,
+    )
+
+
+def _record_history(config, report: dict, log: logging.Logger) -> None:
+    """Append *report* to the run-history database named by the config."""
+    path = getattr(config, "history_db", None)
+    if not path:
+        return
+    try:
+        RunHistory(path).append(report)
+    except (OSError, sqlite3.Error) as exc:
+        log.warning("Could not record run history: %s", exc)
 
-        if not dry_run:
-            _wait_for_marker(
-                client,
-                ifs_dir,
+
+@timed
+def run_workflow(
+    file_path: Path,
+    config,
+    *,
+    sync: bool = False,
+    fetch_outputs: bool = False,
+    timeout: int = 600,
+    dry_run: bool = False,
+    export_mode: str = "full",
+    transport: str = "sftp",
+    connect_db: Callable | None = None,
+    db_pool: db.ConnectionPool | None = None,
+    client_factory: Callable | None = None,
+    progress: Callable | None = None,
+    checkpoints: CheckpointStore | None = None,
+    resume: bool = False,
+    end_job: bool = False,
+) -> None:
+    """High level ingest/apply workflow.
+
+    *export_mode* ``"delta"`` makes the remote job export only the rows this
+    run inserted, updated or rejected instead of the whole shadow table.
+
+    *transport* ``"odbc"`` skips the IFS upload and submitted job: validated
+    rows are bulk-inserted into the staging tables and ``apply.sql`` runs in
+    the same connection. *connect_db* opens that connection from *config*
+    and defaults to :func:`src.db.connect`; pass *db_pool* to borrow it from
+    a :class:`src.db.ConnectionPool` instead.
+
+    *client_factory* builds the SSH client from ``(config, dry_run=...)``
+    and defaults to :class:`IBMiClient`; :mod:`src.replay` provides
+    recording and replaying factories. *progress* receives
+    :class:`src.progress.Progress` reports during the CSV upload.
+
+    With *checkpoints*, each completed SFTP-transport phase is saved under
+    the prepared file's hash and destination. *resume* continues from such
+    a checkpoint instead, e.g. reattaching to the marker wait of a job that
+    was already submitted.
+
+    *end_job* runs ``ENDJOB`` on the submitted job when the marker wait times
+    out or is interrupted, so it stops holding a JOBQ slot and the staging
+    tables; the run report's ``job_ended`` records the outcome.
+
+    Each phase (prepare, connect, provision, upload, setup, submit, wait,
+    fetch; or prepare, load for ODBC) is timed into :data:`src.metrics.RECORDER`
+    and the run report is appended to ``config.history_db`` when set.
+    """
+    log = logging.getLogger(__name__)
+    _export_parm(export_mode)
+    if transport not in _TRANSPORTS:
+        raise ValueError(f"Unknown transport: {transport}")
+
+    src = Path(file_path)
+    run_id = RECORDER.begin_run(
+        file=str(src),
+        host=getattr(config, "host", None),
+        jobq=getattr(config, "jobq", None),
+        transport=transport,
+        dry_run=dry_run,
+    )
+    status = "FAILED"
+    try:
+        with phase("prepare") as prepared:
+            csv_path = _prepare_csv(src, log)
+            prepared.bytes = csv_path.stat().st_size
+            prepared.rows = _count_rows(csv_path)
+
+        ifs_dir = _ensure_safe(config.ifs_dir, "ifs_dir")
+        lib_stg = _ensure_safe(config.lib_stg, "lib_stg")
+        if transport == "odbc":
+            with phase("load", bytes=prepared.bytes, rows=prepared.rows):
+                _run_direct(
+                    csv_path,
+                    config,
+                    lib_stg,
+                    connect_db or db.connect,
+                    dry_run=dry_run,
+                    log=log,
+                    db_pool=db_pool,
+                )
+        else:
+            checkpoint = None
+            if checkpoints is not None and not dry_run:
+                checkpoint = _open_checkpoint(
+                    checkpoints,
+                    csv_path,
+                    config,
+                    export_mode,
+                    run_id,
+                    resume=resume,
+                    log=log,
+                )
+            _run_remote(
                 csv_path,
+                config,
+                ifs_dir=ifs_dir,
+                lib_stg=lib_stg,
+                sync=sync,
                 fetch_outputs=fetch_outputs,
-                log=log,
                 timeout=timeout,
+                dry_run=dry_run,
+                export_mode=export_mode,
+                nbytes=prepared.bytes,
+                nrows=prepared.rows,
+                log=log,
+                client_factory=client_factory or IBMiClient,
+                progress=progress,
+                checkpoint=checkpoint,
+                end_job=end_job,
             )
+        status = "SUCCESS"
+    finally:
+        _record_history(config, RECORDER.end_run(status), log)
 
     log.info("Workflow complete")
 
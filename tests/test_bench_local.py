@@ -0,0 +1,41 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks import bench_local  # noqa: E402
+
+
+def test_cases_measure_and_baseline(tmp_path, capsys):
+    baseline = tmp_path / "baselines.json"
+    argv = ["--rows", "200", "--cases", "sniff_csv,sha256_file,_sanitize_parts"]
+    argv += ["--repeat", "1", "--baseline", str(baseline)]
+    assert bench_local.main(argv + ["--update-baseline"]) == 0
+    recorded = json.loads(baseline.read_text())["results"]
+    assert set(recorded) == {"sniff_csv@200", "sha256_file@200", "_sanitize_parts@200"}
+    assert bench_local.main(argv + ["--check"]) == 0
+    assert "sniff_csv" in capsys.readouterr().out
+
+
+def test_compare_flags_regressions():
+    results = [
+        {"case": "sniff_csv", "rows": 10, "seconds": 0.5, "peak_mb": 1.0},
+        {"case": "sha256_file", "rows": 10, "seconds": 0.011, "peak_mb": 50.0},
+        {"case": "new", "rows": 10, "seconds": 9.0, "peak_mb": 9.0},
+    ]
+    baseline = {
+        "sniff_csv@10": {"seconds": 0.1, "peak_mb": 1.0},
+        "sha256_file@10": {"seconds": 0.01, "peak_mb": 1.0},
+    }
+    problems = bench_local.compare(results, baseline, threshold=0.25)
+    assert [p.split(":")[0] for p in problems] == ["sniff_csv@10", "sha256_file@10"]
+    assert "peak" in problems[1]
+    assert results[0]["change"] == "+400%" and results[2]["base_s"] == "-"
+
+
+def test_make_csv_matches_mock_schema(tmp_path):
+    path = bench_local.make_csv(tmp_path / "p.csv", 3)
+    lines = path.read_text().splitlines()
+    assert lines[0] == "emp_id,amount" and len(lines) == 4
+    assert lines[1].startswith("1001,")
@@ -0,0 +1,105 @@
+import logging
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config  # noqa: E402
+from benchmarks.ibmi_standin import Delays, StandInServer  # noqa: E402
+from src.checkpoint import CheckpointStore  # noqa: E402
+from src.metrics import RECORDER  # noqa: E402
+from src.workflow import run_workflow  # noqa: E402
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def test_store_round_trip_and_key(tmp_path):
+    store = CheckpointStore(tmp_path / "cp")
+    cfg = types.SimpleNamespace(host="h", ifs_dir="/a", lib_stg="L", jobq="J")
+    key = store.key("abc", cfg, "full")
+    assert key != store.key("abc", cfg, "delta")
+    assert key != store.key(
+        "abc", types.SimpleNamespace(**{**vars(cfg), "host": "g"}), "full"
+    )
+    assert store.load(key) is None
+    cp = store.start(
+        key, run_id="r1", sha256="abc", file="f.csv", host="h", ifs_dir="/a"
+    )
+    cp.mark("upload")
+    cp.mark("upload")
+    loaded = store.load(key)
+    assert loaded.done == ["upload"] and loaded.run_id == "r1" and loaded.has("upload")
+    loaded.clear()
+    assert store.load(key) is None
+
+
+def _local_phases(report):
+    return [p["name"] for p in report["phases"] if not p["name"].startswith("remote_")]
+
+
+def _submits(server):
+    return sum("SBMJOB" in cmd for cmd in server.commands)
+
+
+def test_resume_reattaches_to_submitted_job(tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "ibmi").symlink_to(REPO / "ibmi")
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("emp_id,amount\n1,10.00\n")
+    store = CheckpointStore(tmp_path / "cp")
+    with StandInServer(tmp_path / "ifs", delays=Delays(job_queue=0.3)) as server:
+        cfg = make_config(server, "/stg", 0.02)
+        with pytest.raises(TimeoutError):
+            run_workflow(csv_path, cfg, sync=True, timeout=0, checkpoints=store)
+        (cp,) = [store.load(p.stem) for p in store.root.iterdir()]
+        assert cp.done == ["provision", "upload", "setup", "submit"]
+        assert _submits(server) == 1
+
+        run_workflow(csv_path, cfg, timeout=10, checkpoints=store, resume=True)
+        report = RECORDER.report()
+        assert _submits(server) == 1
+        assert report["resumed_from"] == cp.run_id
+        assert _local_phases(report) == ["prepare", "connect", "wait"]
+        assert list(store.root.iterdir()) == []
+
+        # a stale upload is sent again even when checkpointed
+        with pytest.raises(TimeoutError):
+            run_workflow(csv_path, cfg, timeout=0, checkpoints=store)
+        (server.root / "stg" / "in" / "data.csv").write_text("x")
+        caplog.set_level(logging.INFO)
+        run_workflow(csv_path, cfg, timeout=10, checkpoints=store, resume=True)
+        assert _local_phases(RECORDER.report()) == [
+            "prepare",
+            "connect",
+            "upload",
+            "wait",
+        ]
+        assert "upload from run" in caplog.text and _submits(server) == 2
+
+
+def test_rerun_without_resume_refuses_to_submit_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "ibmi").symlink_to(REPO / "ibmi")
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("emp_id,amount\n1,10.00\n")
+    store = CheckpointStore(tmp_path / "cp")
+    with StandInServer(tmp_path / "ifs", delays=Delays(job_queue=0.3)) as server:
+        cfg = make_config(server, "/stg", 0.02)
+        with pytest.raises(TimeoutError):
+            run_workflow(csv_path, cfg, sync=True, timeout=0, checkpoints=store)
+        (cp,) = [store.load(p.stem) for p in store.root.iterdir()]
+        with pytest.raises(RuntimeError, match="--resume") as exc:
+            run_workflow(csv_path, cfg, timeout=10, checkpoints=store)
+        assert f"as job {cp.job}" in str(exc.value) and str(cp.path) in str(exc.value)
+        assert _submits(server) == 1
+        assert store.load(cp.key).done == cp.done  # left for --resume
+
+        # an interrupted run that never submitted simply starts over
+        cp.done = ["provision", "upload"]
+        cp.save()
+        run_workflow(csv_path, cfg, timeout=10, checkpoints=store)
+        assert _submits(server) == 2
+        assert list(store.root.iterdir()) == []
@@ -0,0 +1,69 @@
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src import datagen  # noqa: E402
+from src.direct_load import split_rows  # noqa: E402
+
+MIX = datagen.Mix(
+    malformed=0.05, duplicates=0.05, negative=0.2, out_of_range=0.02, crlf=0.5
+)
+
+
+def test_write_csv_is_deterministic_per_seed(tmp_path):
+    a, b, c = (tmp_path / n for n in ("a.csv", "b.csv", "c.csv"))
+    datagen.write_csv(a, 500, seed=7, mix=MIX)
+    datagen.write_csv(b, 500, seed=7, mix=MIX)
+    datagen.write_csv(c, 500, seed=8, mix=MIX)
+    assert a.read_bytes() == b.read_bytes() != c.read_bytes()
+
+
+def test_defects_match_reject_reasons(tmp_path):
+    path = tmp_path / "big.csv"
+    stats = datagen.write_csv(path, 5000, seed=1, mix=MIX, buffer_rows=64)
+    assert stats.rows == 5000 and stats.bytes == path.stat().st_size
+    assert stats.counts["crlf"] == path.read_bytes().count(b"\r\n")
+    assert stats.counts["negative"] > 0
+    valid, rejects = split_rows(path)
+    assert sum(1 for _ in valid) == 5000 - stats.expected_rejects("odbc")
+    reasons = Counter(reason for _, reason in rejects)
+    assert reasons == {
+        "PARSE_ERROR": stats.counts["malformed"] + 1,  # plus the header
+        "DUPLICATE_ID": stats.counts["duplicate"],
+        "OUT_OF_RANGE": stats.counts["range"],
+    }
+
+
+def test_expected_rejects_depend_on_load_path(tmp_path):
+    stats = datagen.write_csv(tmp_path / "a.csv", 1000, seed=1, mix=MIX)
+    assert stats.expected_rejects("sftp") == stats.counts["malformed"]
+    assert stats.expected_rejects("odbc") > stats.expected_rejects("sftp")
+    assert not stats.sftp_safe
+    clean = datagen.write_csv(
+        tmp_path / "b.csv", 1000, seed=1, mix=datagen.Mix(malformed=0.1)
+    )
+    assert clean.sftp_safe
+    assert clean.expected_rejects("sftp") == clean.expected_rejects("odbc") > 0
+    with pytest.raises(ValueError, match="transport"):
+        stats.expected_rejects("ftp")
+
+
+def test_clean_rows_follow_mock_schema():
+    rows = list(datagen.iter_rows(3))
+    assert [r[1] for r in rows] == ["1001", "1002", "1003"]
+    assert all(kind == "valid" and float(amount) >= 0 for kind, _, amount in rows)
+
+
+def test_mix_and_suffix_validation(tmp_path):
+    with pytest.raises(ValueError):
+        datagen.Mix(crlf=1.5)
+    with pytest.raises(ValueError):
+        datagen.Mix(malformed=0.6, duplicates=0.6)
+    with pytest.raises(ValueError, match="Unsupported"):
+        datagen.generate(tmp_path / "x.txt", 1)
+    with pytest.raises(ValueError, match="65535"):
+        datagen.write_xls(tmp_path / "x.xls", 70_000)
@@ -0,0 +1,90 @@
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.db import ConnectionPool  # noqa: E402
+
+
+def _factory():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE emp (code INT, employee_type TEXT)")
+    conn.executemany("INSERT INTO emp VALUES (?, ?)", [(1, "O"), (2, "A"), (3, "O")])
+    conn.commit()
+    return conn
+
+
+def test_statement_cache_reuses_cursor():
+    pool = ConnectionPool(_factory, 1, validate_sql="SELECT 1")
+    sql = "SELECT code FROM emp WHERE employee_type = ?"
+    with pool.connection() as conn:
+        first = conn.execute(sql, ("O",))
+        assert [r[0] for r in first.fetchall()] == [1, 3]
+        second = conn.execute(sql, ("A",))
+        assert second is first and second.fetchall() == [(2,)]
+    assert pool.metrics.statement_hits == 1
+    assert pool.metrics.statement_misses == 1
+    assert pool.metrics.queries == 2 and pool.metrics.query_time >= 0
+
+
+def test_pool_is_bounded_and_reuses_connections():
+    pool = ConnectionPool(_factory, 1, timeout=0.05, validate_sql="SELECT 1")
+    with pool.connection() as conn:
+        raw = conn.raw
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+    with pool.connection() as conn:
+        assert conn.raw is raw
+    assert pool.metrics.created == 1 and pool.metrics.borrows == 2
+
+
+def test_pool_waiter_gets_released_connection():
+    pool = ConnectionPool(_factory, 1, timeout=5, validate_sql="SELECT 1")
+    got = []
+    with pool.connection():
+        t = threading.Thread(target=lambda: got.append(pool.connection().__enter__()))
+        t.start()
+    t.join(5)
+    assert got and pool.metrics.max_borrow_wait > 0
+
+
+def test_validate_on_borrow_replaces_broken_connection():
+    pool = ConnectionPool(_factory, 2, validate_sql="SELECT 1")
+    with pool.connection() as conn:
+        conn.raw.close()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM emp").fetchone() == (3,)
+    assert pool.metrics.discarded == 1 and pool.metrics.created == 2
+
+
+def test_failed_block_rolls_back():
+    pool = ConnectionPool(_factory, 1, validate_sql="SELECT 1")
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("DELETE FROM emp")
+            raise RuntimeError("boom")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM emp").fetchone() == (3,)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
+
+
+def test_uncommitted_work_is_not_inherited():
+    pool = ConnectionPool(_factory, 1, validate_sql="SELECT 1")
+    with pool.connection() as conn:
+        conn.execute("DELETE FROM emp WHERE code = 1")  # no commit
+    with pool.connection() as conn:
+        assert conn.raw.in_transaction is False
+        assert conn.execute("SELECT COUNT(*) FROM emp").fetchone() == (3,)
+        conn.execute("DELETE FROM emp WHERE code = 2")
+        conn.commit()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM emp").fetchone() == (2,)
+    assert pool.metrics.created == 1
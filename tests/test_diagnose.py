@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config  # noqa: E402
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from src.diagnose import Diagnosis, diagnose, recommend  # noqa: E402
+
+
+def test_diagnose_against_standin(tmp_path):
+    with StandInServer(tmp_path / "ifs") as server:
+        cfg = make_config(server, "/stg", 0.02)
+        diag = diagnose(
+            cfg,
+            samples=2,
+            size_mb=1,
+            blocks=(32_768, 262_144),
+            parallel=(2,),
+            workdir=tmp_path / "work",
+        )
+    assert len(diag.handshake) == 2 and len(diag.exec_rtt) == 2
+    assert set(diag.put_mb_s) == set(diag.get_mb_s) == {32_768, 262_144}
+    assert diag.csv_put_mb_s and diag.compressed_put_mb_s
+    assert diag.parallel_put_mb_s[2] > 0
+    assert diag.recommendations and diag.cipher
+    # scratch files are cleaned up on both sides
+    assert list((tmp_path / "ifs" / "stg" / "diag").iterdir()) == []
+    assert list((tmp_path / "work").iterdir()) == []
+    measures = [row["measure"] for row in diag.rows()]
+    assert measures[0] == "handshake" and "put CSV compressed" in measures
+
+
+def test_recommend_window_compression_and_parallel():
+    diag = Diagnosis(
+        host="h",
+        handshake=[2.0],
+        exec_rtt=[0.5],
+        stat_rtt=[0.05],
+        put_mb_s={65_536: 10.0, 1_048_576: 40.0},
+        get_mb_s={65_536: 100.0},
+        csv_put_mb_s=40.0,
+        compressed_put_mb_s=80.0,
+        parallel_put_mb_s={2: 60.0, 4: 90.0},
+    )
+    tips = " | ".join(recommend(diag))
+    # 40 MB/s * 50ms = 2MB in flight, well past half the 2MiB window
+    assert "set IBMI_SSH_WINDOW=8M" in tips
+    assert "Use 1024KB transfer blocks" in tips
+    assert "Enable SSH compression: CSV uploads ran 2.0x faster" in tips
+    assert "Use 4 parallel SFTP channels" in tips
+    assert "IFS write speed" in tips
+    assert "handshake takes over 1s" in tips
+    assert "batch CL work" in tips
+
+
+def test_recommend_quiet_link():
+    diag = Diagnosis(
+        host="h",
+        stat_rtt=[0.001],
+        exec_rtt=[0.002],
+        put_mb_s={65_536: 50.0},
+        get_mb_s={65_536: 55.0},
+        csv_put_mb_s=50.0,
+        compressed_put_mb_s=51.0,
+        parallel_put_mb_s={2: 52.0},
+    )
+    tips = recommend(diag)
+    assert tips[0] == "Use 64KB transfer blocks (50.0 MB/s)."
+    assert "Leave SSH compression off" in tips[1]
+    assert "did not help" in tips[2]
+    assert len(tips) == 3
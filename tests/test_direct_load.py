@@ -0,0 +1,92 @@
+import sqlite3
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import src.db as db  # noqa: E402
+import src.direct_load as dl  # noqa: E402
+
+sqlite3.register_adapter(Decimal, str)
+
+_TABLES = (
+    "CREATE TABLE L.RAC_STG_VALID (ID INT NOT NULL PRIMARY KEY, AMOUNT DECIMAL(9,2))",
+    "CREATE TABLE L.RAC_STG_REJECTS (RAW_LINE VARCHAR(512), REASON VARCHAR(128))",
+    "CREATE TABLE L.RAC_SHADOW_PAYROLL (ID INT PRIMARY KEY, AMOUNT DECIMAL(9,2))",
+    "CREATE TABLE L.RAC_RUN_DELTA (ACTION CHAR(1), ID INT, AMOUNT DECIMAL(9,2),"
+    " RAW_LINE VARCHAR(512), REASON VARCHAR(128))",
+    "CREATE TABLE L.RAC_RUN_LOG (RUN_TS TIMESTAMP DEFAULT CURRENT_TIMESTAMP,"
+    " STATUS VARCHAR(7), HASH CHAR(64))",
+)
+
+
+def sqlite_db() -> sqlite3.Connection:
+    """Return an in-memory stand-in for the staging library ``L``."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("ATTACH DATABASE ':memory:' AS L")
+    for ddl in _TABLES:
+        conn.execute(ddl)
+    return conn
+
+
+def test_apply_statements_use_direct_section():
+    stmts = dl.apply_statements("L")
+    assert stmts[0].startswith("INSERT INTO L.RAC_RUN_DELTA")
+    assert not any("RAC_STG_IN" in s or "&LIB_STG" in s for s in stmts)
+
+
+def test_split_rows_classifies(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("emp_id,amount\r\n1,10.50\n2,-3\n1,7\nx,1\n3,99999999\n")
+    valid, rejects = dl.split_rows(src)
+    assert list(valid) == [(1, Decimal("10.50")), (2, Decimal("-3"))]
+    assert [r[1] for r in rejects] == [
+        "PARSE_ERROR",
+        "DUPLICATE_ID",
+        "PARSE_ERROR",
+        "OUT_OF_RANGE",
+    ]
+
+
+def test_load_rows_applies_and_counts(tmp_path):
+    conn = sqlite_db()
+    conn.execute("INSERT INTO L.RAC_SHADOW_PAYROLL VALUES (1, 1)")
+    src = tmp_path / "in.csv"
+    src.write_text("emp_id,amount\n1,10.50\n2,20\n3,30\n")
+    result = dl.load_rows(conn, src, "L", batch_size=2)
+    assert (result.valid, result.rejected) == (3, 1)
+    assert (result.inserted, result.updated) == (2, 1)
+    rows = conn.execute("SELECT ID, AMOUNT FROM L.RAC_SHADOW_PAYROLL ORDER BY ID")
+    assert rows.fetchall() == [(1, 10.5), (2, 20), (3, 30)]
+    assert conn.execute("SELECT STATUS FROM L.RAC_RUN_LOG").fetchall() == [("SUCCESS",)]
+
+
+def test_load_rows_rolls_back_on_error(tmp_path):
+    conn = sqlite_db()
+    conn.execute("DROP TABLE L.RAC_RUN_LOG")
+    conn.commit()
+    src = tmp_path / "in.csv"
+    src.write_text("1,10\n")
+    with pytest.raises(sqlite3.OperationalError):
+        dl.load_rows(conn, src, "L")
+    assert conn.execute("SELECT COUNT(*) FROM L.RAC_SHADOW_PAYROLL").fetchone() == (0,)
+
+
+def test_executemany_batched_splits():
+    calls = []
+
+    class Cursor:
+        fast_executemany = False
+
+        def executemany(self, sql, rows):
+            calls.append(len(rows))
+
+    cur = Cursor()
+    assert db.executemany_batched(cur, "sql", iter(range(5)), 2) == 5
+    assert calls == [2, 2, 1]
+    assert cur.fast_executemany
+    with pytest.raises(ValueError):
+        db.executemany_batched(cur, "sql", [], 0)
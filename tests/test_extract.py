@@ -0,0 +1,109 @@
+import csv
+import sqlite3
+import sys
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import src.extract as extract  # noqa: E402
+
+_QUERY = "SELECT employee_code, monthly_salary FROM nmpp000 WHERE employee_type = ?"
+
+
+def _employees(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE nmpp000"
+        " (employee_type TEXT, employee_code INT, monthly_salary REAL)"
+    )
+    conn.executemany(
+        "INSERT INTO nmpp000 VALUES (?, ?, ?)",
+        (("O" if i % 2 else "A", i, i * 1.5) for i in range(rows)),
+    )
+    return conn
+
+
+def test_iter_batches_respects_batch_size():
+    cur = _employees(10).cursor()
+    sizes = [len(b) for b in extract.iter_batches(cur, _QUERY, ("O",), 2)]
+    assert sizes == [2, 2, 1]
+    with pytest.raises(ValueError):
+        next(extract.iter_batches(cur, _QUERY, ("O",), 0))
+
+
+def test_extract_to_csv(tmp_path):
+    out = tmp_path / "out.csv"
+    stats = extract.extract_to_csv(_employees(100), _QUERY, out, ("O",), batch_size=7)
+    with out.open() as fh:
+        rows = list(csv.reader(fh))
+    assert rows[0] == ["employee_code", "monthly_salary"]
+    assert len(rows) == 51 and stats.rows == 50
+    assert stats.rows_per_sec >= 0
+
+
+def test_extract_to_csv_writes_header_for_empty_result(tmp_path):
+    out = tmp_path / "out.csv"
+    stats = extract.extract_to_csv(_employees(10), _QUERY, out, ("X",))
+    assert out.read_text() == "employee_code,monthly_salary\n"
+    assert stats.rows == 0
+
+
+def test_extract_to_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "out.parquet"
+    stats = extract.extract_to_parquet(
+        _employees(20), _QUERY, out, ("O",), batch_size=3
+    )
+    assert stats.rows == 10
+    assert pq.read_table(out).num_rows == 10
+
+
+def test_extract_to_parquet_null_first_batch(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE bonus (employee_code INT, amount REAL)")
+    conn.executemany(
+        "INSERT INTO bonus VALUES (?, ?)",
+        [(code, None if code < 4 else code * 1.5) for code in range(10)],
+    )
+    out = tmp_path / "out.parquet"
+    stats = extract.extract_to_parquet(
+        conn, "SELECT * FROM bonus ORDER BY employee_code", out, batch_size=2
+    )
+    table = pq.read_table(out)
+    assert stats.rows == 10
+    assert str(table.schema.field("amount").type) == "double"
+    assert table.column("amount").to_pylist()[3:5] == [None, 6.0]
+
+
+class _DecimalCursor:
+    description = [("amount", Decimal, None, None, 9, 2, True)]
+
+    def __init__(self):
+        self._batches = [[(Decimal("1.50"),)], [(Decimal("1234567.25"),)]]
+
+    def execute(self, sql, params):
+        pass
+
+    def fetchmany(self, size):
+        return self._batches.pop(0) if self._batches else []
+
+    def close(self):
+        pass
+
+
+def test_extract_to_parquet_decimal_uses_description(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    conn = SimpleNamespace(cursor=_DecimalCursor)
+    out = tmp_path / "out.parquet"
+    extract.extract_to_parquet(conn, "SELECT amount FROM pay", out, batch_size=1)
+    table = pq.read_table(out)
+    assert str(table.schema.field("amount").type) == "decimal128(9, 2)"
+    assert table.column("amount").to_pylist() == [
+        Decimal("1.50"),
+        Decimal("1234567.25"),
+    ]
@@ -0,0 +1,63 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.history import RunHistory, format_table, percentile  # noqa: E402
+
+
+def _report(run_id, host, seconds, status="SUCCESS", started=None):
+    return {
+        "run_id": run_id,
+        "started": started or time.time(),
+        "labels": {"file": "a.csv", "host": host, "jobq": "Q", "dry_run": False},
+        "sha256": "ab" * 32,
+        "status": status,
+        "seconds": seconds,
+        "phases": [
+            {"name": "prepare", "seconds": 0.1, "bytes": 2_000_000, "rows": 10},
+            {"name": "upload", "seconds": seconds - 0.1, "bytes": 2_000_000},
+        ],
+    }
+
+
+def test_percentile_interpolates():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1, 2, 3, 4], 0.5) == 2.5
+    assert percentile([5], 0.95) == 5
+
+
+def test_history_trends(tmp_path):
+    store = RunHistory(tmp_path / "h.db")
+    store.append(_report("r1", "fast", 1.0))
+    store.append(_report("r2", "fast", 2.0))
+    store.append(_report("r3", "slow", 9.0))
+    store.append(_report("r4", "slow", 0.5, status="FAILED"))
+
+    phases = {p["phase"]: p for p in store.phase_stats()}
+    assert phases["prepare"]["runs"] == 4
+    assert phases["upload"]["max"] == 8.9
+
+    (day,) = store.throughput()
+    assert day["runs"] == 4 and day["failed"] == 1
+    assert day["rows"] == 30
+    assert round(day["mb_per_sec"], 3) == round(6 / 12, 3)
+
+    hosts = store.slowest_hosts(limit=1)
+    assert hosts == [{"host": "slow", "runs": 2, "failed": 1, "p50": 9.0, "p95": 9.0}]
+
+
+def test_history_window_and_rerecord(tmp_path):
+    store = RunHistory(tmp_path / "h.db")
+    store.append(_report("old", "h", 3.0, started=time.time() - 10 * 86400))
+    store.append(_report("new", "h", 1.0))
+    store.append(_report("new", "h", 1.0))
+    assert [p["runs"] for p in store.phase_stats(days=1)] == [1, 1]
+    assert store.slowest_hosts()[0]["runs"] == 2
+
+
+def test_format_table():
+    assert format_table([]) == "(no runs recorded)"
+    text = format_table([{"phase": "wait", "p50": 1.5}])
+    assert text.splitlines()[1].split() == ["wait", "1.500"]
@@ -45,6 +45,9 @@ def test_ssh_run_executes_safe_command() -> None:
     out, err, rc = client.ssh_run("rm -rf /")
     assert dummy.command == "rm -rf /"
     assert out == err == "" and rc == 0
+    client.ssh_run(["system", "ENDJOB JOB(000007/Q$BATCH/PROCESS) OPTION(*IMMED)"])
+    # single quotes keep the remote shell from expanding $BATCH
+    assert dummy.command == "system 'ENDJOB JOB(000007/Q$BATCH/PROCESS) OPTION(*IMMED)'"
 
 
 def test_ssh_run_rejects_injection() -> None:
@@ -69,6 +72,19 @@ def test_ssh_run_rejects_empty() -> None:
         raise AssertionError("empty command should be rejected")
 
 
+def test_sanitize_allows_cl_command_for_system() -> None:
+    cl = "SBMJOB CMD(CALL PGM(LIB/PROCESS) PARM('LIB' '/ifs')) JOBQ(*LIBL/QBATCH)"
+    assert ibmi_client_mod._sanitize_parts(f'system "{cl}"') == ["system", cl]
+    end = "ENDJOB JOB(000007/Q$BATCH/PROCESS) OPTION(*IMMED)"
+    assert ibmi_client_mod._sanitize_parts(["system", end]) == ["system", end]
+    for bad in ('system "CALL PGM($(id))"', "echo 'CALL PGM(X)'", "system 'X ${A}'"):
+        try:
+            ibmi_client_mod._sanitize_parts(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} should be rejected")  # pragma: no cover
+
+
 def test_ensure_remote_dirs_creates_missing() -> None:
     """ensure_remote_dirs should create missing directories recursively."""
 
@@ -7,6 +7,7 @@ import pytest
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 import ibmi_transfer  # noqa: E402
+from src.retry import RetryPolicy  # noqa: E402
 
 
 def test_upload_csv_via_sftp(monkeypatch, tmp_path):
@@ -14,7 +15,7 @@ def test_upload_csv_via_sftp(monkeypatch, tmp_path):
         def __init__(self):
             self.put_calls = []
 
-        def put(self, local, remote):
+        def put(self, local, remote, callback=None):
             self.put_calls.append((local, remote))
 
         def close(self):
@@ -156,3 +157,147 @@ def test_call_program_via_ssh_nonzero_exit(monkeypatch):
     )
     with pytest.raises(RuntimeError):
         ibmi_transfer.call_program_via_ssh("h", "u", "ls")
+
+
+def test_session_shares_one_connection(monkeypatch, tmp_path):
+    class FakeFile:
+        channel = SimpleNamespace(recv_exit_status=lambda: 0)
+
+        @staticmethod
+        def read():
+            return b"done"
+
+    class FakeSFTP:
+        def __init__(self):
+            self.puts = []
+
+        def put(self, local, remote, callback=None):
+            self.puts.append(remote)
+
+        def close(self):
+            pass
+
+    class FakeClient:
+        connects = 0
+
+        def load_system_host_keys(self):
+            pass
+
+        def set_missing_host_key_policy(self, policy):
+            pass
+
+        def connect(self, host, username, key_filename=None, password=None):
+            FakeClient.connects += 1
+            self.auth = (key_filename, password)
+
+        def get_transport(self):
+            return SimpleNamespace(is_active=lambda: True)
+
+        def open_sftp(self):
+            self.sftp = FakeSFTP()
+            return self.sftp
+
+        def exec_command(self, command):
+            self.command = command
+            return FakeFile(), FakeFile(), FakeFile()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(
+        ibmi_transfer,
+        "paramiko",
+        SimpleNamespace(SSHClient=FakeClient, RejectPolicy=object),
+    )
+    local = tmp_path / "sample.csv"
+    local.write_text("1,2")
+    with ibmi_transfer.IBMiSession("h", "u", password="p", key_path="k") as session:
+        remote = session.upload(local, "/in")
+        client = session.client
+        out = session.run("system CALL")
+    assert FakeClient.connects == 1
+    assert client.auth == ("k", "p")
+    assert client.sftp.puts == [remote] == ["/in/sample.csv"]
+    assert out == "done" and client.command == "system CALL"
+    assert session.client is None
+
+
+def test_session_connect_retries_transient_failures(monkeypatch):
+    class FakeClient:
+        connects = 0
+
+        def load_system_host_keys(self):
+            pass
+
+        def set_missing_host_key_policy(self, policy):
+            pass
+
+        def connect(self, host, username, password=None):
+            FakeClient.connects += 1
+            if FakeClient.connects == 1:
+                raise ConnectionResetError("reset")
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(
+        ibmi_transfer,
+        "paramiko",
+        SimpleNamespace(SSHClient=FakeClient, RejectPolicy=object),
+    )
+    policy = RetryPolicy(max_attempts=3, base_delay=0, jitter=0)
+    with ibmi_transfer.IBMiSession("h", "u", password="p", retry_policy=policy) as s:
+        assert s.client is not None
+    assert FakeClient.connects == 2
+    assert s.retry_metrics.retries == 1
+
+
+def test_session_upload_restarts_when_nothing_was_written(monkeypatch, tmp_path):
+    class FakeSFTP:
+        puts = 0
+
+        def put(self, local, remote, callback=None):
+            FakeSFTP.puts += 1
+            if FakeSFTP.puts == 1:
+                raise ConnectionResetError("reset before any byte")
+            data = Path(local).read_bytes()
+            Path(remote).write_bytes(data)
+            callback(len(data), len(data))
+
+        def close(self):
+            pass
+
+    class FakeClient:
+        def load_system_host_keys(self):
+            pass
+
+        def set_missing_host_key_policy(self, policy):
+            pass
+
+        def connect(self, host, username, password=None):
+            pass
+
+        def get_transport(self):
+            return SimpleNamespace(is_active=lambda: True)
+
+        def open_sftp(self):
+            return FakeSFTP()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(
+        ibmi_transfer,
+        "paramiko",
+        SimpleNamespace(SSHClient=FakeClient, RejectPolicy=object),
+    )
+    local = tmp_path / "in.csv"
+    local.write_text("emp_id,amount\n1,10.00\n2,999.00\n")
+    (tmp_path / "in").mkdir()
+    stale = tmp_path / "in" / "in.csv"
+    stale.write_text("emp_id,amount\n7,1.00\n")
+    policy = RetryPolicy(max_attempts=2, base_delay=0, jitter=0)
+    with ibmi_transfer.IBMiSession("h", "u", password="p") as session:
+        session.upload(local, (tmp_path / "in").as_posix(), policy=policy)
+    assert stale.read_text() == local.read_text()
+    assert session.retry_metrics.resumed_bytes == 0
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.jobqueue import (  # noqa: E402
+    JobQueue,
+    Limits,
+    Scheduler,
+    parse_deadline,
+    parse_limits,
+    runner_command,
+)
+
+
+def _add(queue, name, *, host="h1", jobq="QBATCH", ifs_dir=None, **kwargs):
+    return queue.enqueue(
+        name, host=host, jobq=jobq, ifs_dir=ifs_dir or f"/stg/{name}", **kwargs
+    )
+
+
+def test_parse_limits_and_deadline():
+    assert parse_limits("qbatch=1, QSYSNOMAX=4,") == {"QBATCH": 1, "QSYSNOMAX": 4}
+    assert parse_limits(None) == {}
+    assert parse_deadline("+30m", now=100.0) == 1900.0
+    assert parse_deadline("+2h", now=0.0) == 7200.0
+    assert parse_deadline("+90", now=0.0) == 90.0
+    assert parse_deadline("") is None
+    assert parse_deadline("2026-01-02T03:04:05") > 0
+
+
+def test_claim_orders_by_priority_then_deadline(tmp_path):
+    queue = JobQueue(tmp_path / "q.db")
+    late = _add(queue, "late", deadline=2000.0)
+    none = _add(queue, "none")
+    soon = _add(queue, "soon", deadline=1000.0)
+    urgent = _add(queue, "urgent", priority=1)
+    limits = Limits(host=10, default_jobq=10)
+    order = [queue.claim(limits, "w", 60).job_id for _ in range(4)]
+    assert order == [urgent, soon, late, none]
+    assert queue.claim(limits, "w", 60) is None
+
+
+def test_claim_respects_host_jobq_and_directory_caps(tmp_path):
+    queue = JobQueue(tmp_path / "q.db")
+    a = _add(queue, "a")
+    b = _add(queue, "b")  # QBATCH on h1 is full while a runs
+    c = _add(queue, "c", jobq="QSYSNOMAX")
+    d = _add(queue, "d", jobq="QSYSNOMAX")  # h1 host cap reached
+    e = _add(queue, "e", host="h2", ifs_dir="/stg/a")
+    f = _add(queue, "f", host="h2", ifs_dir="/stg/a")  # same IFS dir as e
+    limits = Limits(host=2, jobq={"QSYSNOMAX": 4})
+    claimed = []
+    while (job := queue.claim(limits, "w", 60)) is not None:
+        claimed.append(job.job_id)
+    assert claimed == [a, c, e]
+    queue.finish(a, 0)
+    assert queue.claim(limits, "w", 60).job_id == b
+    queue.finish(e, 1, "boom")
+    assert queue.claim(limits, "w", 60).job_id == f
+    assert queue.get(a).state == "done" and queue.get(e).error == "boom"
+    assert [j.job_id for j in queue.jobs(("queued",))] == [d]
+
+
+def test_expired_lease_requeues_after_restart(tmp_path):
+    path = tmp_path / "q.db"
+    job_id = _add(JobQueue(path), "a")
+    first = JobQueue(path, max_attempts=2).claim(Limits(), "dead", 10, now=100.0)
+    assert first.state == "running" and first.attempts == 1
+    queue = JobQueue(path, max_attempts=2)  # a new process after a crash
+    assert queue.claim(Limits(), "w", 10, now=105.0) is None  # lease still held
+    again = queue.claim(Limits(), "w", 10, now=111.0)
+    assert again.job_id == job_id and again.attempts == 2 and again.owner == "w"
+    assert queue.claim(Limits(), "w", 10, now=200.0) is None
+    assert queue.get(job_id).state == "failed"
+    assert queue.get(job_id).error == "worker lease expired"
+    assert "--resume" not in runner_command(first)
+    assert runner_command(again)[-1] == "--resume"
+
+
+def test_cancel_only_queued_jobs(tmp_path):
+    queue = JobQueue(tmp_path / "q.db")
+    a = _add(queue, "a")
+    b = _add(queue, "b", ifs_dir="/stg/x")
+    queue.claim(Limits(), "w", 60)
+    assert not queue.cancel(a)
+    assert queue.cancel(b)
+    assert queue.counts() == {"running": 1, "cancelled": 1}
+
+
+class FakeProc:
+    def __init__(self, job):
+        self.job = job
+        self.code = None
+
+    def poll(self):
+        return self.code
+
+
+def test_scheduler_runs_within_caps_and_records_results(tmp_path):
+    queue = JobQueue(tmp_path / "q.db")
+    ids = [_add(queue, name, args=["--sync"]) for name in "abc"]
+    started = []
+
+    def launcher(job):
+        started.append(FakeProc(job))
+        return started[-1]
+
+    scheduler = Scheduler(
+        queue, Limits(host=2, default_jobq=2), owner="w", launcher=launcher
+    )
+    assert scheduler.step() == 2
+    assert [p.job.job_id for p in started] == ids[:2]
+    assert started[0].job.args == ["--sync"]
+    started[0].code = 0
+    started[1].code = 3
+    assert scheduler.step() == 1
+    assert queue.get(ids[0]).state == "done"
+    failed = queue.get(ids[1])
+    assert failed.state == "failed" and failed.exit_code == 3
+    started[2].code = 0
+    scheduler.run(once=True)
+    assert queue.counts() == {"done": 2, "failed": 1}
+
+
+def test_runner_command_targets_job_settings(tmp_path):
+    queue = JobQueue(tmp_path / "q.db")
+    job = queue.get(_add(queue, "a.csv", jobq="qbatch", args=["--export", "delta"]))
+    cmd = runner_command(job)
+    assert cmd[1:3] == ["-m", "src.runner"]
+    assert cmd[3:] == [
+        "--file",
+        str(Path("a.csv").resolve()),
+        "--jobq",
+        "QBATCH",
+        "--ifs-dir",
+        "/stg/a.csv",
+        "--export",
+        "delta",
+    ]
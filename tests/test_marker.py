@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.marker import parse_marker, record_remote_phases  # noqa: E402
+from src.metrics import Recorder  # noqa: E402
+
+MARKER = """SUCCESS
+phase=import start=20261019100000000000 end=20261019100002500000 rows=0000001234 ok=1
+phase=apply start=20261019100002500000 end=20261019100003000000 rows=0000001200 ok=1
+garbage line
+phase=export start=20261019100003000000 end=20261019100004000000 rows=0000001200 ok=1
+"""
+
+
+def test_parse_marker_phases_and_legacy_format():
+    marker = parse_marker(MARKER)
+    assert marker.status == "SUCCESS" and not marker.failed
+    assert [(p.name, p.seconds, p.rows) for p in marker.phases] == [
+        ("import", 2.5, 1234),
+        ("apply", 0.5, 1200),
+        ("export", 1.0, 1200),
+    ]
+    assert marker.busy_seconds == 4.0
+    legacy = parse_marker("FAILED cause\n")
+    assert legacy.failed and legacy.phases == [] and legacy.busy_seconds == 0.0
+
+
+def test_record_remote_phases_adds_spans_and_queue_time():
+    recorder = Recorder()
+    recorder.begin_run()
+    record_remote_phases(parse_marker(MARKER), waited=10.0, recorder=recorder)
+    spans = {s.name: s for s in recorder.spans}
+    assert list(spans) == [
+        "remote_queue",
+        "remote_import",
+        "remote_apply",
+        "remote_export",
+    ]
+    assert spans["remote_queue"].seconds == 6.0
+    assert spans["remote_import"].rows == 1234
+    assert spans["remote_apply"].start - spans["remote_import"].start == 2.5
+    end = spans["remote_export"].start + spans["remote_export"].seconds
+    assert abs(end - recorder.elapsed()) < 0.5
+    assert recorder.histograms["phase", "remote_apply"].count == 1
+
+
+def test_record_remote_phases_ignores_legacy_marker():
+    recorder = Recorder()
+    recorder.begin_run()
+    record_remote_phases(parse_marker("SUCCESS"), waited=3.0, recorder=recorder)
+    assert recorder.spans == []
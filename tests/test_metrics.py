@@ -0,0 +1,63 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.metrics import Histogram, Recorder  # noqa: E402
+
+
+def test_phase_records_span_and_histogram():
+    rec = Recorder()
+    rec.begin_run(host="h")
+    with rec.phase("upload", bytes=10) as span:
+        span.rows = 2
+    with pytest.raises(RuntimeError):
+        with rec.phase("wait"):
+            raise RuntimeError("boom")
+    report = rec.end_run("FAILED")
+    assert [p["name"] for p in report["phases"]] == ["upload", "wait"]
+    assert report["phases"][0]["bytes"] == 10 and report["phases"][0]["rows"] == 2
+    assert report["phases"][1]["ok"] is False
+    assert report["labels"] == {"host": "h"} and report["status"] == "FAILED"
+    assert rec.histograms[("phase", "upload")].count == 1
+
+
+def test_histograms_accumulate_across_runs():
+    rec = Recorder()
+    for _ in range(3):
+        rec.begin_run()
+        with rec.phase("setup"):
+            pass
+        rec.end_run("SUCCESS")
+    assert len(rec.spans) == 1
+    assert rec.histograms[("phase", "setup")].count == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.5, 3.0):
+        hist.observe(value)
+    assert hist.counts == [1, 2] and hist.count == 3
+    assert hist.quantile(0.5) == 2.0 and hist.quantile(1.0) == float("inf")
+
+
+def test_exports(tmp_path):
+    rec = Recorder()
+    rec.begin_run()
+    with rec.phase("upload", bytes=5):
+        pass
+    rec.observe("sftp_put", 0.2, kind="call")
+    rec.end_run("SUCCESS")
+    prom = tmp_path / "ibmi.prom"
+    rec.write_prometheus(prom)
+    text = prom.read_text()
+    assert "# TYPE ibmi_phase_seconds histogram" in text
+    assert 'ibmi_phase_seconds_count{phase="upload"} 1' in text
+    assert 'ibmi_call_seconds_bucket{call="sftp_put",le="0.25"} 1' in text
+    assert 'ibmi_phase_bytes_total{phase="upload"} 5' in text
+    report = tmp_path / "run.json"
+    rec.write_json(report)
+    assert json.loads(report.read_text())["status"] == "SUCCESS"
@@ -28,25 +28,67 @@ def _noop(*args, **kwargs):  # noqa: ANN001 - match external signature
     return None
 
 
+class FakeSession:
+    """Stand-in for ``IBMiSession`` recording calls."""
+
+    instances: list["FakeSession"] = []
+    fail_run = False
+
+    def __init__(  # noqa: ANN001
+        self, host, user, *, password=None, key_path=None, retry_policy=None
+    ):
+        self.retry_policy = retry_policy
+        self.calls: list[tuple] = []
+        FakeSession.instances.append(self)
+
+    def __enter__(self):
+        self.calls.append(("connect",))
+        return self
+
+    def __exit__(self, *exc):  # noqa: ANN002
+        self.calls.append(("close",))
+
+    def upload(self, local, remote_dir, *, retries=1, policy=None):  # noqa: ANN001
+        self.calls.append(("upload", local, remote_dir))
+        self.upload_policy = policy
+
+    def run(self, cmd):  # noqa: ANN001
+        self.calls.append(("run", cmd))
+        if self.fail_run:
+            raise RuntimeError("fail")
+        return ""
+
+
 def test_main_returns_nonzero_on_failure(monkeypatch):
     monkeypatch.setattr(payroll_b, "parse_args", _args)
     monkeypatch.setattr(payroll_b, "load_config", _cfg)
     monkeypatch.setattr(payroll_b, "csv_from_excel", _noop)
-    monkeypatch.setattr(payroll_b, "upload_csv_via_sftp", _noop)
+    monkeypatch.setattr(FakeSession, "fail_run", True)
+    monkeypatch.setattr(payroll_b, "IBMiSession", FakeSession)
+    assert payroll_b.main() == 1
 
-    def boom(*args, **kwargs):  # noqa: ANN001 - match external signature
-        raise RuntimeError("fail")
 
-    monkeypatch.setattr(payroll_b, "call_program_via_ssh", boom)
-    assert payroll_b.main() == 1
+def test_main_uses_single_session(monkeypatch):
+    monkeypatch.setattr(payroll_b, "parse_args", _args)
+    monkeypatch.setattr(payroll_b, "load_config", _cfg)
+    monkeypatch.setattr(payroll_b, "csv_from_excel", _noop)
+    monkeypatch.setattr(FakeSession, "instances", [])
+    monkeypatch.setattr(payroll_b, "IBMiSession", FakeSession)
+    assert payroll_b.main() == 0
+    assert len(FakeSession.instances) == 1
+    ops = [c[0] for c in FakeSession.instances[0].calls]
+    assert ops == ["connect", "upload", "run", "close"]
+    session = FakeSession.instances[0]
+    # the connect is retried with the same policy as the upload
+    assert session.retry_policy is session.upload_policy
+    assert session.retry_policy.max_attempts == 3
 
 
 def test_main_rejects_invalid_library(monkeypatch):
     monkeypatch.setattr(payroll_b, "parse_args", _args)
     monkeypatch.setattr(payroll_b, "load_config", partial(_cfg, lib="BAD-LIB"))
     monkeypatch.setattr(payroll_b, "csv_from_excel", _noop)
-    monkeypatch.setattr(payroll_b, "upload_csv_via_sftp", _noop)
-    monkeypatch.setattr(payroll_b, "call_program_via_ssh", _noop)
+    monkeypatch.setattr(payroll_b, "IBMiSession", FakeSession)
     try:
         payroll_b.main()
     except ValueError as exc:  # noqa: PT011 - expect exception
@@ -1,88 +1,130 @@
+import importlib
 import sys
+import time
 import types
+
 import pytest
 
+from src.progress import Progress
 
-def import_gui(monkeypatch, module_name):
-    class DummyWidget:
-        def __init__(self, *a, **k):
-            raise NotImplementedError()
 
-        def pack(self, *a, **k):
-            raise NotImplementedError()
+def import_gui(monkeypatch, module_name, win_attr):
+    """Import a GUI module and give it stub widgets (no Tk window)."""
+    monkeypatch.setattr(sys, "argv", [module_name])
+    mod = importlib.import_module(module_name)
+    ui = types.SimpleNamespace(scheduled=[], quit=False, text=[])
+    window = types.SimpleNamespace(
+        after=lambda ms, fn: ui.scheduled.append(fn),
+        quit=lambda: setattr(ui, "quit", True),
+    )
+    monkeypatch.setattr(mod, win_attr, window, raising=False)
+    monkeypatch.setattr(mod, "progress_bar", {"value": 0}, raising=False)
+    monkeypatch.setattr(
+        mod, "percent", types.SimpleNamespace(set=ui.text.append), raising=False
+    )
+    monkeypatch.setattr(mod, "job", None)
+    monkeypatch.setattr(mod.Path, "is_file", lambda self: True)
+    return mod, ui
 
-        def config(self, *a, **k):
-             raise NotImplementedError()
 
-        def configure(self, *a, **k):
-             raise NotImplementedError()
+def run_until_done(mod, ui):
+    """Play the Tk ``after`` loop until the GUI stops rescheduling."""
+    mod.job.join(timeout=5)
+    while ui.scheduled:
+        ui.scheduled.pop(0)()
 
-    class DummyWindow(DummyWidget):
-        def __init__(self):
-            self.tk = object()
 
-        def geometry(self, *a):
-            raise NotImplementedError()
+def fake_main(rc=0, error=None):
+    def main(progress=None, on_phase=None):
+        for name in ("convert", "connect", "upload"):
+            on_phase(name)
+        for done in (250, 500, 1000):
+            progress(Progress("f.csv", done, 1000, 1.0, 500.0, 500.0))
+        on_phase("run")
+        if error:
+            raise error
+        return rc
 
-        def title(self, *a):
-            raise NotImplementedError()
+    return main
 
-        def update_idletasks(self):
-            raise NotImplementedError()
 
-        def quit(self):
-            raise NotImplementedError()
+GUIS = [("payroll", "window"), ("src.payroll", "WindowFrame")]
 
-        def resizable(self, *a):
-            raise NotImplementedError()
 
-        def mainloop(self):
-            raise NotImplementedError()
+@pytest.mark.parametrize("module_name,win_attr", GUIS)
+def test_button_confirm_runs_in_background(monkeypatch, module_name, win_attr):
+    mod, ui = import_gui(monkeypatch, module_name, win_attr)
+    seen = []
 
-    monkeypatch.setattr(sys, "argv", [module_name])
-    monkeypatch.setattr("tkinter.Tk", DummyWindow)
-    monkeypatch.setattr("tkinter.Label", DummyWidget)
-    monkeypatch.setattr("tkinter.Button", DummyWidget)
-    monkeypatch.setattr("tkinter.ttk.Label", DummyWidget)
-    monkeypatch.setattr("tkinter.ttk.Button", DummyWidget)
-    monkeypatch.setattr("tkinter.ttk.Progressbar", DummyWidget)
-    monkeypatch.setattr("tkinter.StringVar", lambda: types.SimpleNamespace(set=lambda *a, **k: None))
-    monkeypatch.setattr("PIL.Image.open", lambda *a, **k: object())
-    monkeypatch.setattr("PIL.ImageTk.PhotoImage", lambda *a, **k: object())
-    __import__(module_name)
-    return sys.modules[module_name]
-
-
-@pytest.mark.parametrize("module_name,win_attr", [("payroll", "window"), ("src.payroll", "WindowFrame")])
-def test_button_confirm_success(monkeypatch, module_name, win_attr):
-    mod = import_gui(monkeypatch, module_name)
-    monkeypatch.setattr(mod.time, "sleep", lambda s: None)
-    monkeypatch.setattr(mod.Path, "is_file", lambda self: True)
-    setattr(mod, win_attr, types.SimpleNamespace(update_idletasks=lambda: None, quit=lambda: None))
-    mod.progress_bar = {"value": 0}
-    mod.percent = types.SimpleNamespace(set=lambda *a, **k: None)
-    mod.payroll_b = types.SimpleNamespace(main=lambda: 0)
+    def main(progress=None, on_phase=None):
+        on_phase("upload")
+        progress(Progress("f.csv", 500, 1000, 1.0, 500.0, 500.0))
+        seen.append(mod.progress_bar["value"])
+        return 0
+
+    monkeypatch.setattr(mod, "payroll_b", types.SimpleNamespace(main=main))
+    start = time.perf_counter()
     mod.button_confirm()
+    # returns at once; the Tk thread only polls the queue
+    assert time.perf_counter() - start < 0.5
+    assert not hasattr(mod, "time")
+    run_until_done(mod, ui)
+    assert seen == [0]
     assert mod.progress_bar["value"] == 100
+    assert ui.quit
+    assert mod.status.text.startswith("Subiendo archivo 50% (0.0 MB/s")
 
 
-@pytest.mark.parametrize("module_name,win_attr", [("payroll", "window"), ("src.payroll", "WindowFrame")])
+@pytest.mark.parametrize("module_name,win_attr", GUIS)
 def test_button_confirm_error(monkeypatch, module_name, win_attr):
-    mod = import_gui(monkeypatch, module_name)
-    monkeypatch.setattr(mod.time, "sleep", lambda s: None)
-    monkeypatch.setattr(mod.Path, "is_file", lambda self: True)
-    setattr(mod, win_attr, types.SimpleNamespace(update_idletasks=lambda: None, quit=lambda: None))
-    mod.progress_bar = {"value": 0}
-    mod.percent = types.SimpleNamespace(set=lambda *a, **k: None)
-    mod.payroll_b = types.SimpleNamespace(main=lambda: 1)
-    with pytest.raises(RuntimeError):
-        mod.button_confirm()
-
-
-@pytest.mark.parametrize("module_name,win_attr", [("payroll", "window"), ("src.payroll", "WindowFrame")])
-def test_button_cancel(monkeypatch, module_name, win_attr):
-    mod = import_gui(monkeypatch, module_name)
-    called = {}
-    setattr(mod, win_attr, types.SimpleNamespace(quit=lambda: called.setdefault("q", True)))
+    mod, ui = import_gui(monkeypatch, module_name, win_attr)
+    monkeypatch.setattr(mod, "payroll_b", types.SimpleNamespace(main=fake_main(rc=1)))
+    mod.button_confirm()
+    run_until_done(mod, ui)
+    assert not ui.quit
+    assert mod.status.result == 1
+    assert mod.progress_bar["value"] == 90
+
+    monkeypatch.setattr(
+        mod,
+        "payroll_b",
+        types.SimpleNamespace(main=fake_main(error=RuntimeError("boom"))),
+    )
+    mod.button_confirm()
+    run_until_done(mod, ui)
+    assert not ui.quit
+    assert ui.text[-1] == "Error: boom"
+
+
+@pytest.mark.parametrize("module_name,win_attr", GUIS)
+def test_button_cancel_stops_running_transfer(monkeypatch, module_name, win_attr):
+    mod, ui = import_gui(monkeypatch, module_name, win_attr)
+    sent = []
+
+    def endless_upload(progress=None, on_phase=None):
+        on_phase("upload")
+        done = 0
+        while True:  # stands in for paramiko calling back per block
+            done += 32768
+            progress(Progress("f.csv", done, 10**12, 1.0, 1.0, 1.0))
+            sent.append(done)
+            time.sleep(0.001)
+
+    monkeypatch.setattr(mod, "payroll_b", types.SimpleNamespace(main=endless_upload))
+    mod.button_confirm()
+    while not sent:
+        time.sleep(0.001)
+    mod.button_cancel()
+    assert ui.text[-1] == "Cancelando..."
+    assert not ui.quit
+    run_until_done(mod, ui)
+    assert not mod.job.is_alive()
+    assert mod.status.outcome == "cancelled"
+    assert ui.quit
+
+
+@pytest.mark.parametrize("module_name,win_attr", GUIS)
+def test_button_cancel_when_idle_quits(monkeypatch, module_name, win_attr):
+    mod, ui = import_gui(monkeypatch, module_name, win_attr)
     mod.button_cancel()
-    assert called.get("q")
+    assert ui.quit
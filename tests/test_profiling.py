@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import src.profiling as profiling  # noqa: E402
+import src.workflow as wf  # noqa: E402
+from src.metrics import RECORDER  # noqa: E402
+
+
+def _busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_cpu_profile_attributes_hotspots_to_phases(tmp_path):
+    with profiling.profile("cpu", tmp_path):
+        RECORDER.begin_run()
+        with RECORDER.phase("prepare"):
+            _busy(20000)
+        RECORDER.end_run("SUCCESS")
+    summary = (tmp_path / "cpu_hotspots.txt").read_text()
+    assert "===== phase prepare =====" in summary and "_busy" in summary
+    assert (tmp_path / "cpu_prepare.pstats").exists()
+    assert not RECORDER.hooks
+
+
+def test_memory_probe_is_noop_when_disabled():
+    @profiling.memory_probe("x")
+    def work():
+        return 1
+
+    assert work() == 1
+
+
+def test_memory_profile_reports_nested_probes(tmp_path):
+    @profiling.memory_probe("inner")
+    def inner():
+        return bytearray(2_000_000)
+
+    with profiling.profile("mem", tmp_path):
+        with profiling.memory_probe("outer"):
+            data = inner()
+            del data
+    report = (tmp_path / "mem_report.txt").read_text()
+    assert "===== inner: peak" in report and "===== outer: peak" in report
+    memory = RECORDER.run["memory"]
+    assert memory["inner"]["peak"] >= 2_000_000
+    assert memory["outer"]["peak"] >= memory["inner"]["peak"]
+
+
+def test_prepare_csv_is_probed(tmp_path, monkeypatch):
+    src = tmp_path / "in.csv"
+    src.write_text("emp_id,amount\n1,2\n")
+    with profiling.profile("mem", tmp_path):
+        wf._prepare_csv(src, wf.logging.getLogger(__name__))
+    assert {"_prepare_csv", "sniff_csv"} <= set(RECORDER.run["memory"])
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        with profiling.profile("gpu", Path(".")):
+            pass
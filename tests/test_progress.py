@@ -0,0 +1,78 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config  # noqa: E402
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from src.ibmi_client import IBMiClient  # noqa: E402
+from src.progress import (  # noqa: E402
+    ConsoleProgress,
+    Progress,
+    ProgressTracker,
+    chain,
+    format_progress,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tracker_throttles_and_reports_rates():
+    clock = FakeClock()
+    seen = []
+    tracker = ProgressTracker(seen.append, "f.csv", interval=1.0, clock=clock)
+    for step in range(1, 21):
+        clock.now = step * 0.1
+        tracker(step * 100, 4000)
+    # one report per second of transfer
+    assert [p.done for p in seen] == [1000, 2000]
+    assert seen[0].rate == pytest.approx(1000)
+    assert seen[0].average == pytest.approx(1000)
+    assert seen[1].eta == pytest.approx(2.0)
+    clock.now = 2.05
+    tracker(4000, 4000)
+    assert seen[-1].finished and seen[-1].eta == 0.0
+
+
+def test_progress_formatting():
+    p = Progress("big.csv", 450_000_000, 1_000_000_000, 10.0, 12_300_000, 45e6)
+    assert format_progress(p) == "big.csv  45% 450.0MB/1.0GB 12.3MB/s ETA 0:44"
+    assert Progress("x", 0, 10, 0.0, 0.0, 0.0).eta is None
+    out = io.StringIO()
+    ConsoleProgress(out)(Progress("x", 10, 10, 2.0, 5.0, 5.0))
+    assert out.getvalue().endswith("x done 10B in 2.0s (5B/s)\n")
+
+
+def test_chain_skips_none():
+    calls = []
+    assert chain(None, None) is None
+    cb = chain(None, lambda d, t: calls.append(("a", d)))
+    cb(1, 2)
+    both = chain(
+        lambda d, t: calls.append(("b", d)), lambda d, t: calls.append(("c", d))
+    )
+    both(3, 4)
+    assert calls == [("a", 1), ("b", 3), ("c", 3)]
+
+
+def test_client_reports_upload_and_download_progress(tmp_path):
+    local = tmp_path / "f.bin"
+    local.write_bytes(b"x" * 1_000_000)
+    ups, downs = [], []
+    with StandInServer(tmp_path / "ifs") as server:
+        with IBMiClient(make_config(server, "/stg", 0.02)) as client:
+            client.sftp_put(local, "/f.bin", progress=ups.append)
+            client.sftp_get("/f.bin", tmp_path / "back.bin", progress=downs.append)
+    for reports in (ups, downs):
+        assert reports[-1].done == reports[-1].total == 1_000_000
+        assert reports[-1].name == "f.bin"
+        assert reports[-1].average > 0
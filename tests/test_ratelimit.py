@@ -0,0 +1,131 @@
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config  # noqa: E402
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from ibmi_transfer import IBMiSession  # noqa: E402
+from src.ibmi_client import IBMiClient  # noqa: E402
+from src.ratelimit import TokenBucket, parse_hours, parse_rate  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _bucket(rate, **kwargs):
+    clock = FakeClock()
+    return TokenBucket(rate, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_parse_rate_and_hours():
+    assert parse_rate("2M") == 2e6
+    assert parse_rate("512KB/s") == 512e3
+    assert parse_rate("1500") == 1500
+    assert parse_rate("") is None and parse_rate("0") is None
+    assert parse_hours("7-19") == (7, 19)
+    assert parse_hours(None) is None
+    with pytest.raises(ValueError):
+        parse_hours("7-30")
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket, clock = _bucket(1000)
+    bucket.consume(1000)
+    assert clock.sleeps == []
+    for _ in range(4):
+        bucket.consume(500)
+    # 2000 bytes beyond the initial burst at 1000 B/s
+    assert clock.now == pytest.approx(1.5)
+    assert max(clock.sleeps) <= 0.25
+
+
+def test_bucket_rate_change_applies_mid_transfer():
+    bucket, clock = _bucket(100)
+    bucket.consume(100)
+    bucket.consume(100)
+    bucket.rate = 10_000
+    bucket.consume(100)
+    assert clock.now < 1.1
+    bucket.rate = None
+    bucket.consume(10**9)
+    assert not bucket.active()
+    bucket.rate = 100
+    before = clock.now
+    bucket.consume(100)
+    assert clock.now == before
+
+
+def test_bucket_only_limits_within_hours():
+    hour = [12]
+    bucket, clock = _bucket(
+        10, hours=(7, 19), now=lambda: datetime(2026, 1, 1, hour[0])
+    )
+    assert bucket.active()
+    hour[0] = 22
+    bucket.consume(10_000)
+    assert clock.sleeps == []
+    overnight, _ = _bucket(10, hours=(22, 6), now=lambda: datetime(2026, 1, 1, 23))
+    assert overnight.active()
+
+
+def test_callback_consumes_deltas_and_handles_restarts():
+    bucket, clock = _bucket(1000, burst=10**9)
+    cb = bucket.callback()
+    for done in (300, 600, 1000, 400, 1000):
+        cb(done, 1000)
+    assert bucket._tokens == pytest.approx(10**9 - 2000)
+
+
+def test_bucket_is_shared_between_threads():
+    bucket = TokenBucket(200_000, burst=10_000)
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=lambda: [bucket.consume(10_000) for _ in range(5)])
+        for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 100KB at 200KB/s, less the 10KB burst
+    assert time.perf_counter() - start >= 0.4
+
+
+def test_client_and_session_transfers_are_throttled(tmp_path):
+    local = tmp_path / "f.bin"
+    local.write_bytes(b"x" * 300_000)
+    bucket = TokenBucket(1_000_000, burst=50_000)
+    with StandInServer(tmp_path / "ifs") as server:
+        with IBMiClient(make_config(server, "/stg", 0.02), limiter=bucket) as client:
+            start = time.perf_counter()
+            client.sftp_put(local, "/f.bin")
+            client.sftp_get("/f.bin", tmp_path / "back.bin")
+            assert time.perf_counter() - start >= 0.5
+        with IBMiSession(
+            "127.0.0.1",
+            server.user,
+            password=server.password,
+            port=server.port,
+            known_hosts=server.write_known_hosts(tmp_path / "known_hosts"),
+        ) as session:
+            start = time.perf_counter()
+            session.upload(local, "/", limiter=TokenBucket(1_000_000, burst=50_000))
+            assert time.perf_counter() - start >= 0.2
+    assert (tmp_path / "back.bin").read_bytes() == local.read_bytes()
+    assert bucket.waited > 0
@@ -0,0 +1,98 @@
+import shutil
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config, write_csv  # noqa: E402
+from benchmarks.ibmi_standin import Delays, StandInServer  # noqa: E402
+from src import replay  # noqa: E402
+from src.workflow import run_workflow  # noqa: E402
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def _config(**extra):
+    return types.SimpleNamespace(
+        host="h", ifs_dir="/i", lib_stg="L", outq="O", jobq="J", **extra
+    )
+
+
+def _recording(marker="SUCCESS"):
+    return replay.Recording(
+        [
+            {"op": "connect", "at": 0.0, "seconds": 0.2},
+            {"op": "ensure_remote_dirs", "at": 0.2, "seconds": 0.1, "count": 5},
+            {"op": "sftp_put", "at": 0.3, "seconds": 1.0, "bytes": 100},
+            {"op": "ssh_run", "at": 1.3, "seconds": 0.3, "verb": "RUNSQLSTM", "rc": 0},
+            {"op": "ssh_run", "at": 1.6, "seconds": 0.1, "verb": "SBMJOB", "rc": 0},
+            {"op": "listdir", "at": 1.7, "seconds": 0.05, "status": False},
+            {"op": "listdir", "at": 6.7, "seconds": 0.05, "status": True},
+            {"op": "sftp_get", "at": 6.8, "seconds": 0.1, "bytes": 8, "marker": marker},
+            {"op": "close", "at": 7.0, "seconds": 0.0},
+        ]
+    )
+
+
+def test_record_against_standin_has_no_payload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(REPO / "ibmi", tmp_path / "ibmi")
+    data = tmp_path / "data.csv"
+    write_csv(data, 0.01)
+    recording = replay.Recording()
+    with StandInServer(tmp_path / "ifs", delays=Delays(job_run=0.05)) as server:
+        cfg = make_config(server, "/stg", 0.02)
+        run_workflow(
+            data, cfg, sync=True, client_factory=replay.recording_factory(recording)
+        )
+    recording.save(tmp_path / "rec.json")
+    text = (tmp_path / "rec.json").read_text()
+    for secret in ("/stg", "data.csv", "BENCH", server.password, "emp_id"):
+        assert secret not in text
+    loaded = replay.Recording.load(tmp_path / "rec.json")
+    ops = [e["op"] for e in loaded.events]
+    assert ops[0] == "connect" and ops[-1] == "close"
+    assert ops.count("sftp_put") == 5  # four scripts and the CSV
+    assert [e["verb"] for e in loaded.events if e["op"] == "ssh_run"] == [
+        "RUNSQLSTM",
+        "SBMJOB",
+    ]
+    assert 0.04 < loaded.marker_delay < 2
+    assert Delays.from_recording(loaded).job_queue == loaded.marker_delay
+
+
+def test_replay_reproduces_timing_profile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = tmp_path / "data.csv"
+    data.write_text("1,2\n" * 50)  # 200 bytes: twice the recorded upload
+    sleeps = []
+    rec = _recording()
+    assert rec.marker_delay == pytest.approx(5.05)
+
+    def factory(config, dry_run=False):
+        return replay.ReplayClient(
+            config, dry_run, recording=rec, speed=100, sleep=sleeps.append
+        )
+
+    cfg = _config(poll_interval=0.01)
+    start = time.monotonic()
+    run_workflow(data, cfg, client_factory=factory)
+    assert time.monotonic() - start >= 0.05  # marker shows up after 5.05s / 100
+    assert sleeps[:3] == pytest.approx([0.002, 0.001, 0.02])  # upload scaled x2
+    assert (tmp_path / "outputs" / "RUN00000000000000.status").exists()
+
+
+def test_replay_failed_marker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = tmp_path / "data.csv"
+    data.write_text("1,2\n")
+    cfg = _config(poll_interval=0.001)
+    factory = replay.replay_factory(_recording("FAILED"), speed=1000)
+    with pytest.raises(RuntimeError, match="Remote job failed"):
+        run_workflow(data, cfg, client_factory=factory)
+    with pytest.raises(ValueError):
+        replay.ReplayClient(cfg, recording=_recording(), speed=0)
@@ -0,0 +1,216 @@
+import os
+import socket
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import src.retry as retry  # noqa: E402
+from src.ibmi_client import IBMiClient  # noqa: E402
+
+
+class AuthenticationException(Exception):
+    """Mimics ``paramiko.AuthenticationException`` by name."""
+
+
+class LocalSFTP:
+    """Minimal SFTP client backed by the local filesystem."""
+
+    def __init__(self, fail_puts: int = 0, written: bool = True):
+        self.fail_puts = fail_puts
+        self.written = written
+        self.closed = False
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def put(self, local, remote, callback=None):
+        data = Path(local).read_bytes()
+        if self.fail_puts:
+            # reset half way through, or (not *written*) before opening
+            self.fail_puts -= 1
+            if self.written:
+                Path(remote).write_bytes(data[: len(data) // 2])
+                if callback is not None:
+                    callback(len(data) // 2, len(data))
+            raise ConnectionResetError("reset")
+        Path(remote).write_bytes(data)
+        if callback is not None:
+            callback(len(data), len(data))
+
+    def get(self, remote, local, callback=None):
+        Path(local).write_bytes(Path(remote).read_bytes())
+
+    def open(self, path, mode):
+        fh = open(path, mode)
+        fh.set_pipelined = lambda flag: None
+        fh.prefetch = lambda size: None
+        return fh
+
+    def close(self):
+        self.closed = True
+
+
+def test_delay_is_exponential_capped_and_jittered():
+    policy = retry.RetryPolicy(base_delay=1, multiplier=2, max_delay=5, jitter=0.5)
+    assert [policy.delay(n, lambda: 0.0) for n in (1, 2, 3, 4)] == [1, 2, 4, 5]
+    assert policy.delay(2, lambda: 1.0) == 1
+
+
+@pytest.mark.parametrize(
+    "exc,expected",
+    [
+        (ConnectionResetError(), True),
+        (socket.timeout(), True),
+        (EOFError(), True),
+        (OSError(None, "No existing session"), True),
+        (AuthenticationException(), False),
+        (FileNotFoundError(2, "missing"), False),
+        (ValueError("bad"), False),
+    ],
+)
+def test_is_retryable(exc, expected):
+    assert retry.is_retryable(exc) is expected
+
+
+def test_retry_call_retries_transient_then_succeeds():
+    calls, slept, recovered = [], [], []
+    metrics = retry.RetryMetrics()
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionResetError("reset")
+        return "ok"
+
+    policy = retry.RetryPolicy(base_delay=1, jitter=0)
+    result = retry.retry_call(
+        flaky,
+        policy,
+        metrics=metrics,
+        sleep=slept.append,
+        on_retry=lambda exc, n: recovered.append(n),
+    )
+    assert result == "ok"
+    assert slept == [1, 2] and recovered == [1, 2]
+    assert (metrics.attempts, metrics.retries, metrics.slept) == (3, 2, 3)
+
+
+def test_retry_call_does_not_retry_auth_failures():
+    metrics = retry.RetryMetrics()
+
+    def denied():
+        raise AuthenticationException("denied")
+
+    with pytest.raises(AuthenticationException):
+        retry.retry_call(
+            denied, retry.RetryPolicy(), metrics=metrics, sleep=lambda s: None
+        )
+    assert metrics.attempts == 1 and metrics.fatal == 1
+
+
+def test_retry_call_respects_budget():
+    metrics = retry.RetryMetrics()
+    policy = retry.RetryPolicy(max_attempts=10, base_delay=10, jitter=0, budget=15)
+
+    def down():
+        raise ConnectionRefusedError()
+
+    with pytest.raises(ConnectionRefusedError):
+        retry.retry_call(down, policy, metrics=metrics, sleep=lambda s: None)
+    assert metrics.attempts == 2 and metrics.exhausted == 1
+
+
+def test_resume_put_sends_only_remainder(tmp_path):
+    local = tmp_path / "in.csv"
+    local.write_bytes(b"0123456789")
+    remote = tmp_path / "remote.csv"
+    remote.write_bytes(b"0123")
+    metrics = retry.RetryMetrics()
+    retry.resume_put(LocalSFTP(), local, str(remote), metrics, written=4)
+    assert remote.read_bytes() == b"0123456789"
+    assert metrics.resumed_bytes == 4
+
+
+@pytest.mark.parametrize("stale", [b"0\n", b"old data!!", b"a much longer file"])
+def test_resume_put_replaces_bytes_it_did_not_write(tmp_path, stale):
+    local = tmp_path / "in.csv"
+    local.write_bytes(b"0123456789")
+    remote = tmp_path / "remote.csv"
+    remote.write_bytes(stale)
+    metrics = retry.RetryMetrics()
+    retry.resume_put(LocalSFTP(), local, str(remote), metrics, written=1)
+    assert remote.read_bytes() == b"0123456789"
+    assert metrics.resumed_bytes == 0
+
+
+def test_resume_get_appends_remainder(tmp_path):
+    remote = tmp_path / "remote.csv"
+    remote.write_bytes(b"abcdef")
+    local = tmp_path / "local.csv"
+    local.write_bytes(b"abc")
+    retry.resume_get(LocalSFTP(), str(remote), local, written=3)
+    assert local.read_bytes() == b"abcdef"
+    local.write_bytes(b"xyz")  # not written by this download
+    retry.resume_get(LocalSFTP(), str(remote), local, written=0)
+    assert local.read_bytes() == b"abcdef"
+
+
+def test_resume_reports_absolute_progress(tmp_path):
+    local = tmp_path / "in.csv"
+    local.write_bytes(b"0123456789")
+    remote = tmp_path / "remote.csv"
+    remote.write_bytes(b"0123")
+    calls = []
+    retry.resume_put(
+        LocalSFTP(),
+        local,
+        str(remote),
+        callback=lambda *a: calls.append(a),
+        written=4,
+    )
+    assert calls == [(10, 10)]
+
+
+def test_client_put_reuses_healthy_transport(monkeypatch, tmp_path):
+    monkeypatch.setattr(retry.time, "sleep", lambda s: None)
+    local = tmp_path / "in.csv"
+    local.write_bytes(b"x" * 100)
+    remote = tmp_path / "out.csv"
+    client = IBMiClient(
+        types.SimpleNamespace(), retry_policy=retry.RetryPolicy(jitter=0)
+    )
+    opened = []
+    client.client = types.SimpleNamespace(
+        get_transport=lambda: types.SimpleNamespace(is_active=lambda: True),
+        open_sftp=lambda: opened.append(1) or LocalSFTP(),
+    )
+    client.sftp = LocalSFTP(fail_puts=1)
+    client.sftp_put(local, str(remote))
+    assert remote.read_bytes() == local.read_bytes()
+    assert opened == [1]
+    assert client.retry_metrics.retries == 1
+    assert client.retry_metrics.reconnects == 0
+    assert client.retry_metrics.resumed_bytes == 50
+
+
+def test_client_put_restarts_when_first_attempt_wrote_nothing(monkeypatch, tmp_path):
+    monkeypatch.setattr(retry.time, "sleep", lambda s: None)
+    local = tmp_path / "in.csv"
+    local.write_bytes(b"emp_id,amount\n1,10.00\n2,999.00\n")
+    remote = tmp_path / "out.csv"
+    remote.write_bytes(b"emp_id,amount\n7,1.00\n")  # stale, from an earlier run
+    client = IBMiClient(
+        types.SimpleNamespace(), retry_policy=retry.RetryPolicy(jitter=0)
+    )
+    client.client = types.SimpleNamespace(
+        get_transport=lambda: types.SimpleNamespace(is_active=lambda: True),
+        open_sftp=LocalSFTP,
+    )
+    client.sftp = LocalSFTP(fail_puts=1, written=False)
+    client.sftp_put(local, str(remote))
+    assert remote.read_bytes() == local.read_bytes()
+    assert client.retry_metrics.resumed_bytes == 0
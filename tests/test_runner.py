@@ -1,3 +1,4 @@
+import json
 import sys
 import types
 from pathlib import Path
@@ -7,26 +8,47 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 import src.runner as runner  # noqa: E402
 
 
-def test_parse_args(monkeypatch):
-    monkeypatch.setattr(sys, "argv", ["runner", "--file", "input.csv"])
-    args = runner.parse_args()
-    assert args.file == "input.csv"
-    assert not args.sync
-
-
-def test_main_runs_workflow(monkeypatch):
-    args = types.SimpleNamespace(
+def _args(**overrides):
+    """Return CLI defaults for ``main`` with *overrides* applied."""
+    args = dict(
         file="f.csv",
-        sync=True,
-        fetch_outputs=True,
+        sync=False,
+        fetch_outputs=False,
         dry_run=False,
-        timeout_seconds=1,
+        timeout_seconds=600,
+        export="full",
+        transport="sftp",
         jobq=None,
         outq=None,
         lib_stg=None,
         ifs_dir=None,
         teardown=False,
+        metrics_json=None,
+        metrics_prom=None,
+        trace=None,
+        profile=None,
+        profile_dir="outputs/profile",
+        record=None,
+        replay=None,
+        replay_speed=1.0,
+        rate_limit=None,
+        progress=None,
+        resume=False,
+        end_job=False,
     )
+    args.update(overrides)
+    return types.SimpleNamespace(**args)
+
+
+def test_parse_args(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["runner", "--file", "input.csv"])
+    args = runner.parse_args()
+    assert args.file == "input.csv"
+    assert not args.sync
+
+
+def test_main_runs_workflow(monkeypatch):
+    args = _args(sync=True, fetch_outputs=True, timeout_seconds=1)
     monkeypatch.setattr(runner, "parse_args", lambda: args)
     cfg = types.SimpleNamespace(jobq="J", outq="O", lib_stg="L", ifs_dir="/ifs")
     monkeypatch.setattr(runner, "load_config", lambda: cfg)
@@ -40,21 +62,17 @@ def test_main_runs_workflow(monkeypatch):
     assert runner.main() == 0
     assert called["path"] == Path("f.csv")
     assert called["sync"]
+    assert called["export_mode"] == "full"
+    assert called["resume"] is False and called["checkpoints"] is not None
+
+
+def test_parse_args_export(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["runner", "--file", "a.csv", "--export", "delta"])
+    assert runner.parse_args().export == "delta"
 
 
 def test_main_teardown(monkeypatch):
-    args = types.SimpleNamespace(
-        file="f.csv",
-        sync=False,
-        fetch_outputs=False,
-        dry_run=True,
-        timeout_seconds=5,
-        jobq=None,
-        outq=None,
-        lib_stg=None,
-        ifs_dir=None,
-        teardown=True,
-    )
+    args = _args(dry_run=True, timeout_seconds=5, teardown=True)
     monkeypatch.setattr(runner, "parse_args", lambda: args)
     cfg = types.SimpleNamespace(jobq="J", outq="O", lib_stg="L", ifs_dir="/ifs")
     monkeypatch.setattr(runner, "load_config", lambda: cfg)
@@ -72,18 +90,7 @@ def test_main_teardown(monkeypatch):
 
 
 def test_main_error(monkeypatch):
-    args = types.SimpleNamespace(
-        file="f.csv",
-        sync=False,
-        fetch_outputs=False,
-        dry_run=False,
-        timeout_seconds=0,
-        jobq=None,
-        outq=None,
-        lib_stg=None,
-        ifs_dir=None,
-        teardown=False,
-    )
+    args = _args(timeout_seconds=0)
     monkeypatch.setattr(runner, "parse_args", lambda: args)
 
     def bad_config():
@@ -91,3 +98,100 @@ def test_main_error(monkeypatch):
 
     monkeypatch.setattr(runner, "load_config", bad_config)
     assert runner.main() == 1
+
+
+def test_main_history_subcommand(monkeypatch, tmp_path, capsys):
+    from src.history import RunHistory
+
+    db = tmp_path / "h.db"
+    RunHistory(db).append(
+        {
+            "run_id": "r1",
+            "labels": {"host": "h"},
+            "status": "SUCCESS",
+            "seconds": 2.0,
+            "phases": [{"name": "wait", "seconds": 1.5}],
+        }
+    )
+    monkeypatch.setattr(sys, "argv", ["runner", "history", "--db", str(db)])
+    assert runner.main() == 0
+    out = capsys.readouterr().out
+    assert "== phases ==" in out and "wait" in out
+    monkeypatch.setattr(sys, "argv", ["runner", "history", "--db", str(tmp_path / "x")])
+    assert runner.main() == 1
+
+
+def test_main_generate_subcommand(monkeypatch, tmp_path, capsys):
+    out = tmp_path / "gen.csv"
+    argv = ["runner", "generate", "--out", str(out), "--rows", "10", "--crlf", "1"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert runner.main() == 0
+    assert '"rows": 10' in capsys.readouterr().out
+    assert out.read_bytes().count(b"\r\n") == 10
+    argv[-2:] = ["--duplicates", "0.5"]
+    assert runner.main() == 0
+    printed = json.loads(capsys.readouterr().out)
+    assert printed["expected_rejects"]["sftp"] is None
+    assert printed["expected_rejects"]["odbc"] == printed["counts"]["duplicate"]
+
+
+def test_main_diagnose_subcommand(monkeypatch, capsys):
+    from src.diagnose import Diagnosis
+
+    seen = {}
+
+    def fake(cfg, **kwargs):
+        seen.update(kwargs)
+        return Diagnosis(
+            host=cfg.host,
+            put_mb_s={65_536: 5.0},
+            recommendations=["Use 64KB transfer blocks (5.0 MB/s)."],
+        )
+
+    monkeypatch.setattr(runner, "load_config", lambda: types.SimpleNamespace(host="h"))
+    monkeypatch.setattr(runner.diagnose, "diagnose", fake)
+    argv = ["runner", "diagnose", "--blocks", "64", "--no-compression"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert runner.main() == 0
+    out = capsys.readouterr().out
+    assert "put 64KB blocks" in out and "- Use 64KB" in out
+    assert seen["blocks"] == (65_536,) and seen["compression"] is False
+
+
+def test_main_watch_subcommand(monkeypatch, tmp_path):
+    import src.watch as watch
+
+    runs = []
+    monkeypatch.setattr(watch, "run_workflow", lambda path, cfg, **kw: runs.append(kw))
+    monkeypatch.setattr(
+        runner, "load_config", lambda: types.SimpleNamespace(host="h", ifs_dir="/stg")
+    )
+    (tmp_path / "a.csv").write_text("emp_id,amount\n1,2\n")
+    argv = ["runner", "watch", "--dir", str(tmp_path), "--settle", "0"]
+    argv += ["--batch-window", "0", "--poll", "0", "--once", "--dry-run"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert runner.main() == 0
+    assert runs and runs[0]["dry_run"] is True
+    assert (tmp_path / "done" / "a.csv").exists()
+
+
+def test_main_queue_subcommand(monkeypatch, tmp_path, capsys):
+    from src.jobqueue import JobQueue
+
+    db = str(tmp_path / "q.db")
+    cfg = types.SimpleNamespace(host="h", jobq="QSYSNOMAX", ifs_dir="/stg")
+    monkeypatch.setattr(runner, "load_config", lambda: cfg)
+    argv = ["runner", "queue", "--db", db, "add", "--file", "a.csv"]
+    argv += ["--priority", "2", "--sync", "--export", "delta"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert runner.main() == 0
+    assert capsys.readouterr().out.strip() == "1"
+    monkeypatch.setattr(sys, "argv", ["runner", "queue", "--db", db, "list"])
+    assert runner.main() == 0
+    out = capsys.readouterr().out
+    assert "QSYSNOMAX" in out and "a.csv" in out
+    job = JobQueue(db).get(1)
+    assert job.priority == 2 and job.args == ["--sync", "--export", "delta"]
+    monkeypatch.setattr(sys, "argv", ["runner", "queue", "--db", db, "cancel", "1"])
+    assert runner.main() == 0
+    assert runner.main() == 1
@@ -18,3 +18,35 @@ def test_sql_files_are_fully_qualified() -> None:
     for content in (setup, apply):
         assert "SET SCHEMA &LIB_STG" in content
     assert "DROP SCHEMA IF EXISTS &LIB_STG" in teardown
+
+
+def test_apply_records_run_delta() -> None:
+    root = Path("ibmi")
+    setup = (root / "setup.sql").read_text().upper()
+    apply = (root / "apply.sql").read_text().upper()
+    process = (root / "process.clp").read_text().upper()
+
+    assert "RAC_RUN_DELTA FOR SYSTEM NAME RUN_DELTA" in setup
+    assert "TRUNCATE TABLE &LIB_STG.RAC_RUN_DELTA" in apply
+    # the delta must be captured before the shadow table is modified
+    assert apply.index("INSERT INTO &LIB_STG.RAC_RUN_DELTA") < apply.index(
+        "UPDATE &LIB_STG.RAC_SHADOW_PAYROLL"
+    )
+    assert "FROMFILE(&LIB/RUN_DELTA)" in process
+
+
+def test_process_writes_phase_timings_into_marker() -> None:
+    process = (Path("ibmi") / "process.clp").read_text().upper()
+
+    for phase in ("IMPORT", "APPLY", "EXPORT"):
+        assert f"CHGVAR     VAR(&PHASE) VALUE('{phase}')" in process
+    assert process.count("CALLSUBR   SUBR(LOGPHASE)") == 5
+    assert "RTVSYSVAL  SYSVAL(QDATETIME)" in process
+    # a missing or locked file must not end the job before the marker
+    lines = [line.strip() for line in process.splitlines()]
+    rtvmbrd = [i for i, line in enumerate(lines) if line.startswith("RTVMBRD")]
+    assert len(rtvmbrd) == 4
+    for i in rtvmbrd:
+        assert lines[i + 1].startswith("MONMSG     MSGID(CPF0000)")
+    # the status line comes first and the marker appears in one rename
+    assert "(ECHO ' *CAT &STATUS" in process and "MV ' *CAT" in process
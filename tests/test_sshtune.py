@@ -0,0 +1,88 @@
+import socket
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config  # noqa: E402
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from ibmi_transfer import IBMiSession  # noqa: E402
+from src.ibmi_client import IBMiClient  # noqa: E402
+from src.sshtune import PROFILES, TransportProfile, profile_from_env  # noqa: E402
+
+GCM = ["aes128-gcm@openssh.com", "aes256-gcm@openssh.com"]
+
+
+def test_profile_from_env_defaults_and_overrides():
+    assert profile_from_env({}).is_default
+    assert profile_from_env({}).connect_kwargs() == {}
+    env = {
+        "IBMI_SSH_PROFILE": "legacy",
+        "IBMI_SSH_CIPHERS": "aes256-ctr, aes128-ctr",
+        "IBMI_SSH_WINDOW": "32M",
+        "IBMI_SSH_PACKET": "65536",
+    }
+    profile = profile_from_env(env)
+    assert profile.ciphers == ("aes256-ctr", "aes128-ctr")
+    assert profile.kex == PROFILES["legacy"].kex
+    assert (profile.window_size, profile.max_packet_size) == (32 * 2**20, 65536)
+    assert "transport_factory" in profile.connect_kwargs()
+    with pytest.raises(ValueError, match="IBMI_SSH_PROFILE"):
+        profile_from_env({"IBMI_SSH_PROFILE": "turbo"})
+
+
+def test_apply_puts_preferred_first_and_keeps_fallbacks():
+    left, right = socket.socketpair()
+    try:
+        profile = TransportProfile(
+            ciphers=("aes256-gcm@openssh.com", "no-such-cipher"), window_size=2**24
+        )
+        transport = profile.transport_factory()(left)
+        opts = transport.get_security_options()
+        assert opts.ciphers[0] == "aes256-gcm@openssh.com"
+        assert "aes128-ctr" in opts.ciphers
+        assert "no-such-cipher" not in opts.ciphers
+        assert transport.default_window_size == 2**24
+        transport.close()
+    finally:
+        left.close()
+        right.close()
+
+
+def _cipher(cfg) -> str:
+    with IBMiClient(cfg) as client:
+        return client.client.get_transport().remote_cipher
+
+
+def test_client_negotiates_profile_and_falls_back(tmp_path):
+    with StandInServer(tmp_path / "a") as server:
+        cfg = make_config(server, "/stg", 0.02)
+        assert _cipher(cfg) == "aes128-ctr"
+        fast = replace(cfg, ssh_profile=PROFILES["fast"])
+        assert _cipher(fast) == "aes128-gcm@openssh.com"
+    # an sshd without GCM still accepts the fast profile
+    with StandInServer(tmp_path / "b", disabled_algorithms={"ciphers": GCM}) as old:
+        fast = replace(make_config(old, "/stg", 0.02), ssh_profile=PROFILES["fast"])
+        assert _cipher(fast) == "aes128-ctr"
+
+
+def test_session_uses_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("IBMI_SSH_PROFILE", "fast")
+    local = tmp_path / "f.csv"
+    local.write_text("emp_id,amount\n1,2\n")
+    with StandInServer(tmp_path / "ifs") as server:
+        with IBMiSession(
+            "127.0.0.1",
+            server.user,
+            password=server.password,
+            port=server.port,
+            known_hosts=server.write_known_hosts(tmp_path / "known_hosts"),
+        ) as session:
+            assert session.profile.name == "fast"
+            transport = session.client.get_transport()
+            assert transport.remote_cipher == "aes128-gcm@openssh.com"
+            session.upload(local, "/")
+    assert (tmp_path / "ifs" / "f.csv").read_bytes() == local.read_bytes()
@@ -0,0 +1,84 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config, write_csv  # noqa: E402
+from benchmarks.ibmi_standin import Delays, StandInServer  # noqa: E402
+from ibmi_transfer import IBMiSession  # noqa: E402
+from src.metrics import RECORDER  # noqa: E402
+from src.workflow import run_workflow  # noqa: E402
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(REPO / "ibmi", tmp_path / "ibmi")
+    with StandInServer(tmp_path / "ifs", delays=Delays(job_run=0.02)) as srv:
+        yield srv
+
+
+def test_run_workflow_end_to_end(server, tmp_path):
+    data = tmp_path / "data.csv"
+    rows = write_csv(data, 0.05)
+    cfg = make_config(server, "/stg", 0.02)
+    run_workflow(data, cfg, sync=True, fetch_outputs=True, timeout=10)
+    assert rows > 1000
+    assert (tmp_path / "outputs" / "data_result.csv").read_bytes() == data.read_bytes()
+    verbs = [c.split()[1].strip("'\"") for c in server.commands]
+    assert verbs == ["RUNSQLSTM", "SBMJOB"]
+    assert (tmp_path / "ifs" / "stg" / "scripts" / "apply.sql").is_file()
+    phases = {p["name"]: p for p in RECORDER.report()["phases"]}
+    assert {"remote_queue", "remote_import", "remote_apply", "remote_export"} <= set(
+        phases
+    )
+    assert phases["remote_import"]["rows"] == rows + 1  # header line included
+    assert phases["remote_apply"]["seconds"] >= 0.02
+
+
+def test_run_workflow_reports_failed_job(server, tmp_path):
+    other = tmp_path / "other.csv"
+    write_csv(other, 0.001)
+    cfg = make_config(server, "/stg", 0.02)
+    with pytest.raises(RuntimeError, match="Remote job failed in import"):
+        run_workflow(other, cfg, timeout=10)
+
+
+def test_timeout_ends_submitted_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(REPO / "ibmi", tmp_path / "ibmi")
+    data = tmp_path / "data.csv"
+    write_csv(data, 0.001)
+    with StandInServer(tmp_path / "ifs", delays=Delays(job_queue=0.5)) as slow:
+        cfg = make_config(slow, "/stg", 0.02)
+        with pytest.raises(TimeoutError):
+            run_workflow(data, cfg, sync=True, timeout=0, end_job=True)
+        report = RECORDER.report()
+        assert report["job"] == "000001/BENCH/PROCESS"
+        assert report["job_ended"]["ok"] and report["job_ended"]["reason"] == "timeout"
+        assert "ENDJOB JOB(000001/BENCH/PROCESS) OPTION(*IMMED)" in slow.commands[-1]
+        assert slow.ended[1].wait(1)
+    assert not list((tmp_path / "ifs" / "stg" / "run").glob("*.status"))
+
+
+def test_session_upload_and_call(server, tmp_path):
+    local = tmp_path / "pay.csv"
+    write_csv(local, 0.01)
+    (tmp_path / "ifs" / "in").mkdir(parents=True)
+    with IBMiSession(
+        "127.0.0.1",
+        server.user,
+        password=server.password,
+        port=server.port,
+        known_hosts=server.write_known_hosts(tmp_path / "known_hosts"),
+    ) as session:
+        assert session.upload(local, "/in") == "/in/pay.csv"
+        assert session.run("system 'CALL PGM(PAYLIB/ADJPGM)'") == ""
+        with pytest.raises(RuntimeError, match="CPD0030"):
+            session.run("system 'DLTLIB LIB(PAYLIB)'")
+    assert (tmp_path / "ifs" / "in" / "pay.csv").read_bytes() == local.read_bytes()
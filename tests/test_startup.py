@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_startup import SCENARIOS, heavy_imports, prepare  # noqa: E402
+from src.lazy import LazyModule  # noqa: E402
+
+
+def test_lazy_module_imports_on_first_use():
+    mod = LazyModule("colorsys")
+    assert "not loaded" in repr(mod)
+    assert mod.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert "(loaded)" in repr(mod)
+    with pytest.raises(ModuleNotFoundError):
+        _ = LazyModule("no_such_module_here").anything
+
+
+@pytest.mark.parametrize("name", ["help", "dry-run csv"])
+def test_cli_starts_without_heavy_imports(tmp_path, name):
+    prepare(tmp_path)
+    assert heavy_imports(SCENARIOS[name], tmp_path) == []
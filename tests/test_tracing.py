@@ -0,0 +1,78 @@
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import src.tracing as tracing  # noqa: E402
+import src.workflow as wf  # noqa: E402
+
+
+@pytest.fixture
+def tracer():
+    yield tracing.start_tracing()
+    tracing.stop_tracing()
+
+
+def test_span_is_noop_when_tracing_off():
+    with tracing.span("x") as args:
+        assert args is None
+    assert tracing.span("a") is tracing.span("b")
+
+
+def test_span_records_complete_event(tracer, tmp_path):
+    with tracing.span("outer", n=1):
+        with pytest.raises(ValueError):
+            with tracing.span("inner"):
+                raise ValueError("boom")
+    out = tmp_path / "trace.json"
+    tracer.write(out)
+    events = json.loads(out.read_text())["traceEvents"]
+    inner, outer = [e for e in events if e["ph"] == "X"]
+    assert (inner["name"], outer["name"]) == ("inner", "outer")
+    assert inner["args"]["error"] == "ValueError" and outer["args"] == {"n": 1}
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_run_workflow_trace_nests_client_calls(tracer, monkeypatch, tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    cfg = types.SimpleNamespace(
+        host="h", ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J"
+    )
+    wf.run_workflow(csv_path, cfg, dry_run=True)
+    spans = {e["name"]: e for e in tracer.events if e["ph"] == "X"}
+    for name in (
+        "run_workflow",
+        "IBMiClient.connect",
+        "IBMiClient.ensure_remote_dirs",
+        "IBMiClient.sftp_put",
+        "IBMiClient.ssh_run",
+        "upload",
+    ):
+        assert name in spans
+    root, put, upload = (
+        spans["run_workflow"],
+        spans["IBMiClient.sftp_put"],
+        spans["upload"],
+    )
+    assert root["ts"] <= upload["ts"] <= put["ts"]
+    assert upload["args"]["bytes"] == 5
+
+
+def test_find_status_file_traces_polls(tracer, monkeypatch):
+    listings = iter([[], ["RUN1.status"]])
+    client = types.SimpleNamespace(
+        sftp=types.SimpleNamespace(listdir=lambda d: next(listings))
+    )
+    monkeypatch.setattr(wf.time, "sleep", lambda s: None)
+    assert (
+        wf._find_status_file(client, "/ifs/run", wf.time.time() + 60) == "RUN1.status"
+    )
+    polls = [e["args"]["attempt"] for e in tracer.events if e.get("cat") == "poll"]
+    assert polls == [1, 2]
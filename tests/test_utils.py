@@ -49,7 +49,7 @@ def test_sniff_csv_normalises(tmp_path):
 
 
 def test_xlsx_to_csv(monkeypatch, tmp_path):
-    df = types.SimpleNamespace(to_csv=lambda path, index=False, line_terminator="\n": Path(path).write_text("x"))
+    df = types.SimpleNamespace(to_csv=lambda path, index=False, lineterminator="\n": Path(path).write_text("x"))
     monkeypatch.setattr(utils.pd, "read_excel", lambda path: df)
     out = utils.xlsx_to_csv(Path("in.xlsx"), tmp_path / "out.csv")
     assert out.read_text() == "x"
@@ -0,0 +1,203 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_e2e import make_config  # noqa: E402
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from src import watch  # noqa: E402
+from src.watch import (  # noqa: E402
+    BATCH_NAME,
+    DropFolderWatcher,
+    MicroBatcher,
+    PersistentSession,
+    StabilityTracker,
+    merge_csv,
+)
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tracker_waits_until_file_stops_changing(tmp_path):
+    clock = Clock()
+    tracker = StabilityTracker(2.0, clock=clock)
+    path = tmp_path / "a.csv"
+    path.write_text("emp_id,amount\n")
+    assert tracker.update([path]) == []
+    clock.now = 1.5
+    path.write_text("emp_id,amount\n1,2\n")  # still being written
+    assert tracker.update([path]) == []
+    clock.now = 3.0
+    assert tracker.update([path]) == []
+    clock.now = 3.5
+    assert tracker.update([path]) == [path]
+
+
+def test_batcher_closes_on_quiet_window_size_and_max_wait():
+    clock = Clock()
+    batcher = MicroBatcher(1.0, max_files=3, max_wait=5.0, clock=clock)
+    batcher.add([Path("a")])
+    clock.now = 0.5
+    batcher.add([Path("b"), Path("a")])
+    assert not batcher.due()
+    clock.now = 1.5
+    assert batcher.due()
+    assert batcher.take() == [Path("a"), Path("b")]
+
+    batcher.add([Path("c"), Path("d"), Path("e"), Path("f")])
+    assert batcher.due() and batcher.take() == [Path("c"), Path("d"), Path("e")]
+
+    batcher = MicroBatcher(1.0, max_wait=5.0, clock=clock)
+    for step in range(1, 8):  # a trickle every 0.9s never leaves the window quiet
+        clock.now += 0.9
+        batcher.add([Path(f"g{step}")])
+        assert batcher.due() == (step == 7)
+
+
+def test_merge_csv_keeps_one_header_and_rejects_mismatches(tmp_path):
+    a = tmp_path / "a.csv"
+    a.write_bytes(b"\xef\xbb\xbfemp_id,amount\r\n1,10\r\n2,20")
+    b = tmp_path / "b.csv"
+    b.write_text("emp_id,amount\n3,30\n\n")
+    bad = tmp_path / "bad.csv"
+    bad.write_text("id;value\n4;40\n")
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    out = tmp_path / "data.csv"
+    accepted, rejected, rows = merge_csv([empty, a, bad, b], out, tmp_path)
+    assert accepted == [a, b]
+    assert [path for path, _ in rejected] == [empty, bad]
+    assert rows == 3
+    assert out.read_text() == "emp_id,amount\n1,10\n2,20\n3,30\n"
+
+
+def test_merge_csv_xlsx_named_like_batch_keeps_earlier_rows(monkeypatch, tmp_path):
+    def fake_xlsx_to_csv(src, out_csv):
+        out_csv.write_text("emp_id,amount\n9,90\n")
+        return out_csv
+
+    monkeypatch.setattr(watch, "xlsx_to_csv", fake_xlsx_to_csv)
+    a = tmp_path / "a.csv"
+    # enough rows that the merged output is flushed before data.xlsx converts
+    a.write_text("emp_id,amount\n" + "".join(f"{i},10\n" for i in range(5000)))
+    xlsx = tmp_path / "data.xlsx"
+    xlsx.write_bytes(b"")
+    work = tmp_path / ".work"
+    work.mkdir()
+    out = work / BATCH_NAME
+    accepted, rejected, rows = merge_csv([a, xlsx], out, work)
+    assert accepted == [a, xlsx] and not rejected and rows == 5001
+    lines = out.read_text().splitlines()
+    assert len(lines) == 5002 and lines[1] == "0,10" and lines[-1] == "9,90"
+    assert list(work.iterdir()) == [out]
+
+
+class FakeClient:
+    instances = 0
+
+    def __init__(self, config, dry_run=False):
+        FakeClient.instances += 1
+        self.active = True
+        self.closed = False
+
+    def connect(self):
+        pass
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.closed = True
+
+
+def test_persistent_session_reuses_and_reconnects():
+    FakeClient.instances = 0
+    session = PersistentSession(FakeClient)
+    with session(None) as first:
+        pass
+    with session(None) as again:
+        assert again is first and not first.closed
+    first.active = False
+    with session(None) as second:
+        assert second is not first and first.closed
+    assert session.connects == FakeClient.instances == 2
+
+
+def test_watcher_batches_and_files_away(tmp_path, monkeypatch):
+    runs = []
+
+    def fake_run(path, config, **kwargs):
+        runs.append((path.read_text(), kwargs["sync"]))
+        if len(runs) == 2:
+            raise RuntimeError("Remote job failed: FAILED")
+
+    monkeypatch.setattr(watch, "run_workflow", fake_run)
+    clock = Clock()
+    inbox = tmp_path / "drop"
+    inbox.mkdir()
+    watcher = DropFolderWatcher(
+        type("Cfg", (), {"ifs_dir": "/stg"})(),
+        inbox,
+        settle=1.0,
+        window=1.0,
+        sync=True,
+        client_factory=FakeClient,
+        clock=clock,
+    )
+    (inbox / "a.csv").write_text("emp_id,amount\n1,10\n")
+    (inbox / "b.csv").write_text("emp_id,amount\n2,20\n")
+    (inbox / "c.txt").write_text("ignored")
+    (inbox / "~$d.csv").write_text("lock file")
+    assert watcher.poll_once() is None
+    clock.now = 1.0
+    assert watcher.poll_once() is None  # stable now, batch window still open
+    clock.now = 2.0
+    result = watcher.poll_once()
+    assert result.status == "SUCCESS" and result.rows == 2
+    assert runs == [("emp_id,amount\n1,10\n2,20\n", True)]
+    assert sorted(p.name for p in (inbox / "done").iterdir()) == ["a.csv", "b.csv"]
+
+    (inbox / "a.csv").write_text("emp_id,amount\n3,30\n")
+    for now in (3.0, 4.0, 5.0):
+        clock.now = now
+        result = watcher.poll_once()
+    assert result.status == "FAILED" and runs[1][1] is False
+    assert watcher.session.client is None
+    assert (inbox / "failed" / "a.csv.error").read_text().startswith("Remote job")
+    assert watcher.idle()  # c.txt and the ~$ lock file are not picked up
+    assert sorted(p.name for p in inbox.iterdir() if p.is_file()) == [
+        "c.txt",
+        "~$d.csv",
+    ]
+
+
+def test_watch_once_against_standin(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "ibmi").symlink_to(REPO / "ibmi")
+    inbox = tmp_path / "drop"
+    inbox.mkdir()
+    for n in range(3):
+        (inbox / f"part{n}.csv").write_text(f"emp_id,amount\n{n},1{n}.00\n")
+    (inbox / "wrong.csv").write_text("name\nx\n")
+    with StandInServer(tmp_path / "ifs") as server:
+        cfg = make_config(server, "/stg", 0.02)
+        watcher = DropFolderWatcher(
+            cfg, inbox, settle=0, window=0, poll=0.01, sync=True, fetch_outputs=True
+        )
+        watcher.run(once=True)
+        connections = len(server._transports)
+    assert [r.status for r in watcher.results] == ["SUCCESS"]
+    assert watcher.results[0].rows == 3
+    assert connections == 1
+    assert len(list((inbox / "done").iterdir())) == 3
+    assert (inbox / "failed" / "wrong.csv").exists()
+    result = (tmp_path / "outputs" / "data_result.csv").read_text()
+    assert result == "emp_id,amount\n0,10.00\n1,11.00\n2,12.00\n"
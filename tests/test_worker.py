@@ -0,0 +1,81 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.ibmi_standin import StandInServer  # noqa: E402
+from ibmi_transfer import IBMiSession  # noqa: E402
+from src.progress import Progress  # noqa: E402
+from src.ratelimit import TokenBucket  # noqa: E402
+from src.worker import BackgroundJob, JobStatus  # noqa: E402
+
+PHASES = {"convert": ("Convert", 10), "upload": ("Upload", 80), "run": ("Run", 10)}
+
+
+def test_job_status_maps_phases_and_bytes():
+    status = JobStatus(PHASES)
+    status.apply("phase", "convert")
+    assert (status.percent, status.text) == (0, "Convert")
+    status.apply("phase", "upload")
+    assert status.percent == 10
+    status.apply("progress", Progress("f", 250, 1000, 1.0, 2e6, 2e6))
+    assert status.percent == 30
+    assert status.text == "Upload 25% (2.0 MB/s, 0s)"
+    status.apply("phase", "run")
+    assert status.percent == 90
+    status.apply("done", 0)
+    assert status.finished and status.percent == 100
+
+
+def _events(job):
+    job.join(timeout=5)
+    return [kind for kind, _ in job.drain()]
+
+
+def test_job_reports_result_and_errors():
+    job = BackgroundJob(lambda progress, on_phase: on_phase("run") or 3)
+    job.start()
+    assert _events(job) == ["phase", "done"]
+
+    def boom(progress, on_phase):
+        raise ValueError("bad")
+
+    job = BackgroundJob(boom)
+    job.start()
+    job.join(timeout=5)
+    [(kind, exc)] = job.drain()
+    assert kind == "error" and str(exc) == "bad"
+
+
+def test_cancel_aborts_sftp_upload(tmp_path):
+    local = tmp_path / "big.csv"
+    local.write_bytes(b"1,2\n" * 500_000)
+    with StandInServer(tmp_path / "ifs") as server:
+
+        def upload(progress, on_phase):
+            with IBMiSession(
+                "127.0.0.1",
+                server.user,
+                password=server.password,
+                port=server.port,
+                known_hosts=server.write_known_hosts(tmp_path / "known_hosts"),
+            ) as session:
+                on_phase("upload")
+                session.upload(
+                    local,
+                    "/",
+                    progress=progress,
+                    limiter=TokenBucket(1_000_000, burst=32_768),
+                )
+            return 0
+
+        job = BackgroundJob(upload)
+        job.start()
+        time.sleep(0.3)
+        start = time.perf_counter()
+        job.cancel()
+        job.join(timeout=5)
+        assert time.perf_counter() - start < 1.0
+    assert _events(job)[-1] == "cancelled"
+    assert (tmp_path / "ifs" / "big.csv").stat().st_size < local.stat().st_size
@@ -59,6 +59,78 @@ def test_run_setup_and_submit_job():
     assert any("SBMJOB" in c for c in cmds)
 
 
+def test_submit_job_export_mode():
+    cmds = []
+    client = types.SimpleNamespace(ssh_run=cmds.append)
+    wf._submit_job(client, "LIB", "/ifs", "OUTQ", "JOBQ")
+    wf._submit_job(client, "LIB", "/ifs", "OUTQ", "JOBQ", "delta")
+    assert "'OUTQ' 'FULL')" in cmds[0]
+    assert "'OUTQ' 'DELTA')" in cmds[1]
+    with pytest.raises(ValueError):
+        wf._submit_job(client, "LIB", "/ifs", "OUTQ", "JOBQ", "bogus")
+
+
+def test_submit_job_returns_qualified_job_name():
+    out = "CPC1221: Job 012345/QUSER/PROCESS submitted to job queue QBATCH in library QGPL."
+    client = types.SimpleNamespace(ssh_run=lambda cmd: (out, "", 0))
+    assert wf._submit_job(client, "LIB", "/ifs", "OUTQ", "JOBQ") == "012345/QUSER/PROCESS"
+    assert wf.parse_submitted_job("CPD0043: Program not found.") is None
+
+
+def test_interrupted_wait_ends_job(monkeypatch, tmp_path):
+    from src.metrics import RECORDER
+
+    cmds = []
+    submitted = "Job 000007/U/PROCESS submitted to job queue Q in library L."
+
+    class Client(FakeClient):
+        def ssh_run(self, cmd):
+            cmds.append(cmd)
+            return (submitted if "SBMJOB" in cmd else "", "", 0)
+
+    def interrupt(*a, **k):
+        raise KeyboardInterrupt
+
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    monkeypatch.setattr(wf, "_wait_for_marker", interrupt)
+    cfg = types.SimpleNamespace(host="h", ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J")
+    with pytest.raises(KeyboardInterrupt):
+        wf.run_workflow(csv_path, cfg, client_factory=Client)
+    assert not any("ENDJOB" in str(c) for c in cmds)
+    with pytest.raises(KeyboardInterrupt):
+        wf.run_workflow(csv_path, cfg, client_factory=Client, end_job=True)
+    assert cmds[-1] == ["system", "ENDJOB JOB(000007/U/PROCESS) OPTION(*IMMED)"]
+    assert RECORDER.report()["job_ended"]["reason"] == "Ctrl-C"
+
+
+def test_failed_end_job_keeps_original_exception(monkeypatch, tmp_path):
+    from src.metrics import RECORDER
+
+    submitted = "Job 000007/Q$BATCH/PROCESS submitted to job queue Q in library L."
+
+    class Client(FakeClient):
+        def ssh_run(self, cmd):
+            if "ENDJOB" in str(cmd):
+                raise EOFError("link down")
+            return (submitted, "", 0)
+
+    def timeout(*a, **k):
+        raise TimeoutError("Timed out waiting for marker file")
+
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    monkeypatch.setattr(wf, "_wait_for_marker", timeout)
+    cfg = types.SimpleNamespace(host="h", ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J")
+    with pytest.raises(TimeoutError):
+        wf.run_workflow(csv_path, cfg, client_factory=Client, end_job=True)
+    ended = RECORDER.report()["job_ended"]
+    assert ended["job"] == "000007/Q$BATCH/PROCESS" and not ended["ok"]
+    assert ended["message"] == "link down"
+
+
 def test_find_status_file(monkeypatch):
     class Client:
         def __init__(self):
@@ -79,7 +151,7 @@ def test_find_status_file(monkeypatch):
             return 999
 
     monkeypatch.setattr(wf.time, "time", _mock_time)
-    status = wf._find_status_file(Client(), "dir", 5)
+    status = wf._find_status_file(Client(), "dir", 5, interval=0)
     assert status == "done.status"
 
 
@@ -96,10 +168,12 @@ def test_find_status_file_timeout(monkeypatch):
 
     monkeypatch.setattr(wf.time, "time", _mock_time)
     with pytest.raises(TimeoutError):
-        wf._find_status_file(client, "dir", 10)
+        wf._find_status_file(client, "dir", 10, interval=0)
+
 
+def test_fetch_result(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
 
-def test_fetch_result(tmp_path):
     class Client:
         @staticmethod
         def sftp_get(remote, local):
@@ -109,7 +183,9 @@ def test_fetch_result(tmp_path):
     assert (Path("outputs") / "file_result.csv").exists()
 
 
-def test_fetch_result_warning(caplog, tmp_path):
+def test_fetch_result_warning(caplog, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
     class Client:
         @staticmethod
         def sftp_get(remote, local):
@@ -121,7 +197,8 @@ def test_fetch_result_warning(caplog, tmp_path):
 
 
 def test_wait_for_marker_success(monkeypatch, tmp_path):
-    monkeypatch.setattr(wf, "_find_status_file", lambda c, d, e: "ok.status")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(wf, "_find_status_file", lambda c, d, e, *_: "ok.status")
 
     class Client:
         def __init__(self):
@@ -137,8 +214,25 @@ def test_wait_for_marker_success(monkeypatch, tmp_path):
     assert fetched
 
 
+def test_wait_for_marker_delta(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(wf, "_find_status_file", lambda c, d, e, *_: "ok.status")
+    gets = []
+
+    class Client:
+        @staticmethod
+        def sftp_get(remote, local):
+            gets.append(remote)
+            Path(local).write_text("SUCCESS")
+
+    wf._wait_for_marker(Client(), "/ifs", tmp_path / "in.csv", fetch_outputs=True, log=logging.getLogger(__name__), timeout=0, export_mode="delta")
+    assert gets[-1] == "/ifs/out/in_delta.csv"
+    assert (tmp_path / "outputs" / "in_delta.csv").exists()
+
+
 def test_wait_for_marker_failure(monkeypatch, tmp_path):
-    monkeypatch.setattr(wf, "_find_status_file", lambda c, d, e: "bad.status")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(wf, "_find_status_file", lambda c, d, e, *_: "bad.status")
 
     class Client:
         @staticmethod
@@ -238,3 +332,92 @@ def test_teardown(monkeypatch):
     cfg = types.SimpleNamespace(ifs_dir="/ifs", lib_stg="L")
     wf.teardown(cfg, dry_run=True)
     assert any("teardown.sql" in c for c in cmds)
+
+
+def test_run_workflow_odbc(monkeypatch, tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    monkeypatch.setattr(wf, "IBMiClient", None)
+    loads = []
+    monkeypatch.setattr(wf, "load_rows", lambda conn, path, lib: loads.append((conn, path, lib)))
+    conn = types.SimpleNamespace(close=lambda: loads.append("closed"))
+    cfg = types.SimpleNamespace(ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J")
+    wf.run_workflow(csv_path, cfg, transport="odbc", connect_db=lambda c: conn)
+    assert loads == [(conn, csv_path, "L"), "closed"]
+    with pytest.raises(ValueError):
+        wf.run_workflow(csv_path, cfg, transport="ftp")
+
+
+def test_run_workflow_odbc_pool(monkeypatch, tmp_path):
+    import contextlib
+
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    loads = []
+    monkeypatch.setattr(wf, "load_rows", lambda conn, path, lib: loads.append(conn))
+    pool = types.SimpleNamespace(connection=lambda: contextlib.nullcontext("pooled"))
+    cfg = types.SimpleNamespace(ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J")
+    wf.run_workflow(csv_path, cfg, transport="odbc", db_pool=pool)
+    assert loads == ["pooled"]
+
+
+class FakeClient:
+    """In-memory ``IBMiClient`` stand-in for end-to-end workflow tests."""
+
+    def __init__(self, config, dry_run=False):
+        self.calls = []
+
+    def __enter__(self):
+        self.calls.append("connect")
+        return self
+
+    def __exit__(self, *exc):
+        self.calls.append("close")
+
+    def ensure_remote_dirs(self, dirs):
+        self.calls.append("dirs")
+
+    def sftp_put(self, local, remote):
+        self.calls.append("put")
+
+    def ssh_run(self, cmd):
+        self.calls.append("ssh")
+        return "", "", 0
+
+
+def test_run_workflow_records_phases(monkeypatch, tmp_path):
+    from src.metrics import RECORDER
+
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n2,20\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    monkeypatch.setattr(wf, "IBMiClient", FakeClient)
+    cfg = types.SimpleNamespace(host="h", ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J")
+    wf.run_workflow(csv_path, cfg, dry_run=True)
+    report = RECORDER.report()
+    assert report["status"] == "SUCCESS" and report["labels"]["host"] == "h"
+    phases = {p["name"]: p for p in report["phases"]}
+    assert list(phases) == ["prepare", "connect", "provision", "upload", "setup", "submit"]
+    assert phases["upload"]["bytes"] == 10 and phases["upload"]["rows"] == 2
+
+
+def test_run_workflow_appends_history(monkeypatch, tmp_path):
+    from contextlib import closing
+
+    from src.history import RunHistory
+
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("1,10\n")
+    monkeypatch.setattr(wf, "_prepare_csv", lambda src, log: csv_path)
+    monkeypatch.setattr(wf, "IBMiClient", FakeClient)
+    db = tmp_path / "history.db"
+    cfg = types.SimpleNamespace(
+        host="h", ifs_dir="/ifs", lib_stg="L", outq="O", jobq="J", history_db=db
+    )
+    wf.run_workflow(csv_path, cfg, dry_run=True)
+    with closing(RunHistory(db)._connect()) as conn:
+        row = conn.execute("SELECT host, jobq, rows, status FROM runs").fetchone()
+        phases = conn.execute("SELECT COUNT(*) FROM phases").fetchone()[0]
+    assert row == ("h", "J", 1, "SUCCESS") and phases == 6